@@ -80,6 +80,11 @@ def get_more_physics(bodies, body):
     # in case it drives you crazy, uncomment this
     # html = html.replace('\r', '\r\n')
 
+    # oblateness (second zonal harmonic), given in units of 1e-6
+    matches = re.search(r'J<sub>2</sub>[^:]*: *([\-0-9\.]+)', html)
+    if matches is not None:
+        bodies[body]['j2'] = float(matches.group(1)) * 1e-6
+
     # orientation of north pole (axial tilt)
 
     # extract right ascension
@@ -147,6 +152,26 @@ def get_planets_orbits(bodies):
             'mean_anomaly_at_epoch': radians(mean_anomaly % 360),
         }
 
+        # rates of the elements, to follow them over time (see RatedOrbit)
+        century = 36525 * 86400
+        (semi_major_axis_rate, eccentricity_rate, inclination_rate,
+            mean_longitude_rate, longitude_of_periapsis_rate,
+            longitude_of_ascending_node_rate) = [
+                float(dx) / century for dx in changes
+            ]
+        body['orbit']['rates'] = {
+            'semi_major_axis': semi_major_axis_rate * au,
+            'eccentricity': eccentricity_rate,
+            'inclination': radians(inclination_rate),
+            'longitude_of_ascending_node':
+                radians(longitude_of_ascending_node_rate),
+            'argument_of_periapsis': radians(
+                longitude_of_periapsis_rate -
+                longitude_of_ascending_node_rate),
+            'mean_anomaly':
+                radians(mean_longitude_rate - longitude_of_periapsis_rate),
+        }
+
 
 def get_moons_physics(bodies):
     """Get physical information of moons of the Solar System"""
@@ -220,6 +220,14 @@ class Parabola(Mesh):
             yield math.cosh(theta), math.sinh(theta)
 
 
+def frame_transform(orbit):
+    """Rotation from the frame of the orbital elements to the ecliptic one
+
+    The frames of orbits are inertial (see Orbit.reference_frame).
+    """
+    return Mat4.from_mat3(orbit.reference_frame.orientation)
+
+
 class OrbitMesh(Mesh):
     def __init__(self, orbit):
         self.orbit = orbit
@@ -229,6 +237,7 @@ class OrbitMesh(Mesh):
     def vertices(self):
         orbit = self.orbit
         transform = (
+            frame_transform(orbit) @
             Mat4.rotate(orbit.longitude_of_ascending_node, 0, 0, 1) @
             Mat4.rotate(orbit.inclination,                 1, 0, 0) @
             Mat4.rotate(orbit.argument_of_periapsis,       0, 0, 1) @
@@ -247,6 +256,7 @@ class ApsesMesh(Mesh):
     def __init__(self, orbit):
         self.orbit = orbit
         self.transform = (
+            frame_transform(orbit) @
             Mat4.rotate(orbit.longitude_of_ascending_node, 0, 0, 1) @
             Mat4.rotate(orbit.inclination,                 1, 0, 0) @
             Mat4.rotate(orbit.argument_of_periapsis,       0, 0, 1) @
@@ -306,9 +316,11 @@ class FocusedOrbitMesh(Mesh):
                         yield theta
             angles = sorted(_())
 
+            rotation = orbit.reference_frame.orientation
             focus_offset = orbit.position_at_time(self.time)
             for angle in angles:
-                yield orbit.position_at_true_anomaly(angle) - focus_offset
+                position = orbit.position_at_true_anomaly(angle)
+                yield rotation * position - focus_offset
         else:  # closed orbits
             # nice hack with circle symetry to draw the orbit from the body
             # while still using VBOs
@@ -317,6 +329,7 @@ class FocusedOrbitMesh(Mesh):
             # make tilted ellipse from a circle; and rotate at current anomaly
             anomaly = orbit.eccentric_anomaly_at_time(self.time)
             transform = (
+                frame_transform(orbit) @
                 Mat4.rotate(orbit.longitude_of_ascending_node, 0, 0, 1) @
                 Mat4.rotate(orbit.inclination,                 1, 0, 0) @
                 Mat4.rotate(orbit.argument_of_periapsis,       0, 0, 1) @
@@ -338,10 +351,13 @@ class FocusedApsesMesh(Mesh):
         super().__init__(GL_POINTS)
 
     def vertices(self):
+        rotation = self.orbit.reference_frame.orientation
         focus_offset = self.orbit.position_at_time(self.time)
 
         # periapsis
-        yield self.orbit.position_at_true_anomaly(0) - focus_offset
+        periapsis = self.orbit.position_at_true_anomaly(0)
+        yield rotation * periapsis - focus_offset
         if self.orbit.eccentricity < 1.:  # circular and elliptic orbits
             # apoapsis
-            yield self.orbit.position_at_true_anomaly(math.pi) - focus_offset
+            apoapsis = self.orbit.position_at_true_anomaly(math.pi)
+            yield rotation * apoapsis - focus_offset
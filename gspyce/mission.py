@@ -1,7 +1,9 @@
+import sys
 import time
 from math import radians
 
 from spyce.vector import Mat4
+import spyce.scheduler
 import gspyce.simulation
 import gspyce.textures
 import gspyce.mesh
@@ -16,13 +18,34 @@ class MissionGUI(gspyce.simulation.SimulationGUI):
         self.texture_rocket_on = gspyce.textures.load("rocket_on.png")
         self.texture_rocket_off = gspyce.textures.load("rocket_off.png")
 
-    def draw_rocket(self):
-        """Draw the rocket"""
+        # all the simulated vessels; `rocket` is the one shown on the HUD
+        self.scheduler = spyce.scheduler.Scheduler(self.time)
 
-        self.add_pick_object(self.rocket)
+    @property
+    def vessels(self):
+        """Vessels to draw"""
+        return self.scheduler.vessels
+
+    def draw_hud(self):
+        """Draw the HUD"""
+        # next change of sphere of influence, within a day
+        trajectory = self.rocket.trajectory
+        if trajectory is not None:
+            trajectory.predict(self.time + 86400)
+            patch = trajectory.patch_at_time(self.time)
+            if patch.transition is not None:
+                body = patch.body or patch.primary
+                self.hud_print("Next: %s (%s) in %.0f s\n" % (
+                    patch.transition, body, patch.end - self.time))
+        super().draw_hud()
+
+    def draw_rocket(self, rocket):
+        """Draw a rocket"""
+
+        self.add_pick_object(rocket)
 
         # rocket orientation
-        row1, row2, row3 = self.rocket.orientation
+        row1, row2, row3 = rocket.orientation
         orientation = Mat4([
             [*row1, 0],
             [*row2, 0],
@@ -32,13 +55,13 @@ class MissionGUI(gspyce.simulation.SimulationGUI):
 
         original_modelview_matrix = self.modelview_matrix
         transform = self.modelview_matrix @ \
-            Mat4.translate(*self.rocket._relative_position) @ \
+            Mat4.translate(*rocket._relative_position) @ \
             Mat4.scale(1e4, 1e4, 1e4) @ \
             orientation
         self.set_modelview_matrix(transform)
 
         # pick correct texture
-        if self.rocket.throttle == 0:
+        if rocket.throttle == 0:
             glBindTexture(GL_TEXTURE_2D, self.texture_rocket_off)
         else:
             glBindTexture(GL_TEXTURE_2D, self.texture_rocket_on)
@@ -56,7 +79,7 @@ class MissionGUI(gspyce.simulation.SimulationGUI):
     def draw_body(self, body):
         """Draw a CelestialBody (or a Rocket)"""
 
-        if body == self.rocket:
+        if body in self.vessels:
             return
 
         super().draw_body(body)
@@ -64,7 +87,13 @@ class MissionGUI(gspyce.simulation.SimulationGUI):
     def draw(self):
         super().draw()
 
-        self.draw_rocket()
+        # rockets are not among the satellites of their primaries, so
+        # SystemGUI.draw() only places the one with the focus
+        scene_origin = self.focus.global_position_at_time(self.time)
+        for rocket in self.vessels:
+            rocket_position = rocket.global_position_at_time(self.time)
+            rocket._relative_position = rocket_position - scene_origin
+            self.draw_rocket(rocket)
 
     def main(self):
         """Main loop"""
@@ -79,28 +108,19 @@ class MissionGUI(gspyce.simulation.SimulationGUI):
             last = now
             accumulated_time += elapsed * self.timewarp
 
-            dt = 2.**-5
-
             # avoid wasting cycles
-            if accumulated_time < dt:
+            if accumulated_time < self.scheduler.step:
                 pause = 1./60 - elapsed
                 if pause > 0.:
                     time.sleep(pause)
                 continue
 
-            # physics simulation
-            while accumulated_time > dt:
-                if self.rocket.throttle:
-                    # physical simulation (integration)
-                    delta_t = dt
-                else:
-                    # logical simulation (just following Kepler orbits)
-                    resume_delay = self.rocket.resume_time - self.time
-                    next_activity = max(dt, resume_delay)
-                    delta_t = (min(accumulated_time, next_activity) // dt) * dt
-                accumulated_time -= delta_t
-                self.rocket.simulate(self.time, delta_t)
-                self.time += delta_t
+            # physics simulation (only integrating thrusting rockets, and
+            # following Kepler orbits otherwise)
+            start = self.scheduler.time
+            self.scheduler.run_until(start + accumulated_time)
+            accumulated_time -= self.scheduler.time - start
+            self.time = self.scheduler.time
 
             self.update()
 
@@ -109,29 +129,34 @@ class MissionGUI(gspyce.simulation.SimulationGUI):
 
 def main():
     import spyce.ksp_cfg
+    import spyce.recorder
     import spyce.rocket
+    import spyce.universe
+    from spyce.conditions import (
+        AltitudeAbove, ApoapsisAbove, PeriapsisAbove, PropellantEmpty,
+    )
 
     sim = MissionGUI.from_cli_args()
 
     def launchpad_to_orbit(rocket):
         # vertical ascent with progressive gravity turn
         sim.log("Phase 1 (vertical take-off)")
-        yield lambda: rocket.position[0] > 610e3
+        yield AltitudeAbove(10e3)
         sim.log("Phase 2 (start of gravity turn)")
         rocket.rotate(radians(-45), 1, 0, 0)
-        yield lambda: rocket.orbit.apoapsis > 675e3
+        yield ApoapsisAbove(675e3)
         sim.log("Phase 3 (end of gravity turn)")
         rocket.rotate(radians(-45), 1, 0, 0)
-        yield lambda: rocket.orbit.apoapsis > 700e3
+        yield ApoapsisAbove(700e3)
         sim.log("Phase 4 (coasting)")
         rocket.throttle = 0.
 
         # circularizing
-        yield lambda: rocket.position.norm() > 699e3
+        yield AltitudeAbove(99e3)
         sim.log("Phase 5 (circularizing)")
         rocket.rotate(radians(-20), 1, 0, 0)
         rocket.throttle = 1.0
-        yield lambda: rocket.orbit.periapsis > 695e3
+        yield PeriapsisAbove(695e3)
         sim.log("In orbit")
         rocket.throttle = 0.0
 
@@ -142,21 +167,28 @@ def main():
         rocket.throttle = 1.0
         rocket.rotate(radians(58.0515), 1, 0, 0)
 
-        yield lambda: rocket.propellant <= 0.
+        yield PropellantEmpty()
         sim.log("Out of propellant!")
         rocket.throttle = 0
 
     body = sim.focus
-    rocket = spyce.rocket.Rocket(body, program)
+    universe = spyce.universe.Universe(sim.bodies)
+    rocket = spyce.rocket.Rocket(body, program, universe)
     rocket |= spyce.ksp_cfg.PartSet().make(
         'Size3LargeTank', 'Size3LargeTank', 'Size3EngineCluster',
     )
-    rocket.orbit.primary.satellites.append(rocket)
 
+    # record the flight, if a path is given after the name of the body
+    if len(sys.argv) > 2:
+        rocket.recorder = spyce.recorder.Recorder(sys.argv[2])
+
+    sim.scheduler.add(rocket)
     sim.rocket = rocket
     sim.focus = rocket
     with sim:
         sim.main()
+    if rocket.recorder is not None:
+        rocket.recorder.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,174 @@
+import sys
+import time
+
+import numpy
+
+import spyce.body
+import spyce.decimation
+import spyce.load
+import spyce.orbit
+import spyce.recorder
+from spyce.vector import Vec3, Mat4
+import gspyce.mesh
+import gspyce.mission
+from gspyce.graphics import *
+
+
+class RecordedVessel(spyce.body.CelestialBody):
+    """Vessel following a recording (see spyce.recorder.Recording)"""
+    def __init__(self, recording, bodies):
+        """Follow `recording`; `bodies` maps names to celestial bodies"""
+        super().__init__("recording")
+        self.recording = recording
+        self.bodies = bodies
+        self.trajectory = None
+        self.orientation = [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
+        self._index = None  # rank of the current record
+        self.seek(recording.start)
+
+    def seek(self, time):
+        """Update the state of the vessel at `time` (s)"""
+        recording = self.recording
+        index = min(max(recording.index_at_time(time), 0), len(recording) - 1)
+        record = recording.records[index]
+        if index != self._index:
+            self._index = index
+            self.primary = self.bodies[recording.primary(record)]
+            self.throttle = float(record["throttle"])
+            self.mass = float(record["mass"])
+            self.orbit = spyce.orbit.Orbit.from_state(
+                self.primary, Vec3(record["position"].tolist()),
+                Vec3(record["velocity"].tolist()), float(record["time"]))
+
+        if self.throttle == 0:
+            # coasting from the record, possibly for a long time
+            self.position = self.orbit.position_at_time(time)
+            self.velocity = self.orbit.velocity_at_time(time)
+        else:
+            _, position, velocity = recording.state_at_time(time)
+            self.position = Vec3(position.tolist())
+            self.velocity = Vec3(velocity.tolist())
+
+    def global_position_at_time(self, time):
+        self.seek(time)
+        return self.primary.global_position_at_time(time) + self.position
+
+
+class ReplayGUI(gspyce.mission.MissionGUI):
+    """Replay of a recording, instead of a simulation
+
+    The time can be scrubbed with '[' and ']', by a hundredth of the
+    recording.
+    """
+    def __init__(self, focus, recording):
+        super().__init__(focus)
+        self.recording = recording
+        self.rocket = RecordedVessel(
+            recording, {body.name: body for body in self.bodies})
+        self.focus = self.rocket
+        self.time = recording.start
+
+        # simplified path around each primary, at several levels of detail
+        self.paths = {}  # name of primary -> LevelsOfDetail
+        self.path_meshes = {}  # (name of primary, level) -> mesh
+        chunk = 1 << 16
+        for start in range(0, len(recording), chunk):
+            records = recording.records[start:start + chunk]
+            for rank in numpy.unique(records["primary"]):
+                name = recording.primaries[rank]
+                if name not in self.paths:
+                    self.paths[name] = spyce.decimation.LevelsOfDetail(
+                        1e2, levels=24)
+                mask = records["primary"] == rank
+                self.paths[name].append(records["position"][mask])
+        for path in self.paths.values():
+            path.finish()
+
+    @property
+    def vessels(self):
+        return [self.rocket]
+
+    def draw(self):
+        super().draw()
+
+        # recorded path around the current primary
+        primary = self.rocket.primary
+        path = self.paths.get(primary.name)
+        if path is None:
+            return
+        # size of a pixel at the distance of the camera
+        level = path.level_for(1 / (self.zoom * self.width))
+        mesh = self.path_meshes.get((primary.name, level))
+        if mesh is None:
+            points, _ = path.level(level)
+            mesh = gspyce.mesh.Generic(GL_LINE_STRIP, points.tolist())
+            self.path_meshes[primary.name, level] = mesh
+        original_modelview_matrix = self.modelview_matrix
+        self.set_modelview_matrix(
+            original_modelview_matrix @
+            Mat4.translate(*primary._relative_position)
+        )
+        self.set_color(0.0, 1.0, 1.0, 1.0)
+        mesh.draw()
+        self.set_modelview_matrix(original_modelview_matrix)
+
+    def draw_hud(self):
+        """Draw the HUD"""
+        recording = self.recording
+        self.hud_print("Replay: %.0f s / %.0f s\n" % (
+            self.time - recording.start, recording.end - recording.start))
+        self.hud_print("Mass: %.0f kg\n" % self.rocket.mass)
+        super().draw_hud()
+
+    def scrub(self, duration):
+        """Move in the recording by `duration` (s)"""
+        recording = self.recording
+        self.time = min(max(self.time + duration, recording.start),
+                        recording.end)
+
+    @glut_callback
+    def keyboardFunc(self, k, x, y):
+        """Handle key presses (GLUT callback)"""
+        step = (self.recording.end - self.recording.start) / 100
+        if k == b'[':
+            self.scrub(-step)
+            self.update()
+        elif k == b']':
+            self.scrub(step)
+            self.update()
+        else:
+            super().keyboardFunc(k, x, y)
+
+    def main(self):
+        """Main loop"""
+        last = time.time()
+        while self.is_running:
+            # passage of time, within the recording
+            now = time.time()
+            elapsed = now - last
+            last = now
+            self.scrub(elapsed * self.timewarp)
+
+            self.update()
+            glutMainLoopEvent()
+
+        glutCloseFunc(None)
+
+
+def main():
+    try:
+        recording = spyce.recorder.Recording(sys.argv[1])
+    except IndexError:
+        print("Usage: %s RECORDING" % sys.argv[0], file=sys.stderr)
+        sys.exit(1)
+    if not len(recording):
+        print("Empty recording", file=sys.stderr)
+        sys.exit(1)
+
+    primary = recording.primary(recording.records[0])
+    with ReplayGUI(spyce.load.from_name(primary), recording) as gui:
+        gui.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,7 @@ import sys
 import math
 
 import spyce.human
+import spyce.frames
 from spyce.vector import Mat4
 import gspyce.textures
 import gspyce.skybox
@@ -135,17 +136,9 @@ class SystemGUI(gspyce.picking.PickingGUI, gspyce.terminal.TerminalGUI):
         )
         self.add_pick_object(body)
 
-        # axial tilt
-        if body.north_pole is not None:
-            z_angle = body.north_pole.ecliptic_longitude - math.pi/2
-            transform @= Mat4.rotate(z_angle, 0, 0, 1)
-            x_angle = body.north_pole.ecliptic_latitude - math.pi/2
-            transform @= Mat4.rotate(x_angle, 1, 0, 0)
-
-        # OpenGL use single precision while Python has double precision
-        # reducing modulo 2 PI in Python reduces loss of significance
-        turn_fraction, _ = math.modf(self.time / body.rotational_period)
-        transform @= Mat4.rotate(2 * math.pi * turn_fraction, 0, 0, 1)
+        # axial tilt and rotation (see spyce.frames)
+        rotation = spyce.frames.body_fixed(body).rotation_at_time(self.time)
+        transform @= Mat4.from_mat3(rotation)
 
         # radius
         transform @= Mat4.scale(body.radius, body.radius, body.radius)
@@ -17,7 +17,8 @@ class CelestialBody:
     """
 
     def __init__(self, name, gravitational_parameter=0, radius=0,
-                 rotational_period=0, north_pole=None, orbit=None, **_):
+                 rotational_period=0, north_pole=None, orbit=None, j2=0,
+                 pressure_at_sea_level=0, pressure_scale_height=0, **_):
         """Definition of a celestial body
 
         Arguments:
@@ -26,12 +27,18 @@ class CelestialBody:
         radius                   m, optional
         rotational_period        s, optional, 0 for tidal lock
         orbit                    Orbit, optional
+        j2                       -, optional, second zonal harmonic
+        pressure_at_sea_level    Pa, optional
+        pressure_scale_height    m, optional
         """
         self.name = name
         self.radius = float(radius)
         self.gravitational_parameter = float(gravitational_parameter)
         self.north_pole = north_pole
         self.orbit = orbit
+        self.j2 = float(j2)
+        self.pressure_at_sea_level = float(pressure_at_sea_level)
+        self.pressure_scale_height = float(pressure_scale_height)
 
         self.mass = self.gravitational_parameter/spyce.physics.G
 
@@ -89,6 +96,13 @@ class CelestialBody:
         else:
             self.solar_day = 0
 
+        # atmosphere ends where the pressure drops to a millionth of the
+        # pressure at sea level (as in KSP)
+        if self.pressure_at_sea_level == 0:
+            self.atmosphere_height = 0.
+        else:
+            self.atmosphere_height = self.pressure_scale_height * math.log(1e6)
+
         # surface velocity
         if self.rotational_period == 0:
             self.surface_velocity = math.inf
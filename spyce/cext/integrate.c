@@ -0,0 +1,315 @@
+/* Integration of the trajectory of a rocket
+
+The rocket is subject to the point-mass gravity of its primary, and to a
+thrust along a constant direction, with its mass decreasing as propellant is
+used. The state is a buffer of STATE_SIZE doubles:
+
+	x, y, z, vx, vy, vz, propellant
+
+Both integrators update the state in place, and return early when an event
+occurs (see enum event): the state is then the one at the end of the step
+during which the event occurred.
+*/
+
+#include <math.h>
+
+#define STATE_SIZE 7
+
+struct vessel
+{
+	double mu;              /* gravitational parameter of the primary (m^3/s^2) */
+	double radius;          /* radius of the primary (m) */
+	double thrust[3];       /* thrust, throttle included (N) */
+	double expulsion_rate;  /* throttle included (kg/s) */
+	double dry_mass;        /* kg */
+};
+
+struct events
+{
+	double radius_min;  /* m, 0 to disable */
+	double radius_max;  /* m, INFINITY to disable */
+};
+
+enum event
+{
+	EVENT_NONE = 0,
+	EVENT_BURNOUT = 1,
+	EVENT_RADIUS_BELOW = 2,
+	EVENT_RADIUS_ABOVE = 3,
+};
+
+static inline double min(double a, double b)
+{
+	return a < b ? a : b;
+}
+
+static inline double max(double a, double b)
+{
+	return a > b ? a : b;
+}
+
+static inline void gravity(const struct vessel* v, const double* position, double* acceleration)
+{
+	/* Acceleration due to the primary (see Body.gravity()) */
+	double distance2 = position[0]*position[0] + position[1]*position[1] + position[2]*position[2];
+	if (distance2 == 0.)
+	{
+		acceleration[0] = acceleration[1] = acceleration[2] = 0.;
+		return;
+	}
+	double distance = sqrt(distance2);
+	double g = v->mu / distance2;
+	if (distance < v->radius)
+	{
+		// see https://en.wikipedia.org/wiki/Shell_theorem
+		double x = distance / v->radius;
+		g *= x*x*x;
+	}
+	for (int i = 0; i < 3; i++)
+		acceleration[i] = position[i] * (-g / distance);
+}
+
+static enum event check_events(const double* y, double propellant, const struct events* e)
+{
+	/* Event occurring during a step, from `propellant` to state `y` */
+	if (propellant > 0. && y[6] <= 0.)
+		return EVENT_BURNOUT;
+	double distance = sqrt(y[0]*y[0] + y[1]*y[1] + y[2]*y[2]);
+	if (distance < e->radius_min)
+		return EVENT_RADIUS_BELOW;
+	if (distance > e->radius_max)
+		return EVENT_RADIUS_ABOVE;
+	return EVENT_NONE;
+}
+
+static void rk4_step(const struct vessel* v, double* y, double h)
+{
+	/* Runge-Kutta 4 step of `h` seconds
+
+	As in Rocket.update_physics(), the thrust is constant during the step,
+	with the mass at the end of the step, and averaged when the propellant
+	runs out during the step.
+	*/
+	double required = v->expulsion_rate * h;
+	double used = min(y[6], required);
+	double ratio = required > 0. ? used / required : 0.;
+	double mass = v->dry_mass + y[6] - used;
+	double thrust[3];
+	for (int i = 0; i < 3; i++)
+		thrust[i] = mass > 0. ? v->thrust[i] * ratio / mass : 0.;
+
+	// k[s] holds the derivative of position then velocity at stage s
+	double k[4][6];
+	double tmp[6];
+	const double c[4] = {0., .5, .5, 1.};
+	for (int s = 0; s < 4; s++)
+	{
+		for (int i = 0; i < 6; i++)
+			tmp[i] = s == 0 ? y[i] : y[i] + k[s-1][i] * (h * c[s]);
+		for (int i = 0; i < 3; i++)
+			k[s][i] = tmp[3+i];
+		gravity(v, tmp, &k[s][3]);
+		for (int i = 0; i < 3; i++)
+			k[s][3+i] += thrust[i];
+	}
+	for (int i = 0; i < 6; i++)
+		y[i] += (k[0][i] + 2.*(k[1][i] + k[2][i]) + k[3][i]) * (h / 6.);
+	y[6] -= used;
+}
+
+enum event integrate_rk4(const struct vessel* v, double* y, double h, long k, const struct events* e, long* steps)
+{
+	/* Run up to `k` steps of `h` seconds; set `steps` to the steps run */
+	for (*steps = 0; *steps < k; )
+	{
+		double propellant = y[6];
+		rk4_step(v, y, h);
+		*steps += 1;
+		enum event event = check_events(y, propellant, e);
+		if (event != EVENT_NONE)
+			return event;
+	}
+	return EVENT_NONE;
+}
+
+// members of an ensemble integrated together, so that the loops over them
+// can be vectorized
+#define BLOCK 64
+
+void integrate_rk4_ensemble(double mu, double radius, const double* state, double* out, const double* acceleration, const double* h, long n)
+{
+	/* Runge-Kutta 4 step of each of `n` rockets (see Ensemble)
+
+	The states (position then velocity) and the accelerations due to the
+	thrust are stored by components: component i of rocket j is at i*n + j.
+	Rocket j runs a step of h[j] seconds, with a constant thrust, from `state`
+	to `out`.
+	*/
+	const double c[4] = {0., .5, .5, 1.};
+	const double w[4] = {1., 2., 2., 1.};
+	// below the surface, the gravity is that of the mass inside (see gravity())
+	double g_inside = mu / (radius * radius * radius);
+	for (long start = 0; start < n; start += BLOCK)
+	{
+		long m = n - start < BLOCK ? n - start : BLOCK;
+		const double* from = state + start;
+		double* to = out + start;
+		const double* a = acceleration + start;
+		const double* dt = h + start;
+
+		// d holds the derivative at the last stage (position then velocity),
+		// and sum the weighted sum of the derivatives
+		double d[6][BLOCK] = {{0}};
+		double sum[6][BLOCK] = {{0}};
+		for (int s = 0; s < 4; s++)
+		{
+			for (long j = 0; j < m; j++)
+			{
+				double hc = dt[j] * c[s];
+				double x = from[j] + d[0][j] * hc;
+				double y = from[n + j] + d[1][j] * hc;
+				double z = from[2*n + j] + d[2][j] * hc;
+				double vx = from[3*n + j] + d[3][j] * hc;
+				double vy = from[4*n + j] + d[4][j] * hc;
+				double vz = from[5*n + j] + d[5][j] * hc;
+
+				double distance2 = x*x + y*y + z*z;
+				double distance = sqrt(distance2);
+				double g = min(mu / (distance2 * distance), g_inside);
+
+				d[0][j] = vx;
+				d[1][j] = vy;
+				d[2][j] = vz;
+				d[3][j] = x * -g + a[j];
+				d[4][j] = y * -g + a[n + j];
+				d[5][j] = z * -g + a[2*n + j];
+				sum[0][j] += w[s] * vx;
+				sum[1][j] += w[s] * vy;
+				sum[2][j] += w[s] * vz;
+				sum[3][j] += w[s] * d[3][j];
+				sum[4][j] += w[s] * d[4][j];
+				sum[5][j] += w[s] * d[5][j];
+			}
+		}
+		for (int i = 0; i < 6; i++)
+			for (long j = 0; j < m; j++)
+				to[i*n + j] = from[i*n + j] + sum[i][j] * (dt[j] / 6.);
+	}
+}
+
+static void derivative(const struct vessel* v, const double* y, double* dy)
+{
+	/* Derivative of the state, with the mass decreasing continuously */
+	for (int i = 0; i < 3; i++)
+		dy[i] = y[3+i];
+	gravity(v, y, &dy[3]);
+	if (y[6] > 0.)
+	{
+		double mass = v->dry_mass + y[6];
+		for (int i = 0; i < 3; i++)
+			dy[3+i] += v->thrust[i] / mass;
+		dy[6] = -v->expulsion_rate;
+	}
+	else
+		dy[6] = 0.;
+}
+
+// Dormand-Prince coefficients (the system is autonomous: no time nodes)
+static const double dp_a[7][6] = {
+	{0},
+	{1./5},
+	{3./40, 9./40},
+	{44./45, -56./15, 32./9},
+	{19372./6561, -25360./2187, 64448./6561, -212./729},
+	{9017./3168, -355./33, 46732./5247, 49./176, -5103./18656},
+	{35./384, 0., 500./1113, 125./192, -2187./6784, 11./84},
+};
+// difference between the solutions of order 5 and 4
+static const double dp_e[7] = {
+	71./57600, 0., -71./16695, 71./1920, -17253./339200, 22./525, -1./40,
+};
+
+static double dp_step(const struct vessel* v, const double* y, double* out, double h, double tolerance)
+{
+	/* Dormand-Prince 5(4) step of `h` seconds from `y` to `out`
+
+	Return the error relative to `tolerance`; the step should be accepted
+	when it is at most 1. The error is NaN when the solution is not finite.
+	*/
+	double k[7][STATE_SIZE];
+	double tmp[STATE_SIZE];
+	for (int s = 0; s < 7; s++)
+	{
+		for (int i = 0; i < STATE_SIZE; i++)
+		{
+			tmp[i] = y[i];
+			for (int j = 0; j < s; j++)
+				tmp[i] += h * dp_a[s][j] * k[j][i];
+		}
+		derivative(v, tmp, k[s]);
+	}
+	// the last stage is evaluated at the solution of order 5
+	double error = 0.;
+	for (int i = 0; i < STATE_SIZE; i++)
+	{
+		out[i] = tmp[i];
+		double e = 0.;
+		for (int s = 0; s < 7; s++)
+			e += dp_e[s] * k[s][i];
+		double scale = tolerance * max(1., max(fabs(y[i]), fabs(out[i])));
+		if (!isfinite(out[i]) || !isfinite(e))
+			return NAN;
+		error = max(error, fabs(h * e) / scale);
+	}
+	return error;
+}
+
+enum event integrate_adaptive(const struct vessel* v, double* y, double duration, double tolerance, double* h, const struct events* e, double* elapsed)
+{
+	/* Integrate for `duration` seconds, with steps keeping the local error
+	within `tolerance` (relative)
+
+	`h` is the initial step, and is set to the next step to try. `elapsed` is
+	set to the time integrated. The steps end at the burnout. The integration
+	stops early, with EVENT_NONE, when the step underflows (for instance, when
+	the state is not finite).
+	*/
+	double out[STATE_SIZE];
+	*elapsed = 0.;
+	while (*elapsed < duration)
+	{
+		double step = min(*h, duration - *elapsed);
+		int burnout = 0;
+		if (y[6] > 0. && v->expulsion_rate > 0. && y[6] <= v->expulsion_rate * step)
+		{
+			step = y[6] / v->expulsion_rate;
+			burnout = 1;
+		}
+		double error = dp_step(v, y, out, step, tolerance);
+		if (!(error <= 1.))
+		{
+			// retry with a smaller step (the smallest one for a NaN error)
+			*h = step * max(.9 * pow(error, -1./5), .2);
+			if (*elapsed + *h == *elapsed)
+				return EVENT_NONE;
+			continue;
+		}
+		if (burnout)
+			out[6] = 0.;
+
+		double propellant = y[6];
+		for (int i = 0; i < STATE_SIZE; i++)
+			y[i] = out[i];
+		*elapsed += step;
+		if (step == *h)
+		{
+			// steps cut by the end or the burnout tell little
+			*h = step * min(5., .9 * pow(max(error, 1e-10), -1./5));
+		}
+
+		enum event event = check_events(y, propellant, e);
+		if (event != EVENT_NONE)
+			return event;
+	}
+	return EVENT_NONE;
+}
@@ -0,0 +1,178 @@
+#include <Python.h>
+
+#include "integrate.c"
+
+static int parse_state(Py_buffer* buffer)
+{
+	/* Check that `buffer` holds a state (STATE_SIZE doubles) */
+	if (buffer->len != STATE_SIZE * (Py_ssize_t) sizeof(double))
+	{
+		PyErr_Format(PyExc_ValueError, "state must be %d doubles", STATE_SIZE);
+		PyBuffer_Release(buffer);
+		return 0;
+	}
+	return 1;
+}
+
+static PyObject* wrapper_rk4(PyObject* self, PyObject* args)
+{
+	(void) self;
+
+	struct vessel v;
+	Py_buffer state;
+	double h;
+	long k;
+	struct events e = {0., INFINITY};
+
+	if (!PyArg_ParseTuple(args, "ddw*(ddd)dddl|dd", &v.mu, &v.radius, &state,
+		&v.thrust[0], &v.thrust[1], &v.thrust[2],
+		&v.expulsion_rate, &v.dry_mass, &h, &k,
+		&e.radius_min, &e.radius_max
+	))
+		return NULL;
+	if (!parse_state(&state))
+		return NULL;
+
+	long steps;
+	enum event event;
+	Py_BEGIN_ALLOW_THREADS
+	event = integrate_rk4(&v, state.buf, h, k, &e, &steps);
+	Py_END_ALLOW_THREADS
+	PyBuffer_Release(&state);
+
+	return Py_BuildValue("il", event, steps);
+}
+
+static PyObject* wrapper_rk4_ensemble(PyObject* self, PyObject* args)
+{
+	(void) self;
+
+	double mu;
+	double radius;
+	Py_buffer state;
+	Py_buffer out;
+	Py_buffer acceleration;
+	Py_buffer h;
+
+	if (!PyArg_ParseTuple(args, "ddy*w*y*y*", &mu, &radius, &state, &out,
+		&acceleration, &h
+	))
+		return NULL;
+	Py_ssize_t n = h.len / (Py_ssize_t) sizeof(double);
+	if (state.len != 6 * n * (Py_ssize_t) sizeof(double) ||
+		out.len != state.len ||
+		acceleration.len != 3 * n * (Py_ssize_t) sizeof(double))
+	{
+		PyErr_SetString(PyExc_ValueError,
+			"state, out and acceleration must be 6, 6 and 3 doubles per step of h");
+		PyBuffer_Release(&state);
+		PyBuffer_Release(&out);
+		PyBuffer_Release(&acceleration);
+		PyBuffer_Release(&h);
+		return NULL;
+	}
+
+	Py_BEGIN_ALLOW_THREADS
+	integrate_rk4_ensemble(mu, radius, state.buf, out.buf, acceleration.buf, h.buf, n);
+	Py_END_ALLOW_THREADS
+	PyBuffer_Release(&state);
+	PyBuffer_Release(&out);
+	PyBuffer_Release(&acceleration);
+	PyBuffer_Release(&h);
+
+	Py_RETURN_NONE;
+}
+
+static PyObject* wrapper_adaptive(PyObject* self, PyObject* args)
+{
+	(void) self;
+
+	struct vessel v;
+	Py_buffer state;
+	double duration;
+	double tolerance;
+	double h;
+	struct events e = {0., INFINITY};
+
+	if (!PyArg_ParseTuple(args, "ddw*(ddd)ddddd|dd", &v.mu, &v.radius, &state,
+		&v.thrust[0], &v.thrust[1], &v.thrust[2],
+		&v.expulsion_rate, &v.dry_mass, &duration, &tolerance, &h,
+		&e.radius_min, &e.radius_max
+	))
+		return NULL;
+	if (!parse_state(&state))
+		return NULL;
+	int finite = isfinite(v.mu) && isfinite(v.radius) &&
+		isfinite(v.thrust[0]) && isfinite(v.thrust[1]) && isfinite(v.thrust[2]) &&
+		isfinite(v.expulsion_rate) && isfinite(v.dry_mass) &&
+		isfinite(duration) && isfinite(tolerance) && isfinite(h);
+	const double* y = state.buf;
+	for (int i = 0; i < STATE_SIZE; i++)
+		finite = finite && isfinite(y[i]);
+	if (!finite || h <= 0. || tolerance <= 0.)
+	{
+		PyErr_SetString(PyExc_ValueError,
+			"inputs must be finite, and h and tolerance positive");
+		PyBuffer_Release(&state);
+		return NULL;
+	}
+
+	double elapsed;
+	enum event event;
+	Py_BEGIN_ALLOW_THREADS
+	event = integrate_adaptive(&v, state.buf, duration, tolerance, &h, &e, &elapsed);
+	Py_END_ALLOW_THREADS
+	PyBuffer_Release(&state);
+
+	return Py_BuildValue("idd", event, elapsed, h);
+}
+
+static PyMethodDef methods[] =
+{
+	{
+		"rk4", wrapper_rk4, METH_VARARGS,
+		"rk4(mu, radius, state, thrust, expulsion_rate, dry_mass, h, k"
+		"[, radius_min, radius_max]) -> (event, steps)\n\n"
+		"Run up to k Runge-Kutta 4 steps of h seconds on state, a writable\n"
+		"buffer of 7 doubles (position, velocity, propellant)",
+	},
+	{
+		"rk4_ensemble", wrapper_rk4_ensemble, METH_VARARGS,
+		"rk4_ensemble(mu, radius, state, out, acceleration, h) -> None\n\n"
+		"Run a Runge-Kutta 4 step of h[j] seconds for each rocket j, from\n"
+		"state to out, buffers of shape (6, n) (position, velocity);\n"
+		"acceleration, of shape (3, n), is the acceleration due to the thrust",
+	},
+	{
+		"adaptive", wrapper_adaptive, METH_VARARGS,
+		"adaptive(mu, radius, state, thrust, expulsion_rate, dry_mass,"
+		" duration, tolerance, h[, radius_min, radius_max])"
+		" -> (event, elapsed, h)\n\n"
+		"Integrate state for duration seconds with Dormand-Prince steps,\n"
+		"starting with a step of h seconds; elapsed is less than duration\n"
+		"when the step underflows",
+	},
+	{NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef moduledef = {
+	PyModuleDef_HEAD_INIT, "Integration of the trajectories of rockets",
+	NULL, 0, methods,
+	NULL, NULL, NULL, NULL,
+};
+
+PyMODINIT_FUNC PyInit_integrate()
+{
+	PyObject* module = PyModule_Create(&moduledef);
+	if (module == NULL)
+		return NULL;
+	if (PyModule_AddIntConstant(module, "EVENT_NONE", EVENT_NONE) < 0 ||
+		PyModule_AddIntConstant(module, "EVENT_BURNOUT", EVENT_BURNOUT) < 0 ||
+		PyModule_AddIntConstant(module, "EVENT_RADIUS_BELOW", EVENT_RADIUS_BELOW) < 0 ||
+		PyModule_AddIntConstant(module, "EVENT_RADIUS_ABOVE", EVENT_RADIUS_ABOVE) < 0)
+	{
+		Py_DECREF(module);
+		return NULL;
+	}
+	return module;
+}
@@ -0,0 +1,285 @@
+"""Checkpoints of simulations
+
+A checkpoint records the state of some vessels (see spyce.rocket.Rocket) at
+a given time, in a compact binary form: state vectors, orientation, parts,
+propellant, primary, and flight program. The simulation can then be restored
+from the checkpoint, or forked several times, without simulating again what
+happened before; for instance, all the variants of a mission can branch from
+the checkpoint of a shared ascent.
+
+The celestial bodies are not saved, but referenced by name. The flight
+programs must be instances of spyce.program.FlightProgram waiting for
+spyce.conditions.Condition objects, since generators cannot be saved.
+
+The format is a sequence of tagged values, in little endian:
+
+    N, T, F    None, True, False
+    i          int (int64)
+    d          float (float64)
+    s          str (uint32 length, then UTF-8)
+    l          list (uint32 length, then the items)
+    m          dict (uint32 length, then the keys and values)
+    v          Vec3 (3 float64)
+    M          Mat3 (9 float64)
+    b          celestial body (name, as a str)
+    o          object (class as "module:name", then its attributes as a dict)
+
+Only the classes of SAVED_CLASSES, and their subclasses already defined, are
+restored; no module is imported when reading a checkpoint.
+"""
+
+import io
+import struct
+
+from spyce.vector import Vec3, Mat3
+import spyce.body
+import spyce.conditions
+import spyce.program
+import spyce.rocket
+import spyce.universe
+
+MAGIC = b"SPYCECK"
+VERSION = 1
+
+# the classes whose instances are saved with their attributes
+SAVED_CLASSES = (
+    spyce.conditions.Condition,
+    spyce.program.FlightProgram,
+    spyce.rocket.RocketPart,
+)
+
+# the attributes of a Rocket which are saved; the others are derived
+ROCKET_ATTRIBUTES = (
+    "name", "position", "velocity", "acceleration", "orientation",
+    "prograde", "throttle", "propellant", "resume_time_program",
+    "condition_triggered",
+)
+
+_int = struct.Struct("<q")
+_float = struct.Struct("<d")
+_length = struct.Struct("<I")
+_vector = struct.Struct("<3d")
+_matrix = struct.Struct("<9d")
+_header = struct.Struct("<7sH")
+
+
+class CheckpointError(Exception):
+    """The state cannot be saved, or the checkpoint cannot be read"""
+
+
+def _class_tag(cls):
+    """Name of a class in checkpoints"""
+    return "%s:%s" % (cls.__module__, cls.__qualname__)
+
+
+def _saved_classes():
+    """Map the names of SAVED_CLASSES and their subclasses to the classes"""
+    classes = {}
+    stack = list(SAVED_CLASSES)
+    while stack:
+        cls = stack.pop()
+        classes[_class_tag(cls)] = cls
+        stack.extend(cls.__subclasses__())
+    return classes
+
+
+def _write(stream, value):
+    """Write the encoding of `value` to the binary `stream`"""
+    if value is None:
+        stream.write(b"N")
+    elif value is True:
+        stream.write(b"T")
+    elif value is False:
+        stream.write(b"F")
+    elif isinstance(value, int):
+        stream.write(b"i" + _int.pack(value))
+    elif isinstance(value, float):
+        stream.write(b"d" + _float.pack(value))
+    elif isinstance(value, str):
+        data = value.encode()
+        stream.write(b"s" + _length.pack(len(data)) + data)
+    elif isinstance(value, Vec3):
+        stream.write(b"v" + _vector.pack(*value))
+    elif isinstance(value, Mat3):
+        stream.write(b"M" + _matrix.pack(*(x for row in value for x in row)))
+    elif isinstance(value, (list, tuple)):
+        stream.write(b"l" + _length.pack(len(value)))
+        for item in value:
+            _write(stream, item)
+    elif isinstance(value, dict):
+        stream.write(b"m" + _length.pack(len(value)))
+        for key, item in value.items():
+            _write(stream, key)
+            _write(stream, item)
+    elif isinstance(value, spyce.body.CelestialBody):
+        stream.write(b"b")
+        _write(stream, value.name)
+    elif isinstance(value, SAVED_CLASSES):
+        stream.write(b"o")
+        _write(stream, _class_tag(type(value)))
+        _write(stream, vars(value))
+    else:
+        raise CheckpointError("cannot save %r" % (value,))
+
+
+def _read(stream, bodies):
+    """Decode the next value of the binary `stream`
+
+    `bodies` maps the names of the celestial bodies to the bodies.
+    """
+    tag = stream.read(1)
+    if tag == b"N":
+        return None
+    elif tag == b"T":
+        return True
+    elif tag == b"F":
+        return False
+    elif tag == b"i":
+        return _int.unpack(stream.read(_int.size))[0]
+    elif tag == b"d":
+        return _float.unpack(stream.read(_float.size))[0]
+    elif tag == b"s":
+        length, = _length.unpack(stream.read(_length.size))
+        return stream.read(length).decode()
+    elif tag == b"v":
+        return Vec3(_vector.unpack(stream.read(_vector.size)))
+    elif tag == b"M":
+        m = _matrix.unpack(stream.read(_matrix.size))
+        return Mat3([list(m[0:3]), list(m[3:6]), list(m[6:9])])
+    elif tag == b"l":
+        length, = _length.unpack(stream.read(_length.size))
+        return [_read(stream, bodies) for _ in range(length)]
+    elif tag == b"m":
+        length, = _length.unpack(stream.read(_length.size))
+        items = {}
+        for _ in range(length):
+            key = _read(stream, bodies)
+            items[key] = _read(stream, bodies)
+        return items
+    elif tag == b"b":
+        name = _read(stream, bodies)
+        try:
+            return bodies[name]
+        except KeyError:
+            raise CheckpointError("unknown celestial body %s" % name)
+    elif tag == b"o":
+        name = _read(stream, bodies)
+        try:
+            cls = _saved_classes()[name]
+        except (KeyError, TypeError):
+            raise CheckpointError("cannot restore %r" % (name,))
+        value = cls.__new__(cls)
+        value.__dict__.update(_read(stream, bodies))
+        return value
+    raise CheckpointError("invalid tag %r" % tag)
+
+
+def _rocket_state(rocket):
+    """Saved attributes of a rocket"""
+    program = rocket.flight_program
+    if program is not None and \
+            not isinstance(program, spyce.program.FlightProgram):
+        raise CheckpointError("%s does not run a FlightProgram" % rocket)
+    state = {name: getattr(rocket, name) for name in ROCKET_ATTRIBUTES}
+    state["position"] = Vec3(rocket.position)
+    state["velocity"] = Vec3(rocket.velocity)
+    state["primary"] = rocket.primary
+    state["parts"] = list(rocket.parts)
+    state["program"] = program
+    return state
+
+
+def _restore_rocket(state, time, universe):
+    """Rocket with the saved attributes, at `time` (s)"""
+    rocket = spyce.rocket.Rocket(state["primary"], universe=universe)
+    rocket |= set(state["parts"])
+    for name in ROCKET_ATTRIBUTES:
+        setattr(rocket, name, state[name])
+    rocket.update_orbit(time)
+    program = state["program"]
+    if program is not None:
+        program.resume(rocket)
+    rocket.update_resume_time()
+    return rocket
+
+
+class Checkpoint:
+    """State of some vessels at a given time"""
+    def __init__(self, data):
+        """Checkpoint from its binary form (see Checkpoint.save())"""
+        self.data = bytes(data)
+        magic, version = _header.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise CheckpointError("not a checkpoint of version %i" % VERSION)
+        # peek the time, and the names of the bodies of the universe
+        stream = io.BytesIO(self.data[_header.size:])
+        self.time = _read(stream, {})
+        self.body_names = _read(stream, {})
+
+    def __repr__(self):
+        return "<Checkpoint at %g s (%i bytes)>" % (self.time, len(self.data))
+
+    @classmethod
+    def save(cls, time, vessels, universe=None):
+        """Checkpoint of `vessels` (Rocket) at `time` (s)
+
+        The vessels must have been simulated up to `time` (see
+        Scheduler.synchronize()). When given a Universe, the selection of
+        its bodies is saved as well (see Checkpoint.fork()).
+        """
+        stream = io.BytesIO()
+        stream.write(_header.pack(MAGIC, VERSION))
+        _write(stream, float(time))
+        if universe is None:
+            _write(stream, None)
+        else:
+            _write(stream, sorted(body.name for body in universe.bodies))
+        _write(stream, [_rocket_state(vessel) for vessel in vessels])
+        return cls(stream.getvalue())
+
+    @classmethod
+    def from_universe(cls, time, universe):
+        """Checkpoint of all the vessels of `universe` at `time` (s)"""
+        return cls.save(time, universe.vessels(), universe)
+
+    def restore(self, bodies, universe=None):
+        """New vessels in the saved state
+
+        `bodies` maps the names of the celestial bodies to the bodies (e.g.
+        spyce.load.kerbol). When given a Universe, the vessels are added to
+        it.
+        """
+        if isinstance(bodies, spyce.universe.Universe):
+            bodies = bodies.bodies
+        if not isinstance(bodies, dict):
+            bodies = {body.name: body for body in bodies}
+        stream = io.BytesIO(self.data[_header.size:])
+        _read(stream, bodies)  # time
+        _read(stream, bodies)  # names of the bodies of the universe
+        states = _read(stream, bodies)
+        return [
+            _restore_rocket(state, self.time, universe) for state in states
+        ]
+
+    def fork(self, bodies):
+        """New Universe with new vessels in the saved state
+
+        The universe selects the same bodies as the saved one, if any, or
+        all of `bodies` (a mapping from names to bodies) otherwise.
+        """
+        if self.body_names is None:
+            universe = spyce.universe.Universe(bodies)
+        else:
+            universe = spyce.universe.Universe(
+                bodies[name] for name in self.body_names)
+        self.restore(bodies, universe)
+        return universe
+
+    def dump(self, f):
+        """Write the checkpoint to a binary file object"""
+        f.write(self.data)
+
+    @classmethod
+    def load(cls, f):
+        """Read a checkpoint from a binary file object"""
+        return cls(f.read())
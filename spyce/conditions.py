@@ -0,0 +1,248 @@
+"""Declarative conditions for flight programs
+
+A flight program yields the conditions to wait for. Arbitrary functions must
+be polled after every step of the simulation, while a Condition describes
+what it is waiting for, so that the simulation can predict when it is met:
+
+* while coasting, the time of trigger is found analytically on the Kepler
+  orbit; the rocket then sleeps until then
+* while thrusting, the condition is checked after every step, and the time
+  of trigger inside the step is located by bisection
+
+In both cases, the step of the simulation is split at the trigger, where the
+flight program is resumed (see Rocket.update_physics()).
+
+For instance:
+
+    def program(rocket):
+        yield AltitudeAbove(10e3)
+        rocket.rotate(radians(-45), 1, 0, 0)
+        yield ApoapsisAbove(700e3)
+        rocket.throttle = 0.
+        yield TrueAnomalyReached(math.pi)
+"""
+
+import math
+
+import spyce.patched_conics
+
+
+class Condition:
+    """Condition awaited by a flight program
+
+    A condition is met when its value is non-negative.
+    """
+    def begin(self, rocket, time):
+        """Called when the flight program starts waiting, at `time` (s)"""
+
+    def value(self, rocket, time):
+        """Non-negative when the condition is met by `rocket` at `time` (s)"""
+        raise NotImplementedError
+
+    def is_met(self, rocket, time):
+        """Whether the condition is met by `rocket` at `time` (s)"""
+        return self.value(rocket, time) >= 0
+
+    def trigger_time(self, rocket, time):
+        """Time (s) when the condition is met, if `rocket` keeps coasting
+
+        The condition is not met at `time`. Return math.inf if it is never
+        met on the current orbit, or None if it cannot be predicted (then,
+        the condition is polled).
+        """
+        return None
+
+    def delay(self, rocket, time, step):
+        """Delay (s) before resuming the flight program
+
+        Return 0 when the condition is met at `time` (s), the delay until
+        its trigger when it can be predicted, and `step` (s) otherwise, so
+        that it is checked again after the step.
+        """
+        if self.is_met(rocket, time):
+            return 0
+        if rocket.throttle:
+            return step
+        trigger = self.trigger_time(rocket, time)
+        if trigger is None:
+            return step
+        return max(trigger - time, 0)
+
+
+def _next_time_at_true_anomaly(orbit, true_anomaly, time):
+    """Next time (s) after `time` when `orbit` is at `true_anomaly`"""
+    if math.isnan(true_anomaly):
+        return math.inf
+    trigger = orbit.time_at_true_anomaly(true_anomaly)
+    trigger = spyce.patched_conics.next_occurrence(orbit, trigger, time)
+    if trigger < time:  # past point of an open orbit
+        return math.inf
+    return trigger
+
+
+class AltitudeAbove(Condition):
+    """Altitude above the surface of the primary greater than a threshold"""
+    def __init__(self, altitude):
+        """Condition for `altitude` (m)"""
+        self.altitude = altitude
+
+    def __repr__(self):
+        return "<%s %g m>" % (type(self).__name__, self.altitude)
+
+    def value(self, rocket, time):
+        return rocket.position.norm() - rocket.primary.radius - self.altitude
+
+    def trigger_time(self, rocket, time):
+        distance = rocket.primary.radius + self.altitude
+        v = rocket.orbit.true_anomaly_at_distance(distance)
+        # the distance increases from periapsis to apoapsis
+        return _next_time_at_true_anomaly(rocket.orbit, v, time)
+
+
+class AltitudeBelow(AltitudeAbove):
+    """Altitude above the surface of the primary lower than a threshold"""
+    def value(self, rocket, time):
+        return -super().value(rocket, time)
+
+    def trigger_time(self, rocket, time):
+        distance = rocket.primary.radius + self.altitude
+        v = rocket.orbit.true_anomaly_at_distance(distance)
+        return _next_time_at_true_anomaly(rocket.orbit, -v, time)
+
+
+class ApoapsisAbove(Condition):
+    """Apoapsis (from the center of the primary) greater than a threshold
+
+    The apoapsis of an open orbit is infinite. Since the orbit does not
+    change while coasting, the condition is then either met or never met.
+    """
+    def __init__(self, distance):
+        """Condition for `distance` (m)"""
+        self.distance = distance
+
+    def __repr__(self):
+        return "<%s %g m>" % (type(self).__name__, self.distance)
+
+    def apsis(self, rocket):
+        orbit = rocket.orbit
+        return orbit.apoapsis if orbit.eccentricity < 1 else math.inf
+
+    def value(self, rocket, time):
+        return self.apsis(rocket) - self.distance
+
+    def trigger_time(self, rocket, time):
+        return math.inf
+
+
+class ApoapsisBelow(ApoapsisAbove):
+    """Apoapsis (from the center of the primary) lower than a threshold"""
+    def value(self, rocket, time):
+        return self.distance - self.apsis(rocket)
+
+
+class PeriapsisAbove(ApoapsisAbove):
+    """Periapsis (from the center of the primary) greater than a threshold"""
+    def apsis(self, rocket):
+        return rocket.orbit.periapsis
+
+
+class PeriapsisBelow(PeriapsisAbove):
+    """Periapsis (from the center of the primary) lower than a threshold"""
+    def value(self, rocket, time):
+        return self.distance - self.apsis(rocket)
+
+
+class TimeReached(Condition):
+    """Absolute time of the simulation"""
+    def __init__(self, time):
+        """Condition for `time` (s)"""
+        self.time = time
+
+    def __repr__(self):
+        return "<%s %g s>" % (type(self).__name__, self.time)
+
+    def value(self, rocket, time):
+        return time - self.time
+
+    def trigger_time(self, rocket, time):
+        return self.time
+
+
+class TimeElapsed(TimeReached):
+    """Duration since the flight program started waiting"""
+    def __init__(self, duration):
+        """Condition for `duration` (s)"""
+        self.duration = duration
+        self.time = math.inf  # until the program waits for it
+
+    def __repr__(self):
+        return "<%s %g s>" % (type(self).__name__, self.duration)
+
+    def begin(self, rocket, time):
+        self.time = time + self.duration
+
+
+class PropellantEmpty(Condition):
+    """All the propellant of the rocket has been used"""
+    def __repr__(self):
+        return "<%s>" % type(self).__name__
+
+    def value(self, rocket, time):
+        return -rocket.propellant
+
+    def trigger_time(self, rocket, time):
+        # no propellant is used while coasting
+        return math.inf
+
+
+class TrueAnomalyReached(Condition):
+    """Rocket passing at a given true anomaly
+
+    The condition is met during the quarter of revolution following the
+    true anomaly, so that it is not missed by a step of the simulation.
+    """
+    def __init__(self, true_anomaly):
+        """Condition for `true_anomaly` (rad)"""
+        self.true_anomaly = true_anomaly
+
+    def __repr__(self):
+        return "<%s %g rad>" % (type(self).__name__, self.true_anomaly)
+
+    def value(self, rocket, time):
+        v = rocket.orbit.true_anomaly_at_time(time)
+        # angle since the true anomaly, in [-pi, pi)
+        angle = (v - self.true_anomaly + math.pi) % (2*math.pi) - math.pi
+        if angle >= math.pi / 2:
+            return -angle
+        return angle
+
+    def trigger_time(self, rocket, time):
+        return _next_time_at_true_anomaly(
+            rocket.orbit, self.true_anomaly, time)
+
+
+class AnyOf(Condition):
+    """Met when any of the given conditions is met"""
+    def __init__(self, *conditions):
+        self.conditions = conditions
+
+    def __repr__(self):
+        return "<%s %s>" % (type(self).__name__, list(self.conditions))
+
+    def begin(self, rocket, time):
+        for condition in self.conditions:
+            condition.begin(rocket, time)
+
+    def value(self, rocket, time):
+        return max(
+            condition.value(rocket, time) for condition in self.conditions
+        )
+
+    def trigger_time(self, rocket, time):
+        triggers = [
+            condition.trigger_time(rocket, time)
+            for condition in self.conditions
+        ]
+        if None in triggers:
+            return None
+        return min(triggers)
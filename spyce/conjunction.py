@@ -0,0 +1,302 @@
+"""Conjunction screening for catalogs of orbits
+
+Find every pair of orbits, among many orbits around the same primary, whose
+distance drops below some threshold within a time window. This follows the
+classic sieve of Hoots et al. ("An analytic method to determine future close
+approaches between satellites", 1984), where each filter only lets through
+the pairs which may still come close:
+
+* apsis filter: the ranges of distances to the primary must overlap
+* orbit path filter: the orbits must come close near the line of intersection
+  of their orbital planes
+* time filter: the distance between the two objects is sampled over the time
+  window, and its local minima are refined
+
+Every filter works on whole arrays of pairs; the time filter can also be
+distributed over several processes.
+"""
+
+import math
+import concurrent.futures
+
+import numpy
+
+import spyce.kepler
+import spyce.orbit_array
+
+
+def apsis_filter(orbits, threshold, block_size=1024):
+    """Pairs of orbits whose ranges of distances overlap
+
+    `orbits` is an OrbitArray. The pairs are returned as an array of shape
+    (n, 2) of indices (i, j) with i < j. To bound memory usage, orbits are
+    compared by blocks of `block_size` against all the others.
+    """
+    periapsis = orbits.periapsis
+    apoapsis = numpy.where(orbits.eccentricity < 1, orbits.apoapsis,
+                           numpy.inf)
+    pairs = []
+    for start in range(0, len(orbits), block_size):
+        stop = min(start + block_size, len(orbits))
+        first = numpy.arange(start, stop)[:, None]
+        second = numpy.arange(start, len(orbits))[None, :]
+        mask = (
+            (first < second) &
+            (periapsis[second] <= apoapsis[first] + threshold) &
+            (periapsis[first] <= apoapsis[second] + threshold)
+        )
+        i, j = numpy.nonzero(mask)
+        pairs.append(numpy.stack([i + start, j + start], axis=-1))
+    return numpy.concatenate(pairs) if pairs else numpy.empty((0, 2), int)
+
+
+def radius_range(periapsis, eccentricity, true_anomaly, half_width):
+    """Distances to the primary over windows of true anomalies
+
+    The windows are centered on `true_anomaly`, and are `half_width` wide on
+    each side (at most math.pi/2). Return the minimal and maximal distances.
+    """
+    e = eccentricity
+    p = periapsis * (1 + e)
+    center = numpy.remainder(true_anomaly + numpy.pi, 2*numpy.pi) - numpy.pi
+    cos_a = numpy.cos(center - half_width)
+    cos_b = numpy.cos(center + half_width)
+    max_cos = numpy.where(abs(center) <= half_width, 1.,
+                          numpy.maximum(cos_a, cos_b))
+    min_cos = numpy.where(abs(center) >= numpy.pi - half_width, -1.,
+                          numpy.minimum(cos_a, cos_b))
+    closed = e < 1
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        lower = numpy.where(closed, p / (1 + e*max_cos), periapsis)
+        upper = numpy.where(closed, p / (1 + e*min_cos), numpy.inf)
+    return lower, upper
+
+
+def orbit_path_filter(orbits, pairs, threshold, block_size=65536):
+    """Mask of the pairs whose orbit paths come within `threshold` (m)
+
+    Two objects can only be close to each other when both are close to the
+    line of intersection of their orbital planes; for an object at distance r
+    of the primary and at an angle d from this line, the distance to the other
+    plane is r sin(d) sin(I), where I is the mutual inclination of the
+    orbits. The distances to the primary within these windows must then
+    overlap. The test is conservative: no close approach is discarded.
+
+    The pairs are processed by blocks of `block_size`.
+    """
+    transform = spyce.kepler.rotation_matrices(
+        orbits.longitude_of_ascending_node, orbits.inclination,
+        orbits.argument_of_periapsis,
+    )
+    periapsis = orbits.periapsis
+    eccentricity = orbits.eccentricity
+
+    mask = numpy.empty(len(pairs), dtype=bool)
+    for start in range(0, len(pairs), block_size):
+        block = pairs[start:start+block_size]
+        first, second = block[:, 0], block[:, 1]
+
+        # line of intersection of the orbital planes
+        node = numpy.cross(transform[first, :, 2], transform[second, :, 2])
+        sin_mutual_inclination = numpy.linalg.norm(node, axis=-1)
+        block_mask = sin_mutual_inclination * \
+            numpy.minimum(periapsis[first], periapsis[second]) <= threshold
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            node /= sin_mutual_inclination[:, None]
+
+        ranges = []
+        for index in (first, second):
+            # true anomaly of the node, and half-width of the window
+            true_anomaly = numpy.arctan2(
+                numpy.einsum('...i,...i->...', node, transform[index, :, 1]),
+                numpy.einsum('...i,...i->...', node, transform[index, :, 0]),
+            )
+            with numpy.errstate(divide='ignore', invalid='ignore'):
+                ratio = threshold / (periapsis[index] * sin_mutual_inclination)
+            half_width = numpy.arcsin(
+                numpy.clip(numpy.nan_to_num(ratio), 0, 1))
+            ranges.append([
+                radius_range(periapsis[index], eccentricity[index],
+                             true_anomaly + offset, half_width)
+                # ascending and descending nodes
+                for offset in (0, numpy.pi)
+            ])
+
+        for (lower_a, upper_a), (lower_b, upper_b) in zip(*ranges):
+            block_mask |= (
+                (lower_a <= upper_b + threshold) &
+                (lower_b <= upper_a + threshold)
+            )
+        mask[start:start+block_size] = block_mask
+    return mask
+
+
+def default_step(orbits, start, end, samples_per_period=32):
+    """Sampling step (s) resolving the shortest period of the orbits"""
+    closed = orbits.period[numpy.isfinite(orbits.period)]
+    step = end - start
+    if len(closed):
+        step = min(step, closed.min() / samples_per_period)
+    return step
+
+
+class Primary:
+    """Stand-in for the primary, to send orbits to other processes"""
+    def __init__(self, gravitational_parameter):
+        self.gravitational_parameter = gravitational_parameter
+
+
+def refine(orbits, first, second, a, b, tolerance):
+    """Batched golden section search for the closest approaches
+
+    Look for the minimal distance of each pair within (a, b). Return the
+    times and the distances.
+    """
+    golden_ratio = (math.sqrt(5) + 1) / 2
+    first_orbits, second_orbits = orbits[first], orbits[second]
+
+    def f(time):
+        difference = first_orbits.position_at_time(time) - \
+            second_orbits.position_at_time(time)
+        return numpy.linalg.norm(difference, axis=-1)
+
+    width = numpy.max(b - a, initial=0)
+    iterations = max(0, math.ceil(
+        math.log(max(width, tolerance) / tolerance) / math.log(golden_ratio)))
+    c = b - (b - a) / golden_ratio
+    d = a + (b - a) / golden_ratio
+    fc, fd = f(c), f(d)
+    for _ in range(iterations):
+        left = fc < fd
+        # minimum in (a, d): d becomes c; otherwise in (c, b): c becomes d
+        b = numpy.where(left, d, b)
+        a = numpy.where(left, a, c)
+        new_c = b - (b - a) / golden_ratio
+        new_d = a + (b - a) / golden_ratio
+        c, d = numpy.where(left, new_c, d), numpy.where(left, c, new_d)
+        new = numpy.where(left, c, d)
+        fnew = f(new)
+        fc, fd = numpy.where(left, fnew, fd), numpy.where(left, fc, fnew)
+    time = (a + b) / 2
+    return time, f(time)
+
+
+def time_filter(orbits, pairs, start, end, threshold, step=None,
+                tolerance=1e-3, pair_block_size=4096, time_block_size=256):
+    """Close approaches of pairs of orbits within [start, end] (s)
+
+    The distance of each pair is sampled every `step` (s) (default:
+    default_step()); each local minimum that may be lower than `threshold` (m)
+    is refined to a precision of `tolerance` (s). Return the list of the
+    close approaches, as tuples (i, j, time, distance).
+    """
+    if step is None:
+        step = default_step(orbits, start, end)
+    count = max(1, math.ceil((end - start) / step))
+    times = numpy.linspace(start, end, count + 1)
+    step = (end - start) / count
+
+    # bound on relative speeds, to skip minima which cannot get close enough
+    max_speed = numpy.sqrt(orbits.primary.gravitational_parameter *
+                           (1 + orbits.eccentricity) / orbits.periapsis)
+
+    conjunctions = []
+    for block_start in range(0, len(pairs), pair_block_size):
+        block = pairs[block_start:block_start+pair_block_size]
+
+        # only propagate the orbits involved in this block
+        involved, local = numpy.unique(block, return_inverse=True)
+        local = local.reshape(block.shape)
+        sub = orbits[involved]
+        first, second = local[:, 0], local[:, 1]
+        speed = max_speed[block[:, 0]] + max_speed[block[:, 1]]
+
+        candidates = []
+        for k in range(0, len(times), time_block_size):
+            # one extra sample on each side to detect local minima
+            lo, hi = max(k - 1, 0), min(k + time_block_size + 1, len(times))
+            position = sub.position_at_time(times[lo:hi, None])
+            d = numpy.linalg.norm(position[:, first] - position[:, second],
+                                  axis=-1)
+            # distances outside of the window are infinite
+            if lo == 0:
+                d = numpy.concatenate([numpy.full((1, len(block)), numpy.inf),
+                                       d])
+                lo -= 1
+            if hi == len(times):
+                d = numpy.concatenate([d, numpy.full((1, len(block)),
+                                                     numpy.inf)])
+            middle = d[1:-1]
+            minimum = (middle <= d[:-2]) & (middle <= d[2:])
+            minimum &= middle - speed * step <= threshold
+            index, pair = numpy.nonzero(minimum)
+            index += lo + 1  # index in times
+            kept = (index >= k) & (index < k + time_block_size)
+            candidates.append((index[kept], pair[kept]))
+
+        index = numpy.concatenate([c[0] for c in candidates])
+        pair = numpy.concatenate([c[1] for c in candidates])
+        if not len(index):
+            continue
+        a = times[numpy.maximum(index - 1, 0)]
+        b = times[numpy.minimum(index + 1, len(times) - 1)]
+        time, distance = refine(sub, first[pair], second[pair], a, b,
+                                tolerance)
+        close = distance <= threshold
+        for (i, j), t, dist in zip(block[pair[close]], time[close],
+                                   distance[close]):
+            conjunctions.append((int(i), int(j), float(t), float(dist)))
+    return conjunctions
+
+
+def _time_filter_task(args):
+    """Run time_filter() in a worker process (see screen())"""
+    data, mu, pairs, start, end, threshold, step, tolerance = args
+    orbits = spyce.orbit_array.OrbitArray.from_data(Primary(mu), data)
+    return time_filter(orbits, pairs, start, end, threshold, step, tolerance)
+
+
+def screen(orbits, start, end, threshold, step=None, tolerance=1e-3,
+           processes=None, chunk_size=16384):
+    """Close approaches of all pairs of orbits within [start, end] (s)
+
+    `orbits` is an OrbitArray. Return the close approaches below `threshold`
+    (m) as a list of tuples (i, j, time, distance) sorted by time, where i
+    and j are the indices of the orbits (i < j). A pair is reported once for
+    each local minimum of its distance.
+
+    If `processes` is given, the time filter is split in chunks of
+    `chunk_size` pairs, run by as many worker processes (0 picks the number
+    of processors).
+    """
+    if step is None:
+        step = default_step(orbits, start, end)
+
+    pairs = apsis_filter(orbits, threshold)
+    pairs = pairs[orbit_path_filter(orbits, pairs, threshold)]
+
+    if processes is None:
+        conjunctions = time_filter(orbits, pairs, start, end, threshold,
+                                   step, tolerance)
+    else:
+        mu = orbits.primary.gravitational_parameter
+        tasks = []
+        for chunk_start in range(0, len(pairs), chunk_size):
+            chunk = pairs[chunk_start:chunk_start+chunk_size]
+            # only send the orbits involved in the chunk
+            involved, local = numpy.unique(chunk, return_inverse=True)
+            local = local.reshape(chunk.shape)
+            tasks.append((involved, (
+                numpy.ascontiguousarray(orbits.data[:, involved]), mu, local,
+                start, end, threshold, step, tolerance,
+            )))
+        conjunctions = []
+        with concurrent.futures.ProcessPoolExecutor(processes or None) as pool:
+            results = pool.map(_time_filter_task, [args for _, args in tasks])
+            for (involved, _), result in zip(tasks, results):
+                conjunctions.extend(
+                    (int(involved[i]), int(involved[j]), t, d)
+                    for i, j, t, d in result
+                )
+    conjunctions.sort(key=lambda conjunction: conjunction[2])
+    return conjunctions
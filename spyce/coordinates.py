@@ -38,12 +38,10 @@ class CelestialCoordinates:
         then refer either to a point infinitely far away, or to a direction.
         """
         e = cls.obliquity_of_the_ecliptic
-        ecliptic_longitude = math.atan(
-            (
-                math.sin(right_ascension) * math.cos(e) +
-                math.tan(declination) * math.sin(e)
-            )
-            / math.cos(right_ascension)
+        ecliptic_longitude = math.atan2(
+            math.sin(right_ascension) * math.cos(e) +
+            math.tan(declination) * math.sin(e),
+            math.cos(right_ascension),
         )
         ecliptic_latitude = math.asin(
             math.sin(declination) * math.cos(e) -
@@ -61,11 +59,10 @@ class CelestialCoordinates:
         then refer either to a point infinitely far away, or to a direction.
         """
         e = cls.obliquity_of_the_ecliptic
-        right_ascension = math.atan(
-            (
-                math.sin(ecliptic_longitude) * math.cos(e) -
-                math.tan(ecliptic_latitude) * math.sin(e)
-            ) / math.cos(ecliptic_longitude)
+        right_ascension = math.atan2(
+            math.sin(ecliptic_longitude) * math.cos(e) -
+            math.tan(ecliptic_latitude) * math.sin(e),
+            math.cos(ecliptic_longitude),
         )
         declination = math.asin(
             math.sin(ecliptic_latitude) * math.cos(e) +
@@ -0,0 +1,170 @@
+"""Coverage of the surface of a celestial body by satellites
+
+A point of the surface is covered when at least one satellite is above its
+elevation mask. Visibility is sampled over a time window, for every point,
+satellite and time at once; the work is split in chunks of times to bound
+memory usage, which can also be distributed over several processes.
+
+Intervals, gaps and coverage fractions are then derived from the sampled
+visibility, with the precision of the sampling step.
+"""
+
+import math
+import concurrent.futures
+
+import numpy
+
+import spyce.frames
+import spyce.kepler
+
+
+def grid(latitude_count, longitude_count):
+    """Latitudes and longitudes (rad) of a regular grid of points
+
+    The points are at the centers of the cells of a grid of
+    `latitude_count` by `longitude_count` cells. Return two flat arrays.
+    """
+    latitude = (numpy.arange(latitude_count) + .5) / latitude_count
+    latitude = (latitude - .5) * numpy.pi
+    longitude = (numpy.arange(longitude_count) + .5) / longitude_count
+    longitude = (longitude - .5) * 2*numpy.pi
+    latitude, longitude = numpy.meshgrid(latitude, longitude, indexing='ij')
+    return latitude.ravel(), longitude.ravel()
+
+
+def fixed_positions(primary, orbits, times):
+    """Positions of satellites in the body-fixed frame of their primary
+
+    Return an array of shape (len(orbits), len(times), 3).
+    """
+    fixed = spyce.frames.body_fixed(primary)
+    position, _ = spyce.kepler.state_at_time(list(orbits), times, fixed)
+    return position
+
+
+def visible(satellites, up, distance, sin_mask):
+    """Whether any satellite is above the elevation mask of each point
+
+    `satellites` is an array of shape (satellites, times, 3) of positions in
+    the body-fixed frame; `up` holds the unit vectors (shape (points, 3))
+    towards the points, at `distance` from the center of the body. Return
+    an array of shape (points, times).
+    """
+    count, times, _ = satellites.shape
+    satellites = satellites.reshape(-1, 3)
+    # for a spherical body, the vertical of a point is along its position
+    height = satellites @ up.T  # (satellites*times, points)
+    squared = numpy.einsum('ij,ij->i', satellites, satellites)[:, None]
+    # relative position d: sin(elevation) = d.up / |d|
+    dot = height - distance
+    norm = numpy.sqrt(squared - 2*distance*height + distance**2)
+    above = dot >= norm * sin_mask
+    above = above.reshape(count, times, -1)
+    return above.any(axis=0).T
+
+
+def _visible_task(args):
+    """Run visible() in a worker process (see visibility())"""
+    return visible(*args)
+
+
+def visibility(primary, orbits, latitude, longitude, start, end, step,
+               elevation_mask=0, altitude=0, processes=None,
+               chunk_elements=2**22):
+    """Sample the coverage of points of the surface of a body
+
+    Arguments:
+    primary         CelestialBody around which the satellites orbit
+    orbits          sequence of Orbit
+    latitude        rad, array
+    longitude       rad, array
+    start, end      s, time window
+    step            s, sampling step
+    elevation_mask  rad, minimum elevation for a satellite to be visible
+    altitude        m, altitude of the points
+    processes       if given, number of worker processes (0 for one per
+                    processor)
+
+    The latitudes, longitudes, elevation masks and altitudes are broadcast
+    against each other. Times are processed by chunks so that each holds
+    about `chunk_elements` points*satellites*times.
+
+    Return the sampling times and an array of booleans of shape (points,
+    times).
+    """
+    orbits = list(orbits)
+    latitude, longitude, elevation_mask, altitude = numpy.broadcast_arrays(
+        latitude, longitude, elevation_mask, altitude)
+    up = numpy.stack([
+        numpy.cos(latitude) * numpy.cos(longitude),
+        numpy.cos(latitude) * numpy.sin(longitude),
+        numpy.sin(latitude),
+    ], axis=-1).reshape(-1, 3)
+    distance = (primary.radius + altitude).ravel()
+    sin_mask = numpy.sin(elevation_mask).ravel()
+
+    count = max(1, math.ceil((end - start) / step))
+    times = numpy.linspace(start, end, count + 1)
+    chunk_size = max(1, chunk_elements // (len(up) * max(1, len(orbits))))
+    chunks = [times[i:i+chunk_size] for i in range(0, len(times), chunk_size)]
+
+    def tasks():
+        for chunk in chunks:
+            satellites = fixed_positions(primary, orbits, chunk)
+            yield satellites, up, distance, sin_mask
+
+    if processes is None:
+        covered = [visible(*args) for args in tasks()]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(processes or None) as pool:
+            covered = list(pool.map(_visible_task, tasks()))
+    return times, numpy.concatenate(covered, axis=1)
+
+
+def intervals(times, covered):
+    """Intervals of time during which each point is covered
+
+    `times` and `covered` are returned by visibility(). Return one list of
+    (start, end) pairs per point; the bounds are sampling times.
+    """
+    covered = numpy.atleast_2d(covered)
+    padded = numpy.zeros((len(covered), covered.shape[1] + 2), dtype=bool)
+    padded[:, 1:-1] = covered
+    change = numpy.diff(padded.astype(numpy.int8), axis=1)
+    result = []
+    for row in change:
+        starts = numpy.flatnonzero(row == 1)
+        ends = numpy.flatnonzero(row == -1) - 1
+        result.append(list(zip(times[starts].tolist(), times[ends].tolist())))
+    return result
+
+
+def gaps(times, covered):
+    """Intervals of time during which each point is not covered
+
+    See intervals()
+    """
+    return intervals(times, ~numpy.asarray(covered))
+
+
+def fraction(covered):
+    """Fraction of the time window during which each point is covered"""
+    return numpy.mean(covered, axis=-1)
+
+
+def max_gap(times, covered):
+    """Longest time (s) each point waits for coverage
+
+    A point covered at every sample has a gap of 0; a point never covered
+    has a gap equal to the whole window.
+    """
+    result = []
+    for point_gaps in gaps(times, covered):
+        longest = 0.
+        for gap_start, gap_end in point_gaps:
+            # the gap extends to the neighbouring samples (when covered)
+            first = max(numpy.searchsorted(times, gap_start) - 1, 0)
+            last = min(numpy.searchsorted(times, gap_end) + 1, len(times) - 1)
+            longest = max(longest, times[last] - times[first])
+        result.append(longest)
+    return numpy.array(result)
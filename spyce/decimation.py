@@ -0,0 +1,271 @@
+"""Decimation of long paths (recorded or predicted trajectories)
+
+* douglas_peucker() keeps as few points as possible, such that every point
+  removed is within a given distance of the simplified path
+* largest_triangle_three_buckets() keeps a given number of points, chosen
+  to preserve the visual shape of the path (e.g. for plots)
+
+Both work on points of any dimension. StreamingSimplifier applies the
+Douglas-Peucker algorithm to a path given by chunks, without keeping it in
+memory; LevelsOfDetail chains them to maintain simplifications at tolerances
+growing geometrically, so that the level matching a resolution (e.g. the
+size of a pixel when drawing) is found in constant time.
+"""
+
+import math
+
+import numpy
+
+
+def _distances_to_segment(points, a, b):
+    """Distances from each of `points` to the segment [`a`, `b`]"""
+    ab = b - a
+    ap = points - a
+    length2 = ab @ ab
+    if length2 == 0:
+        return numpy.linalg.norm(ap, axis=1)
+    t = numpy.clip(ap @ ab / length2, 0, 1)
+    return numpy.linalg.norm(ap - t[:, None] * ab, axis=1)
+
+
+def douglas_peucker(points, tolerance):
+    """Indices of the points kept by the Douglas-Peucker algorithm
+
+    Every point removed from the array `points` (of shape (n, d)) is within
+    `tolerance` of the simplified path. The first and last points are always
+    kept.
+    """
+    points = numpy.asarray(points, float)
+    n = len(points)
+    if n <= 2:
+        return numpy.arange(n)
+    keep = numpy.zeros(n, bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        distances = _distances_to_segment(
+            points[first + 1:last], points[first], points[last])
+        i = int(numpy.argmax(distances))
+        if distances[i] > tolerance:
+            i += first + 1
+            keep[i] = True
+            stack.append((first, i))
+            stack.append((i, last))
+    return numpy.flatnonzero(keep)
+
+
+def _triangle_areas(a, points, c):
+    """Areas of the triangles (a, p, c) for p in `points`"""
+    u = points - a
+    v = c - a
+    # |u x v|^2 = |u|^2 |v|^2 - (u.v)^2, in any dimension
+    squared = (u * u).sum(axis=1) * (v @ v) - (u @ v)**2
+    return numpy.sqrt(numpy.maximum(squared, 0)) / 2
+
+
+def largest_triangle_three_buckets(points, count):
+    """Indices of `count` points chosen by Largest-Triangle-Three-Buckets
+
+    The points between the first and the last ones are split in `count - 2`
+    buckets; from each bucket, the point forming the largest triangle with
+    the point kept from the previous bucket and the average of the next
+    bucket is kept.
+    """
+    points = numpy.asarray(points, float)
+    n = len(points)
+    if count >= n:
+        return numpy.arange(n)
+    if count < 2:
+        raise ValueError("at least two points are kept")
+    edges = numpy.linspace(1, n - 1, count - 1).astype(int)
+    indices = numpy.empty(count, int)
+    indices[0], indices[-1] = 0, n - 1
+    a = points[0]
+    for k in range(count - 2):
+        start, stop = edges[k], edges[k + 1]
+        if k + 2 < len(edges):
+            c = points[stop:edges[k + 2]].mean(axis=0)
+        else:
+            c = points[-1]
+        areas = _triangle_areas(a, points[start:stop], c)
+        i = start + int(numpy.argmax(areas))
+        indices[k + 1] = i
+        a = points[i]
+    return indices
+
+
+class StreamingSimplifier:
+    """Douglas-Peucker simplification of a path given by chunks
+
+    The points after the last kept one are pending, since the next chunks
+    may change how they are simplified; every chunk only processes them
+    again, along with the new points. The simplified path is within
+    `tolerance` of every point, although it may differ from the one given by
+    douglas_peucker() on the whole path.
+    """
+    def __init__(self, tolerance, max_pending=1 << 16):
+        """Simplifier for `tolerance`, deciding every `max_pending` points"""
+        self.tolerance = tolerance
+        self.max_pending = max_pending
+        self.count = 0  # points received
+        self._points = None  # pending points, after the last emitted one
+        self._keys = None
+
+    def __repr__(self):
+        return "<StreamingSimplifier within %g>" % self.tolerance
+
+    @property
+    def last(self):
+        """Last point received, and its key (None before any point)"""
+        if self._points is None:
+            return None
+        return self._points[-1], self._keys[-1]
+
+    def push(self, points, keys=None):
+        """Simplify a new chunk of points
+
+        `keys` are carried along the points (default is their rank in the
+        whole path). Return the points newly kept, and their keys.
+        """
+        points = numpy.asarray(points, float)
+        if keys is None:
+            keys = numpy.arange(self.count, self.count + len(points))
+        self.count += len(points)
+        if len(points) == 0:
+            return points, numpy.asarray(keys)
+        keys = numpy.asarray(keys)
+        if self._points is None:
+            # the first point is always kept
+            buffer, buffer_keys = points, keys
+            emitted = [0]
+        else:
+            # the first point of the buffer has already been kept
+            buffer = numpy.concatenate([self._points, points])
+            buffer_keys = numpy.concatenate([self._keys, keys])
+            emitted = []
+
+        if len(buffer) == 1:
+            anchor = 0
+        else:
+            kept = douglas_peucker(buffer, self.tolerance)
+            emitted.extend(kept[1:-1])
+            # the points after the last two kept ones are within tolerance
+            # of their segment, which may still change
+            anchor = kept[-2]
+            if len(buffer) - anchor > self.max_pending:
+                anchor = len(buffer) - 1
+                emitted.append(anchor)
+        self._points, self._keys = buffer[anchor:], buffer_keys[anchor:]
+        return buffer[emitted], buffer_keys[emitted]
+
+    def finish(self):
+        """Keep the last point; return it and its key, if not kept yet"""
+        if self._points is None:
+            return numpy.empty((0, 0)), numpy.empty(0, int)
+        if len(self._points) < 2:
+            return self._points[:0], self._keys[:0]
+        points, keys = self._points[-1:], self._keys[-1:]
+        self._points, self._keys = points, keys
+        return points, keys
+
+
+class LevelsOfDetail:
+    """Simplifications of a path at several tolerances, given by chunks
+
+    Level k simplifies level k - 1 within `tolerance * factor**k`, rather
+    than the whole path, so that each chunk costs little more than for the
+    first level. The errors add up, but stay within bound(k) of the path.
+    The levels are cached until the next chunk.
+    """
+    def __init__(self, tolerance, levels=16, factor=2.):
+        """Levels starting at `tolerance`"""
+        self.tolerance = tolerance
+        self.factor = factor
+        self.simplifiers = [
+            StreamingSimplifier(tolerance * factor**k) for k in range(levels)
+        ]
+        self._points = [[] for _ in range(levels)]  # chunks of kept points
+        self._keys = [[] for _ in range(levels)]
+        self._cache = [None] * levels
+
+    def __repr__(self):
+        return "<LevelsOfDetail with %i levels>" % len(self.simplifiers)
+
+    def __len__(self):
+        return len(self.simplifiers)
+
+    def append(self, points, keys=None):
+        """Add a chunk of points to the path (see StreamingSimplifier)"""
+        for k, simplifier in enumerate(self.simplifiers):
+            points, keys = simplifier.push(points, keys)
+            self._points[k].append(points)
+            self._keys[k].append(keys)
+            self._cache[k] = None
+
+    def finish(self):
+        """Keep the last point of the path in every level"""
+        if self.simplifiers[0].last is None:
+            return
+        for k, simplifier in enumerate(self.simplifiers):
+            if k == 0:
+                points, keys = simplifier.finish()
+            else:
+                pushed = simplifier.push(points, keys)
+                finished = simplifier.finish()
+                points = numpy.concatenate([pushed[0], finished[0]])
+                keys = numpy.concatenate([pushed[1], finished[1]])
+            self._points[k].append(points)
+            self._keys[k].append(keys)
+            self._cache[k] = None
+
+    def bound(self, k):
+        """Maximum distance from the path to level k"""
+        f = self.factor
+        return self.tolerance * (f**(k + 1) - 1) / (f - 1)
+
+    def level_for(self, resolution):
+        """Coarsest level within `resolution` of the path (or the first)"""
+        f = self.factor
+        x = resolution / self.tolerance * (f - 1) + 1
+        if x < f:
+            return 0
+        k = int(math.log(x, f)) - 1
+        # rounding errors of the logarithm
+        if self.bound(k + 1) <= resolution:
+            k += 1
+        elif self.bound(k) > resolution:
+            k -= 1
+        return max(0, min(k, len(self) - 1))
+
+    def level(self, k):
+        """Points of level k, and their keys
+
+        Until finish(), the last point received is included, even if it is
+        not kept yet: the end of the path is then not within bound(k).
+        """
+        cached = self._cache[k]
+        if cached is None:
+            points, keys = self._points[k], self._keys[k]
+            if not points:
+                return numpy.empty((0, 0)), numpy.empty(0, int)
+            if len(points) > 1:
+                # merge the chunks once
+                points[:] = [numpy.concatenate(points)]
+                keys[:] = [numpy.concatenate(keys)]
+            cached = points[0], keys[0]
+            last = self.simplifiers[0].last
+            if last is not None and \
+                    (not len(cached[1]) or cached[1][-1] != last[1]):
+                cached = (
+                    numpy.concatenate([cached[0], [last[0]]]),
+                    numpy.concatenate([cached[1], [last[1]]]),
+                )
+            self._cache[k] = cached
+        return cached
+
+    def at_resolution(self, resolution):
+        """Points (and keys) of the coarsest level within `resolution`"""
+        return self.level(self.level_for(resolution))
@@ -0,0 +1,299 @@
+"""Delta-v map of a stellar system
+
+The map is a graph whose nodes are the states of a spacecraft relative to
+the celestial bodies:
+
+* "Kerbin surface": landed at the equator
+* "Kerbin low orbit": on a circular equatorial orbit just above the
+  atmosphere (see low_orbit_radius())
+* "Kerbin sphere of influence": at the edge of the sphere of influence,
+  moving along with Kerbin
+* "Duna intercept from Kerbin": on the Hohmann transfer orbit from Kerbin
+  which meets Duna (or from a moon to the low orbit of its primary)
+
+The edges are weighted by the delta-v of the burns, which are derived from
+the vis-viva equation. Ejections and captures are done from and into low
+orbit, taking advantage of the Oberth effect. Orbits of the bodies are
+approximated by circles of radius their semi-major axis, inclinations,
+gravity and drag losses are ignored, and no aerobraking is assumed.
+
+Building the graph of a large system takes some time, so it is cached on
+disk, keyed by the hash of the data file; queries are then answered with
+Dijkstra's algorithm, whose results are memoized for each origin.
+"""
+
+import os
+import math
+import json
+import heapq
+import hashlib
+import pkgutil
+
+from spyce.orbit import Orbit
+
+# cached graphs with a different version are rebuilt
+VERSION = 1
+
+# altitude (m) of low orbits above the atmosphere
+LOW_ORBIT_MARGIN = 10e3
+
+
+def surface(body):
+    """Name of the node landed on a body"""
+    return "%s surface" % body
+
+
+def low_orbit(body):
+    """Name of the node in low orbit around a body"""
+    return "%s low orbit" % body
+
+
+def sphere_of_influence(body):
+    """Name of the node at the edge of the sphere of influence of a body"""
+    return "%s sphere of influence" % body
+
+
+def intercept(body, origin):
+    """Name of the node on a transfer orbit from `origin` to `body`"""
+    return "%s intercept from %s" % (body, origin)
+
+
+def low_orbit_radius(body):
+    """Radius (m) of the low orbit around a body"""
+    return body.radius + body.atmosphere_height + LOW_ORBIT_MARGIN
+
+
+def circular_speed(body, radius):
+    """Speed (m/s) on a circular orbit of given radius (m)"""
+    return Orbit(body, radius).speed_at_distance(radius)
+
+
+def hohmann(primary, radius1, radius2):
+    """Delta-v (m/s) of the two burns of a Hohmann transfer
+
+    The transfer goes from a circular orbit of radius `radius1` (m) to a
+    circular orbit of radius `radius2` (m).
+    """
+    transfer = Orbit.from_apses(primary, radius1, radius2)
+    burn1 = transfer.speed_at_distance(radius1) - \
+        circular_speed(primary, radius1)
+    burn2 = transfer.speed_at_distance(radius2) - \
+        circular_speed(primary, radius2)
+    return abs(burn1), abs(burn2)
+
+
+def ejection(body, radius, excess_speed):
+    """Delta-v (m/s) to leave a circular orbit with a given excess speed
+
+    The burn is done on the circular orbit of given radius (m); the excess
+    speed (m/s) is the speed left at the edge of the sphere of influence.
+    By symmetry, this is also the delta-v of a capture.
+    """
+    # vis-viva equation on a hyperbolic trajectory
+    escape_velocity = body.escape_velocity_at_distance(radius)
+    speed = math.sqrt(excess_speed**2 + escape_velocity**2)
+    return speed - circular_speed(body, radius)
+
+
+def ascent(body):
+    """Delta-v (m/s) from the surface of a body to low orbit
+
+    Launching eastward from the equator.
+    """
+    radius = low_orbit_radius(body)
+    transfer = Orbit.from_apses(body, body.radius, radius)
+    rotation = body.surface_velocity
+    if rotation == math.inf:
+        rotation = 0
+    burn1 = transfer.speed_at_distance(body.radius) - rotation
+    burn2 = circular_speed(body, radius) - transfer.speed_at_distance(radius)
+    return burn1 + burn2
+
+
+def build(bodies):
+    """Build the delta-v graph of a set of celestial bodies
+
+    Return a dictionary mapping each node to a dictionary mapping its
+    neighbors to the delta-v (m/s) of the edge.
+    """
+    graph = {}
+
+    def add(origin, destination, delta_v):
+        graph.setdefault(origin, {})
+        graph.setdefault(destination, {})
+        previous = graph[origin].get(destination, math.inf)
+        graph[origin][destination] = min(previous, delta_v)
+
+    def add_both(a, b, delta_v):
+        add(a, b, delta_v)
+        add(b, a, delta_v)
+
+    # bodies whose mass and size are unknown are left out
+    bodies = {
+        body for body in bodies
+        if body.gravitational_parameter > 0 and body.radius > 0
+    }
+    for body in sorted(bodies, key=str):
+        radius = low_orbit_radius(body)
+        if body.orbit is not None:
+            add_both(surface(body), low_orbit(body), ascent(body))
+        if body.sphere_of_influence < math.inf:
+            escape = ejection(body, radius, 0)
+            add_both(low_orbit(body), sphere_of_influence(body), escape)
+        satellites = [moon for moon in body.satellites if moon in bodies]
+
+        # from low orbit to the moons, and back
+        for moon in satellites:
+            a = moon.orbit.semi_major_axis
+            moon_radius = low_orbit_radius(moon)
+            burn1, burn2 = hohmann(body, radius, a)
+            add(low_orbit(body), intercept(moon, body), burn1)
+            add(intercept(moon, body), low_orbit(moon),
+                ejection(moon, moon_radius, burn2))
+            add(intercept(moon, body), sphere_of_influence(moon), burn2)
+            add(low_orbit(moon), intercept(body, moon),
+                ejection(moon, moon_radius, burn2))
+            add(intercept(body, moon), low_orbit(body), burn1)
+
+            # from the orbit of the moon to the edge of the sphere of
+            # influence of the primary
+            if body.sphere_of_influence < math.inf:
+                add_both(sphere_of_influence(moon), sphere_of_influence(body),
+                         ejection(body, a, 0))
+
+        # between the satellites of the same primary
+        for origin in satellites:
+            origin_radius = low_orbit_radius(origin)
+            for target in satellites:
+                if target is origin:
+                    continue
+                burn1, burn2 = hohmann(body, origin.orbit.semi_major_axis,
+                                       target.orbit.semi_major_axis)
+                node = intercept(target, origin)
+                add(low_orbit(origin), node,
+                    ejection(origin, origin_radius, burn1))
+                add(sphere_of_influence(origin), node, burn1)
+                add(node, low_orbit(target),
+                    ejection(target, low_orbit_radius(target), burn2))
+                add(node, sphere_of_influence(target), burn2)
+
+                # ejections and captures along the orbits of the moons
+                for moon in target.satellites:
+                    if moon in bodies:
+                        a = moon.orbit.semi_major_axis
+                        add(node, sphere_of_influence(moon),
+                            ejection(target, a, burn2))
+                for moon in origin.satellites:
+                    if moon in bodies:
+                        a = moon.orbit.semi_major_axis
+                        add(sphere_of_influence(moon), node,
+                            ejection(origin, a, burn1))
+    return graph
+
+
+def cache_path(filename, cache_directory=None):
+    """Path of the cached graph for a data file
+
+    The default cache directory is $XDG_CACHE_HOME/spyce (or ~/.cache/spyce).
+    """
+    content = pkgutil.get_data("spyce", filename)
+    digest = hashlib.sha256(content).hexdigest()[:16]
+    if cache_directory is None:
+        cache_home = os.environ.get("XDG_CACHE_HOME") or \
+            os.path.join(os.path.expanduser("~"), ".cache")
+        cache_directory = os.path.join(cache_home, "spyce")
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    name = "deltav-%s-%s.json" % (stem, digest)
+    return os.path.join(cache_directory, name)
+
+
+class DeltaVMap:
+    """Graph of the delta-v between states of a spacecraft"""
+
+    def __init__(self, graph):
+        """Map from a graph (see build())"""
+        self.graph = graph
+        self._paths = {}
+
+    @classmethod
+    def from_bodies(cls, bodies):
+        """Map of a set of celestial bodies"""
+        return cls(build(bodies))
+
+    @classmethod
+    def load(cls, filename="kerbol.json", cache_directory=None):
+        """Map of the system described by a data file of spyce
+
+        The graph is read from the cache when the data file has not changed,
+        and built and written to the cache otherwise (see cache_path()).
+        """
+        path = cache_path(filename, cache_directory)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            pass
+        else:
+            if data.get("version") == VERSION:
+                return cls(data["graph"])
+
+        import spyce.load
+        bodies = spyce.load.load_bodies(filename)
+        graph = build(bodies.values())
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                json.dump({"version": VERSION, "graph": graph}, f)
+        except OSError:
+            pass  # the cache is optional
+        return cls(graph)
+
+    def shortest_paths(self, origin):
+        """Lowest delta-v from a node to all the others
+
+        Return two dictionaries: the delta-v (m/s) to each reachable node,
+        and the previous node on the path to it.
+        """
+        try:
+            return self._paths[origin]
+        except KeyError:
+            pass
+        if origin not in self.graph:
+            raise KeyError(origin)
+        delta_v = {origin: 0.}
+        previous = {origin: None}
+        queue = [(0., origin)]
+        while queue:
+            cost, node = heapq.heappop(queue)
+            if cost > delta_v[node]:
+                continue
+            for neighbor, edge in self.graph[node].items():
+                candidate = cost + edge
+                if candidate < delta_v.get(neighbor, math.inf):
+                    delta_v[neighbor] = candidate
+                    previous[neighbor] = node
+                    heapq.heappush(queue, (candidate, neighbor))
+        self._paths[origin] = delta_v, previous
+        return delta_v, previous
+
+    def delta_v(self, origin, destination):
+        """Lowest delta-v (m/s) from a node to another
+
+        Return math.inf when there is no path.
+        """
+        if destination not in self.graph:
+            raise KeyError(destination)
+        delta_v, _ = self.shortest_paths(origin)
+        return delta_v.get(destination, math.inf)
+
+    def path(self, origin, destination):
+        """Nodes along the path of lowest delta-v, or None"""
+        if destination not in self.graph:
+            raise KeyError(destination)
+        _, previous = self.shortest_paths(origin)
+        if destination not in previous:
+            return None
+        path = [destination]
+        while previous[path[-1]] is not None:
+            path.append(previous[path[-1]])
+        return path[::-1]
@@ -0,0 +1,190 @@
+"""Eclipses of the star as seen from a spacecraft
+
+A spacecraft is in the umbra of a celestial body when the body completely
+hides the star, and in its penumbra when it only hides part of it. The
+primary of the spacecraft is not the only body casting a shadow: its moons
+(e.g. the Mun, for a spacecraft orbiting Kerbin), and the primary of the
+primary, are also taken into account.
+
+The apparent sizes and separations of the discs are sampled over the whole
+time window at once, and the entries and exits are then refined by batched
+bisection. Unlike Orbit.darkness_time(), this accounts for eccentric orbits
+and for the motion of the primary around the star.
+"""
+
+import math
+
+import numpy
+
+import spyce.kepler
+
+
+def root(body):
+    """Star of the system of a celestial body"""
+    while body.orbit is not None:
+        body = body.orbit.primary
+    return body
+
+
+def occulting_bodies(primary):
+    """Bodies which may hide the star from a spacecraft orbiting `primary`
+
+    That is, `primary` and its satellites, and likewise for each of its
+    ancestors, except for the star.
+    """
+    bodies = []
+    body = primary
+    while body.orbit is not None:
+        for candidate in [body] + body.satellites:
+            if candidate not in bodies:
+                bodies.append(candidate)
+        body = body.orbit.primary
+    return bodies
+
+
+def margins(orbit, bodies, times):
+    """Margins of the umbra and penumbra conditions (rad)
+
+    The margins are negative when the spacecraft is in the umbra (resp.
+    penumbra) of the bodies. Return two arrays of shape (len(bodies),) +
+    numpy.shape(times).
+    """
+    star = root(orbit.primary)
+    position = spyce.kepler.global_position_at_time(orbit.primary, times) + \
+        spyce.kepler.position_at_time(orbit, times)
+    # the star is at the origin
+    to_star = -position
+    star_distance = numpy.linalg.norm(to_star, axis=-1)
+    star_size = numpy.arcsin(numpy.minimum(star.radius / star_distance, 1))
+
+    umbra = []
+    penumbra = []
+    for body in bodies:
+        to_body = spyce.kepler.global_position_at_time(body, times) - position
+        body_distance = numpy.linalg.norm(to_body, axis=-1)
+        body_size = numpy.arcsin(numpy.minimum(body.radius / body_distance, 1))
+        # angular separation of the centers of the discs
+        separation = numpy.arctan2(
+            numpy.linalg.norm(numpy.cross(to_star, to_body), axis=-1),
+            numpy.einsum('...i,...i->...', to_star, to_body),
+        )
+        # a body further than the star does not hide it
+        behind = body_distance > star_distance
+        umbra.append(numpy.where(
+            behind, math.pi, separation - (body_size - star_size)))
+        penumbra.append(numpy.where(
+            behind, math.pi, separation - (body_size + star_size)))
+    return numpy.array(umbra), numpy.array(penumbra)
+
+
+def max_speed(orbit):
+    """Speed at periapsis (m/s)"""
+    mu = orbit.primary.gravitational_parameter
+    return math.sqrt(mu * (1 + orbit.eccentricity) / orbit.periapsis)
+
+
+def default_step(orbit, bodies, start, end):
+    """Sampling step (s) short enough not to miss shadows
+
+    It is the shortest of a hundredth of the period and of a fourth of the
+    time taken to cross the disc of each body (at the highest relative
+    speed).
+    """
+    steps = [end - start]
+    if orbit.period < math.inf:
+        steps.append(orbit.period / 100)
+    for body in bodies:
+        speed = max_speed(orbit)
+        if body is not orbit.primary and body.orbit is not None:
+            speed += max_speed(body.orbit)
+        steps.append(2*body.radius / speed / 4)
+    return min(steps)
+
+
+def union(intervals):
+    """Merge overlapping intervals"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def difference(intervals, removed):
+    """Parts of the intervals outside of the removed intervals
+
+    Both lists of intervals should be sorted and disjoint (see union()).
+    """
+    result = []
+    for start, end in intervals:
+        for removed_start, removed_end in removed:
+            if removed_end <= start or removed_start >= end:
+                continue
+            if removed_start > start:
+                result.append((start, removed_start))
+            start = max(start, removed_end)
+        if start < end:
+            result.append((start, end))
+    return result
+
+
+def duration(intervals):
+    """Total duration (s) of a list of disjoint intervals"""
+    return sum(end - start for start, end in intervals)
+
+
+def eclipses(orbit, start, end, step=None, tolerance=1e-3, bodies=None):
+    """Times a spacecraft spends in the shadow of celestial bodies
+
+    Arguments:
+    orbit       Orbit of the spacecraft
+    start, end  s, time window
+    step        s, sampling step (see default_step()); shadows shorter
+                than this may be missed
+    tolerance   s, precision of entries and exits
+    bodies      bodies casting shadows (default: see occulting_bodies())
+
+    Return two lists of intervals (start, end): the times spent in the umbra
+    of some body, and the times spent in the penumbra of some body but in the
+    umbra of none.
+    """
+    if bodies is None:
+        bodies = occulting_bodies(orbit.primary)
+    if step is None:
+        step = default_step(orbit, bodies, start, end)
+    count = max(1, math.ceil((end - start) / step))
+    times = numpy.linspace(start, end, count + 1)
+    step = (end - start) / count
+    iterations = max(0, math.ceil(math.log2(step / tolerance)))
+
+    sampled = margins(orbit, bodies, times)
+    shadows = []
+    for kind, margin in enumerate(sampled):
+        inside = margin < 0
+        intervals = []
+        for index, body in enumerate(bodies):
+            # entries and exits of the body's shadow between two samples
+            sample, = numpy.nonzero(inside[index, 1:] != inside[index, :-1])
+            a, b = times[sample], times[sample + 1]
+            entering = ~inside[index, sample]
+            # only this body matters to locate them
+            for _ in range(iterations if len(sample) else 0):
+                middle = (a + b) / 2
+                values = margins(orbit, [body], middle)[kind][0]
+                # keep the half where the state changes
+                first_half = (values < 0) == entering
+                a, b = numpy.where(first_half, a, middle), \
+                    numpy.where(first_half, middle, b)
+            bounds = ((a + b) / 2).tolist()
+            # shadows at the start or at the end of the window
+            if inside[index, 0]:
+                bounds.insert(0, start)
+            if inside[index, -1]:
+                bounds.append(end)
+            intervals.extend(zip(bounds[::2], bounds[1::2]))
+        shadows.append(union(intervals))
+
+    umbra, penumbra = shadows
+    return umbra, difference(penumbra, umbra)
@@ -0,0 +1,482 @@
+"""Simulation of ensembles of rockets, for Monte Carlo studies
+
+An Ensemble stores the states of many rockets around the same primary as
+arrays (structure of arrays), and integrates all of them at once, with the
+same Runge-Kutta 4 steps as Rocket. Each member may have its own thrust,
+exhaust velocity, propellant, and thresholds for its flight program.
+
+The flight program is a list of stages, each made of a Condition (see
+spyce.conditions) and of an action. The thresholds of the conditions may be
+arrays, with one value per member. When the condition of its current stage
+is met by a member, the action is called with the indices of the members
+concerned, and the member moves to the next stage. As with Rocket, the step
+is split at the time of trigger, located within Ensemble.tolerance (s) by
+regula falsi (Illinois variant).
+
+For instance:
+
+    def pitch(ensemble, members):
+        ensemble.rotate(members, radians(-45), 1, 0, 0)
+
+    def cut(ensemble, members):
+        ensemble.throttle[members] = 0.
+
+    altitudes = numpy.random.normal(10e3, 500., 10000)
+    ensemble = Ensemble.from_rocket(rocket, 10000, [
+        (AltitudeAbove(altitudes), pitch),
+        (ApoapsisAbove(700e3), cut),
+    ])
+    ensemble.run(600., 0.1)
+    ensemble.statistics()["periapsis"]
+
+When available, the C extension (see spyce/cext) runs the steps.
+"""
+
+import math
+
+import numpy
+
+import spyce.conditions
+import spyce.orbit_array
+
+# if available, use C extension
+try:
+    from spyce.cext import integrate as cext
+except ImportError:
+    cext = None
+
+
+def _rotations(angle, x, y, z):
+    """Rotation matrices of given angles (rad) around axis (x,y,z)"""
+    s = numpy.sin(angle)
+    c = numpy.cos(angle)
+    d = math.sqrt(x*x + y*y + z*z)
+    x, y, z = x/d, y/d, z/d
+    return numpy.stack([
+        numpy.stack([x*x*(1-c)+c,   x*y*(1-c)-z*s, x*z*(1-c)+y*s], -1),
+        numpy.stack([y*x*(1-c)+z*s, y*y*(1-c)+c,   y*z*(1-c)-x*s], -1),
+        numpy.stack([z*x*(1-c)-y*s, z*y*(1-c)+x*s, z*z*(1-c)+c], -1),
+    ], -2)
+
+
+def _per_member(value, members):
+    """Values of a (possibly per-member) parameter for some members"""
+    value = numpy.asarray(value, dtype=float)
+    return value[members] if value.ndim else value
+
+
+def summarize(values, percentiles=(5, 50, 95)):
+    """Mean, standard deviation and percentiles of an array"""
+    values = numpy.asarray(values, dtype=float)
+    return {
+        "mean": values.mean(),
+        "std": values.std(),
+        "percentiles": dict(zip(
+            percentiles, numpy.percentile(values, percentiles))),
+    }
+
+
+class Ensemble:
+    """Many rockets around the same primary"""
+
+    # precision (s) of the times of trigger of the flight programs
+    tolerance = 1e-6
+
+    def __init__(self, primary, position, velocity, dry_mass, propellant,
+                 max_thrust, exhaust_velocity, orientation=None, throttle=1.,
+                 program=(), time=0.):
+        """Ensemble of members with given states and properties
+
+        Arguments:
+        primary           CelestialBody
+        position          m, array of shape (n, 3)
+        velocity          m/s, array of shape (n, 3)
+        dry_mass          kg
+        propellant        kg
+        max_thrust        N
+        exhaust_velocity  m/s
+        orientation       array of shape (n, 3, 3) (default as Rocket)
+        throttle          -
+        program           list of pairs (Condition, action)
+        time              s
+
+        Except for the state vectors, the arguments are either numbers, or
+        arrays with one value per member.
+        """
+        self.primary = primary
+        # state vectors by components (position then velocity), with a
+        # shape of (6, n), so that the operations run over contiguous arrays
+        position = numpy.asarray(position, dtype=float)
+        velocity = numpy.asarray(velocity, dtype=float)
+        self.state = numpy.concatenate([position.T, velocity.T])
+        n = len(position)
+
+        def column(value):
+            return numpy.array(numpy.broadcast_to(value, (n,)), dtype=float)
+        self.dry_mass = column(dry_mass)
+        self.propellant = column(propellant)
+        self.max_thrust = column(max_thrust)
+        self.exhaust_velocity = column(exhaust_velocity)
+        # as for RocketPart, set once from the thrust and exhaust velocity
+        self.expulsion_rate = self.max_thrust / self.exhaust_velocity  # kg/s
+        self.throttle = column(throttle)
+        if orientation is None:
+            orientation = _rotations(math.pi / 2, 0, 1, 0)
+        self.orientation = numpy.array(
+            numpy.broadcast_to(orientation, (n, 3, 3)), dtype=float)
+
+        self.time = time
+        self.program = list(program)
+        self.stage = numpy.zeros(n, int)  # current stage of each member
+        self.stage_start = numpy.full(n, float(time))
+        # time when each member left each stage
+        self.trigger_times = numpy.full((n, len(self.program)), numpy.nan)
+        self._trigger(numpy.arange(n), numpy.full(n, float(time)))
+
+    @classmethod
+    def from_rocket(cls, rocket, count, program=(), time=0., **kwargs):
+        """Ensemble of `count` copies of `rocket`
+
+        The keyword arguments override the properties of the rocket, e.g.
+        with arrays of perturbed values (see Ensemble()).
+        """
+        arguments = {
+            "position": numpy.tile(rocket.position, (count, 1)),
+            "velocity": numpy.tile(rocket.velocity, (count, 1)),
+            "dry_mass": rocket.dry_mass,
+            "propellant": rocket.propellant,
+            "max_thrust": rocket.max_thrust,
+            "exhaust_velocity": rocket.max_thrust / rocket.expulsion_rate
+            if rocket.expulsion_rate else 1.,
+            "orientation": numpy.array(rocket.orientation, dtype=float),
+            "throttle": rocket.throttle,
+        }
+        arguments.update(kwargs)
+        return cls(rocket.primary, program=program, time=time, **arguments)
+
+    def __repr__(self):
+        return "<Ensemble of %i rockets around %s>" % (len(self), self.primary)
+
+    def __len__(self):
+        return self.state.shape[1]
+
+    @property
+    def position(self):
+        """m, of shape (n, 3)"""
+        return self.state[:3].T
+
+    @position.setter
+    def position(self, position):
+        self.state[:3] = numpy.transpose(position)
+
+    @property
+    def velocity(self):
+        """m/s, of shape (n, 3)"""
+        return self.state[3:].T
+
+    @velocity.setter
+    def velocity(self, velocity):
+        self.state[3:] = numpy.transpose(velocity)
+
+    @property
+    def direction(self):
+        """Directions of thrust, of shape (n, 3)"""
+        return self.orientation[:, :, 2]
+
+    @property
+    def mass(self):
+        """kg"""
+        return self.dry_mass + self.propellant
+
+    def rotate(self, members, angle, x, y, z):
+        """Rotate some members by `angle` (rad) along axis (x,y,z)
+
+        Like Rocket.rotate(), the axis is in the frame of the rocket.
+        `angle` may have one value per member.
+        """
+        angle = _per_member(angle, members) if numpy.ndim(angle) else angle
+        rotations = _rotations(angle, x, y, z)
+        self.orientation[members] = self.orientation[members] @ rotations
+
+    def values(self, condition, members, time):
+        """Values of a Condition for some members, at their `time` (s)
+
+        Vectorized counterpart of Condition.value(); the condition is met
+        by the members whose value is non-negative.
+        """
+        C = spyce.conditions
+        if isinstance(condition, C.AnyOf):
+            return numpy.max([
+                self.values(c, members, time) for c in condition.conditions
+            ], axis=0)
+        if isinstance(condition, C.AltitudeAbove):
+            position = self.state[:3, members]
+            altitude = numpy.sqrt(
+                numpy.einsum("ij,ij->j", position, position)) - \
+                self.primary.radius
+            value = altitude - _per_member(condition.altitude, members)
+            if isinstance(condition, C.AltitudeBelow):
+                return -value
+            return value
+        if isinstance(condition, C.ApoapsisAbove):
+            periapsis, apoapsis = self._apsides(members)
+            if isinstance(condition, C.PeriapsisAbove):
+                apsis = periapsis
+            else:
+                apsis = apoapsis
+            value = apsis - _per_member(condition.distance, members)
+            if isinstance(condition, (C.ApoapsisBelow, C.PeriapsisBelow)):
+                return -value
+            return value
+        if isinstance(condition, C.TimeElapsed):
+            duration = _per_member(condition.duration, members)
+            return time - self.stage_start[members] - duration
+        if isinstance(condition, C.TimeReached):
+            return time - _per_member(condition.time, members)
+        if isinstance(condition, C.PropellantEmpty):
+            return -self.propellant[members]
+        raise TypeError("%s is not supported by Ensemble" % condition)
+
+    def _apsides(self, members):
+        """Periapses and apoapses (m) of some members"""
+        mu = self.primary.gravitational_parameter
+        r = self.state[:3, members]
+        v = self.state[3:, members]
+        distance = numpy.sqrt(numpy.einsum("ij,ij->j", r, r))
+        energy = numpy.einsum("ij,ij->j", v, v) / 2 - mu / distance
+        h = numpy.cross(r, v, axis=0)
+        h2 = numpy.einsum("ij,ij->j", h, h)
+        e = numpy.sqrt(numpy.maximum(1 + 2 * energy * h2 / mu**2, 0))
+        p = h2 / mu
+        with numpy.errstate(divide='ignore'):
+            apoapsis = numpy.where(e < 1, p / (1 - e), numpy.inf)
+        return p / (1 + e), apoapsis
+
+    def _trigger(self, members, time):
+        """Run the stages whose conditions are met by some members
+
+        `time` (s) has one value per member of the ensemble.
+        """
+        while len(members):
+            members = members[self.stage[members] < len(self.program)]
+            met = numpy.zeros(len(members), bool)
+            stages = self.stage[members]
+            for stage in numpy.unique(stages):
+                mask = stages == stage
+                condition, _ = self.program[stage]
+                chosen = members[mask]
+                met[mask] = self.values(condition, chosen, time[chosen]) >= 0
+            members = members[met]
+            stages = stages[met]
+            for stage in numpy.unique(stages):
+                chosen = members[stages == stage]
+                _, action = self.program[stage]
+                action(self, chosen)
+                self.trigger_times[chosen, stage] = time[chosen]
+            self.stage[members] += 1
+            self.stage_start[members] = time[members]
+
+    def _integrate(self, state, thrust, h):
+        """Runge-Kutta 4 step of `h` (s, one per member) from `state`
+
+        The state and the thrust are given by components (see Ensemble());
+        return the new state.
+        """
+        mu = self.primary.gravitational_parameter
+        radius = self.primary.radius
+        if cext is not None:
+            out = numpy.empty(state.shape)
+            cext.rk4_ensemble(
+                mu, radius, numpy.ascontiguousarray(state), out,
+                numpy.ascontiguousarray(thrust),
+                numpy.ascontiguousarray(h, dtype=float))
+            return out
+
+        def f(y, dy):
+            """Derivative of `y`, into `dy`"""
+            position = y[:3]
+            distance2 = numpy.einsum("ij,ij->j", position, position)
+            distance = numpy.sqrt(distance2)
+            # see Body.gravity()
+            inside = numpy.minimum(distance * (1 / radius), 1)
+            g = mu / (distance2 * distance) * (inside * inside * inside)
+            dy[:3] = y[3:]
+            numpy.multiply(position, -g, out=dy[3:])
+            dy[3:] += thrust
+
+        # the stages and their inputs are written in place
+        k = numpy.empty((4,) + state.shape)
+        y = numpy.empty(state.shape)
+        f(state, k[0])
+        for s, c in ((1, h / 2), (2, h / 2), (3, h)):
+            numpy.multiply(k[s - 1], c, out=y)
+            y += state
+            f(y, k[s])
+        k[1] += k[2]
+        k[1] *= 2
+        k[0] += k[1]
+        k[0] += k[3]
+        numpy.multiply(k[0], h / 6, out=y)
+        y += state
+        return y
+
+    def _met(self, members, stages, time):
+        """Values of the current conditions of some members at `time` (s)
+
+        `stages` are the current stages of the members, all in the program;
+        `members` may be a slice for the whole ensemble.
+        """
+        values = numpy.empty(len(stages))
+        if not len(stages):
+            return values
+        first, last = stages.min(), stages.max()
+        if first == last:
+            condition, _ = self.program[first]
+            return self.values(condition, members, time)
+        members = numpy.arange(len(self))[members]
+        for stage in range(first, last + 1):
+            mask = stages == stage
+            if not mask.any():
+                continue
+            condition, _ = self.program[stage]
+            time_ = time[mask] if numpy.ndim(time) else time
+            values[mask] = self.values(condition, members[mask], time_)
+        return values
+
+    def step(self, dt):
+        """Run the simulation of every member for `dt` (s)"""
+        n = len(self)
+        start = self.time
+        elapsed = numpy.zeros(n)
+        members = numpy.arange(n)
+        while len(members):
+            # avoid copies by fancy indexing for the whole ensemble
+            whole = len(members) == n
+            index = slice(None) if whole else members
+            h = dt - elapsed[index]
+            state = self.state[:, index]
+            propellant = self.propellant[index].copy()
+
+            # propulsion, as in Rocket.update_physics()
+            throttle = self.throttle[index]
+            required = self.expulsion_rate[index] * h * throttle
+            used = numpy.minimum(propellant, required)
+            with numpy.errstate(divide='ignore', invalid='ignore'):
+                ratio = numpy.where(required > 0, used / required, 0.)
+            mass = self.dry_mass[index] + propellant - used
+            magnitude = self.max_thrust[index] * throttle * ratio / mass
+            # by components, as the state
+            thrust = numpy.multiply(
+                self.orientation[index, :, 2].T, magnitude,
+                out=numpy.empty((3, len(magnitude))))
+
+            def advance(chosen, fraction):
+                """Update some members after a fraction of their sub-step"""
+                targets = members[chosen]
+                self.state[:, targets] = self._integrate(
+                    state[:, chosen], thrust[:, chosen], h[chosen] * fraction)
+                self.propellant[targets] = \
+                    propellant[chosen] - used[chosen] * fraction
+
+            # the state of the sub-step start is kept in `state`
+            if whole:
+                self.state = self._integrate(state, thrust, h)
+            else:
+                self.state[:, members] = self._integrate(state, thrust, h)
+            self.propellant[index] = propellant - used
+
+            # members whose current condition is met during the sub-step
+            stages = self.stage[index]
+            in_program = numpy.flatnonzero(stages < len(self.program))
+            if len(in_program) == len(members):
+                values = self._met(index, stages, start + dt)
+            else:
+                values = self._met(
+                    members[in_program], stages[in_program], start + dt)
+            chosen = in_program[values >= 0]
+            if not len(chosen):
+                break
+            high_value = values[values >= 0]
+
+            # value at the start of the sub-step
+            targets = members[chosen]
+            after = self.state[:, targets], self.propellant[targets]
+            self.state[:, targets] = state[:, chosen]
+            self.propellant[targets] = propellant[chosen]
+            stages = stages[chosen]
+            times = start + elapsed[targets]
+            low_value = self._met(targets, stages, times)
+            self.state[:, targets], self.propellant[targets] = after
+
+            # locate the triggers by regula falsi (Illinois variant), within
+            # the sub-step, as fractions of it
+            low = numpy.zeros(len(chosen))
+            high = numpy.ones(len(chosen))
+            side = numpy.zeros(len(chosen), int)
+            tolerance = self.tolerance / h[chosen]
+            searching = high - low > tolerance
+            while searching.any():
+                # members still searching, and their fractions
+                active = numpy.flatnonzero(searching)
+                lo, hi = low[active], high[active]
+                f_lo, f_hi = low_value[active], high_value[active]
+                with numpy.errstate(divide='ignore', invalid='ignore'):
+                    middle = (lo * f_hi - hi * f_lo) / (f_hi - f_lo)
+                middle = numpy.where(numpy.isfinite(middle), middle,
+                                     (lo + hi) / 2)
+                # always shrink the bracket by at least half the tolerance,
+                # so that the search ends despite rounding
+                margin = tolerance[active] / 2
+                middle = numpy.clip(middle, lo + margin, hi - margin)
+
+                advance(chosen[active], middle)
+                times = start + elapsed[targets[active]] + \
+                    h[chosen[active]] * middle
+                value = self._met(targets[active], stages[active], times)
+                met = value >= 0
+
+                # when the same end is kept twice, halve the value at the
+                # other end, so that it moves too
+                halved_hi = numpy.where(side[active] == -1, f_hi / 2, f_hi)
+                halved_lo = numpy.where(side[active] == 1, f_lo / 2, f_lo)
+                high[active] = numpy.where(met, middle, hi)
+                low[active] = numpy.where(met, lo, middle)
+                high_value[active] = numpy.where(met, value, halved_hi)
+                low_value[active] = numpy.where(met, halved_lo, value)
+                side[active] = numpy.where(met, 1, -1)
+                searching = high - low > tolerance
+            advance(chosen, high)
+
+            # resume the program of these members from their trigger
+            members = targets
+            elapsed[members] += h[chosen] * high
+            times = numpy.full(n, start + dt)
+            times[members] = start + elapsed[members]
+            self._trigger(members, times)
+            members = members[elapsed[members] < dt]
+        self.time = start + dt
+
+    def run(self, duration, dt):
+        """Run the simulation for `duration` (s), by steps of `dt` (s)"""
+        end = self.time + duration
+        while self.time < end:
+            self.step(min(dt, end - self.time))
+
+    def orbits(self):
+        """Current orbits of the members, as an OrbitArray"""
+        return spyce.orbit_array.OrbitArray.from_state(
+            self.primary, self.position, self.velocity, self.time)
+
+    def statistics(self, percentiles=(5, 50, 95)):
+        """Statistics of the current orbits of the members
+
+        Return a dictionary mapping periapsis, apoapsis, eccentricity and
+        inclination to their summaries (see summarize()).
+        """
+        orbits = self.orbits()
+        return {
+            name: summarize(getattr(orbits, name), percentiles)
+            for name in (
+                "periapsis", "apoapsis", "eccentricity", "inclination",
+            )
+        }
@@ -0,0 +1,323 @@
+"""Search for multi-leg trajectories with gravity assists
+
+A trajectory leaves the low orbit of a body, flies by a sequence of bodies
+orbiting the same primary (e.g. Kerbin, Eve, Jool), and is captured into the
+low orbit of the last one. Each leg is the solution of Lambert's problem
+between the positions of two bodies (see spyce.lambert); the legs are patched
+at the spheres of influence of the bodies flown by, where the hyperbolic
+excess velocities must be matched:
+
+* the hyperbola turns the excess velocity, by an angle which shrinks as its
+  periapsis rises from the low orbit to the edge of the sphere of influence;
+  a burn at periapsis changes the excess speed (a powered flyby)
+* when the turn needed is smaller than what a hyperbola grazing the sphere
+  of influence does, the velocities are matched by a burn at its edge
+
+All the times are on a grid (epoch + k * step), so that the same legs are
+found again when exploring different sequences: they are memoized, and
+solved by batches, possibly in worker processes. Instead of enumerating all
+the sequences, a beam search only extends the cheapest partial trajectories
+with each additional leg.
+"""
+
+import math
+import concurrent.futures
+
+import numpy
+
+import spyce.deltav
+import spyce.kepler
+import spyce.lambert
+
+
+class Trajectory:
+    """Sequence of legs between celestial bodies"""
+    def __init__(self, bodies, times, burns):
+        """Trajectory through `bodies` at `times` (s)
+
+        `burns` lists the delta-v (m/s) at the departure, at each flyby and
+        at the arrival.
+        """
+        self.bodies = bodies
+        self.times = times
+        self.burns = burns
+        self.delta_v = sum(burns)
+
+    def __repr__(self):
+        return "<Trajectory %s %.0f m/s>" % (
+            "-".join(str(body) for body in self.bodies), self.delta_v)
+
+
+def ejection(body, excess_speed):
+    """Delta-v (m/s) between low orbit and given excess speeds (m/s)
+
+    Vectorized version of spyce.deltav.ejection().
+    """
+    radius = spyce.deltav.low_orbit_radius(body)
+    escape_velocity = body.escape_velocity_at_distance(radius)
+    speed = numpy.sqrt(numpy.square(excess_speed) + escape_velocity**2)
+    return speed - spyce.deltav.circular_speed(body, radius)
+
+
+def turn_angle(body, periapsis, incoming_speed, outgoing_speed):
+    """Angle (rad) by which a flyby turns the excess velocity"""
+    mu = body.gravitational_parameter
+    incoming = 1 + periapsis * incoming_speed**2 / mu
+    outgoing = 1 + periapsis * outgoing_speed**2 / mu
+    return numpy.arcsin(1 / incoming) + numpy.arcsin(1 / outgoing)
+
+
+def flyby_delta_v(body, incoming, outgoing, iterations=60):
+    """Delta-v (m/s) to patch a flyby of a celestial body
+
+    `incoming` and `outgoing` are the excess velocities (m/s) relative to the
+    body, as arrays of shape (..., 3). Return an array of shape (...),
+    infinite where even a hyperbola grazing the low orbit cannot turn the
+    velocity enough.
+    """
+    mu = body.gravitational_parameter
+    incoming_speed = numpy.linalg.norm(incoming, axis=-1)
+    outgoing_speed = numpy.linalg.norm(outgoing, axis=-1)
+    cos_turn = numpy.einsum('...i,...i->...', incoming, outgoing)
+    cos_turn = cos_turn / (incoming_speed * outgoing_speed)
+    turn = numpy.arccos(numpy.clip(cos_turn, -1, 1))
+
+    lowest = spyce.deltav.low_orbit_radius(body)
+    highest = max(body.sphere_of_influence, lowest)
+    possible = turn <= turn_angle(body, lowest, incoming_speed,
+                                  outgoing_speed)
+    beyond = turn <= turn_angle(body, highest, incoming_speed,
+                                outgoing_speed)
+
+    # find the periapsis giving the turn, by bisection of its logarithm
+    lower = numpy.full(turn.shape, math.log(lowest))
+    upper = numpy.full(turn.shape, math.log(highest))
+    for _ in range(iterations):
+        middle = (lower + upper) / 2
+        angle = turn_angle(body, numpy.exp(middle), incoming_speed,
+                           outgoing_speed)
+        lower = numpy.where(angle > turn, middle, lower)
+        upper = numpy.where(angle > turn, upper, middle)
+    periapsis = numpy.exp((lower + upper) / 2)
+    escape = 2 * mu / periapsis
+    burn = numpy.abs(numpy.sqrt(outgoing_speed**2 + escape) -
+                     numpy.sqrt(incoming_speed**2 + escape))
+
+    burn = numpy.where(
+        beyond, numpy.linalg.norm(outgoing - incoming, axis=-1), burn)
+    return numpy.where(possible, burn, math.inf)
+
+
+def _lambert_task(args):
+    """Run spyce.lambert.solve() in a worker process"""
+    return spyce.lambert.solve(*args)
+
+
+class TrajectorySearch:
+    """Beam search of trajectories between the satellites of a primary"""
+
+    def __init__(self, primary, epoch, step, chunk_size=65536):
+        """Search on the grid of times epoch + k * step (s)
+
+        Legs are solved by chunks of `chunk_size`.
+        """
+        self.primary = primary
+        self.epoch = epoch
+        self.step = step
+        self.chunk_size = chunk_size
+        # bodies whose mass and size are unknown cannot be visited
+        self.bodies = [
+            body for body in primary.satellites
+            if body.gravitational_parameter > 0 and body.radius > 0
+        ]
+        self._legs = {}  # (origin, target, departure, arrival) -> velocities
+
+    def time(self, index):
+        """Time (s) of an index of the grid"""
+        return self.epoch + index * self.step
+
+    def velocities(self, bodies, indices):
+        """Velocities of bodies (one per index) at indices of the grid"""
+        indices = numpy.asarray(indices)
+        result = numpy.empty((len(indices), 3))
+        for body in set(bodies):
+            selected = numpy.array([b is body for b in bodies], dtype=bool)
+            _, velocity = spyce.kepler.state_at_time(
+                [body.orbit], self.time(indices[selected]))
+            result[selected] = velocity[0]
+        return result
+
+    def legs(self, keys, pool=None):
+        """Velocities at both ends of legs
+
+        `keys` is a list of tuples (origin, target, departure, arrival), where
+        the departure and arrival are indices of the grid. Return two arrays
+        of shape (len(keys), 3), NaN when there is no solution.
+        """
+        missing = {}
+        for key in keys:
+            if key not in self._legs:
+                missing.setdefault(key[:2], set()).add(key[2:])
+
+        tasks = []
+        mu = self.primary.gravitational_parameter
+        for (origin, target), times in missing.items():
+            departure, arrival = numpy.array(sorted(times)).T
+            position1, _ = spyce.kepler.state_at_time(
+                [origin.orbit], self.time(departure))
+            position2, _ = spyce.kepler.state_at_time(
+                [target.orbit], self.time(arrival))
+            time_of_flight = (arrival - departure) * self.step
+            for start in range(0, len(departure), self.chunk_size):
+                chunk = slice(start, start + self.chunk_size)
+                key = origin, target, departure[chunk], arrival[chunk]
+                args = mu, position1[0, chunk], position2[0, chunk], \
+                    time_of_flight[chunk]
+                tasks.append((key, args))
+
+        if pool is None:
+            results = map(_lambert_task, [args for _, args in tasks])
+        else:
+            results = pool.map(_lambert_task, [args for _, args in tasks])
+        for ((origin, target, departure, arrival), _), velocities in \
+                zip(tasks, results):
+            velocity1, velocity2 = velocities
+            for i, (a, b) in enumerate(zip(departure.tolist(),
+                                           arrival.tolist())):
+                self._legs[origin, target, a, b] = velocity1[i], velocity2[i]
+
+        velocity1 = numpy.array([self._legs[key][0] for key in keys])
+        velocity2 = numpy.array([self._legs[key][1] for key in keys])
+        return velocity1.reshape(-1, 3), velocity2.reshape(-1, 3)
+
+    def times_of_flight(self, origin, target, samples, bounds):
+        """Candidate durations of a leg, in steps of the grid
+
+        They are spread between bounds[0] and bounds[1] times the duration of
+        the Hohmann transfer between the two bodies.
+        """
+        mu = self.primary.gravitational_parameter
+        a = (origin.orbit.semi_major_axis + target.orbit.semi_major_axis) / 2
+        hohmann = math.pi * math.sqrt(a**3 / mu)
+        low, high = (bound * hohmann / self.step for bound in bounds)
+        candidates = numpy.round(numpy.linspace(low, high, samples))
+        return numpy.unique(numpy.maximum(candidates, 1)).astype(int)
+
+    def search(self, origin, destination, start, end, max_flybys=2,
+               beam_width=256, samples=32, bounds=(.3, 1.5), capture=True,
+               count=10, processes=None):
+        """Cheapest trajectories from `origin` to `destination`
+
+        Arguments:
+        start, end   s, departure window
+        max_flybys   maximum number of flybys
+        beam_width   number of partial trajectories extended at each leg
+        samples      number of durations tried for each leg
+        bounds       range of the durations of the legs, relative to the
+                     duration of the Hohmann transfer
+        capture      whether to include the capture into low orbit
+        count        number of trajectories returned
+        processes    if given, number of worker processes (0 for one per
+                     processor)
+
+        Return a list of Trajectory, sorted by delta-v.
+        """
+        first = math.ceil((start - self.epoch) / self.step)
+        last = math.floor((end - self.epoch) / self.step)
+        departures = numpy.arange(first, last + 1)
+
+        # partial trajectories: (bodies, indices, burns, incoming velocity)
+        beam = [((origin,), (int(index),), (), None) for index in departures]
+        complete = []
+        best = math.inf
+
+        pool = None
+        if processes is not None:
+            pool = concurrent.futures.ProcessPoolExecutor(processes or None)
+        try:
+            for leg in range(max_flybys + 1):
+                candidates = []
+                keys = []
+                for state, (bodies, indices, _, _) in enumerate(beam):
+                    current = bodies[-1]
+                    for target in self.bodies:
+                        if target is current:
+                            continue
+                        durations = self.times_of_flight(
+                            current, target, samples, bounds)
+                        for duration in durations.tolist():
+                            candidates.append((state, target))
+                            keys.append((current, target, indices[-1],
+                                         indices[-1] + duration))
+                if not keys:
+                    break
+                velocity1, velocity2 = self.legs(keys, pool)
+
+                # burn at the start of each leg
+                currents = [key[0] for key in keys]
+                velocity = self.velocities(currents, [key[2] for key in keys])
+                outgoing = velocity1 - velocity
+                if leg == 0:
+                    speed = numpy.linalg.norm(outgoing, axis=-1)
+                    burn = ejection(origin, speed)
+                else:
+                    incoming = numpy.array([
+                        beam[state][3] for state, _ in candidates
+                    ]) - velocity
+                    burn = numpy.empty(len(keys))
+                    for body in set(currents):
+                        selected = numpy.array([c is body for c in currents])
+                        burn[selected] = flyby_delta_v(
+                            body, incoming[selected], outgoing[selected])
+                costs = numpy.array([
+                    sum(beam[state][2]) for state, _ in candidates
+                ]) + burn
+                costs[~numpy.isfinite(costs)] = math.inf
+
+                # trajectories reaching the destination
+                targets = [target for _, target in candidates]
+                arrived = numpy.array([t is destination for t in targets])
+                arrived &= costs < best
+                if arrived.any():
+                    arrival = numpy.zeros(arrived.sum())
+                    if capture:
+                        indices = [key[3] for key, a in zip(keys, arrived)
+                                   if a]
+                        target_velocity = self.velocities(
+                            [destination] * len(indices), indices)
+                        excess = velocity2[arrived] - target_velocity
+                        arrival = ejection(
+                            destination, numpy.linalg.norm(excess, axis=-1))
+                    for i, final in zip(numpy.flatnonzero(arrived), arrival):
+                        state, _ = candidates[i]
+                        bodies, indices, burns, _ = beam[state]
+                        complete.append(Trajectory(
+                            bodies + (destination,),
+                            [self.time(index)
+                             for index in indices + (keys[i][3],)],
+                            list(burns) + [float(burn[i]), float(final)],
+                        ))
+                    complete.sort(key=lambda trajectory: trajectory.delta_v)
+                    del complete[count:]
+                    if len(complete) == count:
+                        best = complete[-1].delta_v
+
+                # extend the cheapest partial trajectories
+                open_ = numpy.flatnonzero(~numpy.array(
+                    [t is destination for t in targets]) & (costs < best))
+                open_ = open_[numpy.argsort(costs[open_])[:beam_width]]
+                beam = [
+                    (
+                        beam[candidates[i][0]][0] + (targets[i],),
+                        beam[candidates[i][0]][1] + (keys[i][3],),
+                        beam[candidates[i][0]][2] + (float(burn[i]),),
+                        velocity2[i],
+                    )
+                    for i in open_.tolist()
+                ]
+                if not beam:
+                    break
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return complete
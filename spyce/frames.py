@@ -0,0 +1,205 @@
+"""Reference frames
+
+A frame is given by its orientation relative to the ecliptic frame (the
+ecliptic and equinox of J2000, in which all the orbits of spyce are given),
+and may rotate around its z-axis. Frames only describe orientations: vectors
+keep their origin (usually the center of a celestial body).
+
+The constant rotations are computed once, and the frames of the celestial
+bodies are cached. Rotation matrices are available as Mat3 for single
+vectors, and conversions of arrays of positions and velocities, at arrays of
+times, are batched with NumPy.
+"""
+
+import math
+import functools
+
+from spyce.vector import Vec3, Mat3
+from spyce.coordinates import CelestialCoordinates
+
+try:
+    import numpy
+except ImportError:  # batched conversions are unavailable
+    numpy = None
+
+
+class Frame:
+    """Frame of reference, possibly rotating"""
+
+    def __init__(self, name, orientation=None, rotational_period=0):
+        """Frame from its orientation
+
+        Arguments:
+        name
+        orientation        Mat3, optional, from this frame to the ecliptic one
+        rotational_period  s, optional, 0 for an inertial frame, negative for
+                           a retrograde rotation
+        """
+        self.name = name
+        if orientation is None:
+            orientation = Mat3()
+        self.orientation = Mat3(orientation)
+        self.rotational_period = float(rotational_period)
+
+        # angular velocity, within the ecliptic frame
+        if self.rotational_period == 0:
+            rate = 0
+        else:
+            rate = 2*math.pi / self.rotational_period
+        self.angular_velocity = self.orientation * Vec3([0, 0, rate])
+
+        self._matrix = None  # orientation as a NumPy array
+
+    def __repr__(self):
+        return "<Frame %s>" % self.name
+
+    def rotation_angle_at_time(self, time):
+        """Angle (rad) the frame has turned by at given time (s)"""
+        if self.rotational_period == 0:
+            return 0.
+        # reducing modulo one turn first limits loss of significance
+        turn_fraction, _ = math.modf(time / self.rotational_period)
+        return 2*math.pi * turn_fraction
+
+    def rotation_at_time(self, time=0):
+        """Rotation matrix (Mat3) from this frame to the ecliptic frame"""
+        if self.rotational_period == 0:
+            return self.orientation
+        angle = self.rotation_angle_at_time(time)
+        return self.orientation * Mat3.rotation(angle, 0, 0, 1)
+
+    def matrices_at_time(self, time):
+        """Rotation matrices from this frame to the ecliptic frame
+
+        `time` may be an array; return an array of shape (..., 3, 3).
+        """
+        if self._matrix is None:
+            self._matrix = numpy.array(self.orientation, dtype=float)
+        time = numpy.asarray(time, dtype=float)
+        if self.rotational_period == 0:
+            return numpy.broadcast_to(self._matrix, time.shape + (3, 3))
+        angle = 2*numpy.pi * numpy.fmod(time / self.rotational_period, 1)
+        c, s = numpy.cos(angle), numpy.sin(angle)
+        zero, one = numpy.zeros_like(c), numpy.ones_like(c)
+        spin = numpy.stack([
+            numpy.stack([c, -s, zero], axis=-1),
+            numpy.stack([s, c, zero], axis=-1),
+            numpy.stack([zero, zero, one], axis=-1),
+        ], axis=-2)
+        return self._matrix @ spin
+
+    def to_ecliptic(self, time, position, velocity=None):
+        """Convert vectors from this frame to the ecliptic frame
+
+        `position` and `velocity` are arrays of shape (..., 3), broadcast
+        against `time`. The velocities are relative to this frame (e.g.
+        velocities relative to the ground for a body-fixed frame). Return the
+        positions, or the positions and the velocities.
+        """
+        rotation = self.matrices_at_time(time)
+        position = numpy.einsum('...ij,...j->...i', rotation, position)
+        if velocity is None:
+            return position
+        velocity = numpy.einsum('...ij,...j->...i', rotation, velocity)
+        velocity = velocity + numpy.cross(self.angular_velocity, position)
+        return position, velocity
+
+    def from_ecliptic(self, time, position, velocity=None):
+        """Convert vectors from the ecliptic frame to this frame
+
+        See to_ecliptic()
+        """
+        rotation = self.matrices_at_time(time)
+        if velocity is not None:
+            velocity = velocity - numpy.cross(self.angular_velocity, position)
+            velocity = numpy.einsum('...ji,...j->...i', rotation, velocity)
+        position = numpy.einsum('...ji,...j->...i', rotation, position)
+        if velocity is None:
+            return position
+        return position, velocity
+
+    def convert(self, frame, time, position, velocity=None):
+        """Convert vectors from this frame to another frame
+
+        See to_ecliptic()
+        """
+        if velocity is None:
+            position = self.to_ecliptic(time, position)
+            return frame.from_ecliptic(time, position)
+        position, velocity = self.to_ecliptic(time, position, velocity)
+        return frame.from_ecliptic(time, position, velocity)
+
+
+def pole_orientation(north_pole):
+    """Orientation of the frame whose z-axis points to `north_pole`
+
+    `north_pole` is a CelestialCoordinates. The x-axis is along the ascending
+    node of the equatorial plane on the ecliptic; for the Earth, this is the
+    vernal equinox.
+    """
+    longitude = north_pole.ecliptic_longitude
+    latitude = north_pole.ecliptic_latitude
+    return (
+        Mat3.rotation(longitude - math.pi/2, 0, 0, 1) *
+        Mat3.rotation(latitude - math.pi/2, 1, 0, 0)
+    )
+
+
+ecliptic = Frame("ecliptic")
+equatorial = Frame("equatorial", Mat3.rotation(
+    -CelestialCoordinates.obliquity_of_the_ecliptic, 1, 0, 0))
+
+
+@functools.lru_cache(maxsize=None)
+def body_equatorial(body):
+    """Inertial frame aligned with the equator of a CelestialBody"""
+    if body.north_pole is None:
+        orientation = None
+    else:
+        orientation = pole_orientation(body.north_pole)
+    return Frame("%s equatorial" % body, orientation)
+
+
+@functools.lru_cache(maxsize=None)
+def body_fixed(body):
+    """Frame rotating with a CelestialBody
+
+    At time 0, it matches body_equatorial(); the prime meridian is then along
+    the x-axis.
+    """
+    orientation = body_equatorial(body).orientation
+    return Frame("%s fixed" % body, orientation, body.rotational_period)
+
+
+def surface_state(body, longitude, latitude, altitude=0, time=0):
+    """State of points fixed relative to the surface of a CelestialBody
+
+    The longitudes and latitudes (rad), altitudes (m) and times (s) are
+    broadcast against each other. Return the positions and velocities
+    relative to the center of the body, within the ecliptic frame.
+    """
+    longitude, latitude, altitude, time = numpy.broadcast_arrays(
+        longitude, latitude, altitude, time)
+    distance = body.radius + altitude
+    position = numpy.stack([
+        distance * numpy.cos(latitude) * numpy.cos(longitude),
+        distance * numpy.cos(latitude) * numpy.sin(longitude),
+        distance * numpy.sin(latitude),
+    ], axis=-1)
+    velocity = numpy.zeros_like(position)
+    return body_fixed(body).to_ecliptic(time, position, velocity)
+
+
+def surface_coordinates(body, time, position):
+    """Longitudes, latitudes (rad) and altitudes (m) above a CelestialBody
+
+    `position` is an array of shape (..., 3) of positions relative to the
+    center of the body, within the ecliptic frame; it is broadcast against
+    `time`.
+    """
+    x, y, z = numpy.moveaxis(body_fixed(body).from_ecliptic(time, position),
+                             -1, 0)
+    distance = numpy.sqrt(x*x + y*y + z*z)
+    longitude = numpy.arctan2(y, x)
+    latitude = numpy.arctan2(z, numpy.hypot(x, y))
+    return longitude, latitude, distance - body.radius
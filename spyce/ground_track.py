@@ -0,0 +1,112 @@
+"""Ground tracks
+
+The sub-satellite point is the point of the surface of the primary directly
+below the satellite. Its track is computed for all times at once: the orbits
+are propagated with spyce.kepler, and the positions are converted to the
+body-fixed frame of the primary with spyce.frames.
+"""
+
+import math
+
+import numpy
+
+import spyce.frames
+import spyce.kepler
+from spyce.analysis import bisection_method
+from spyce.orbit_j2 import J2Orbit
+from spyce.orbit_determination import InvalidElements
+
+
+def ground_tracks(orbits, start, end, n=1000):
+    """Latitudes and longitudes (rad) of the sub-satellite points of orbits
+
+    Every orbit is sampled at `n` times evenly spaced from `start` to `end`
+    (s). Return two arrays of shape (len(orbits), n).
+    """
+    orbits = list(orbits)
+    times = numpy.linspace(start, end, n)
+
+    # propagate the orbits sharing the same primary at once
+    groups = {}
+    for index, orbit in enumerate(orbits):
+        groups.setdefault(orbit.primary, []).append(index)
+
+    latitude = numpy.empty((len(orbits), n))
+    longitude = numpy.empty((len(orbits), n))
+    for primary, indices in groups.items():
+        fixed = spyce.frames.body_fixed(primary)
+        position, _ = spyce.kepler.state_at_time(
+            [orbits[i] for i in indices], times, fixed)
+        x, y, z = numpy.moveaxis(position, -1, 0)
+        latitude[indices] = numpy.arctan2(z, numpy.hypot(x, y))
+        longitude[indices] = numpy.arctan2(y, x)
+    return latitude, longitude
+
+
+def ground_track(orbit, start, end, n=1000):
+    """Latitudes and longitudes (rad) of the sub-satellite point of an orbit
+
+    See ground_tracks()
+    """
+    latitude, longitude = ground_tracks([orbit], start, end, n)
+    return latitude[0], longitude[0]
+
+
+def nodal_period(orbit):
+    """Time (s) between two passes of the ascending node
+
+    This differs from the period when the argument of periapsis varies (see
+    J2Orbit).
+    """
+    rates = getattr(orbit, "rates", {})
+    return 2*math.pi / (
+        rates.get("mean_anomaly", orbit.mean_motion) +
+        rates.get("argument_of_periapsis", 0)
+    )
+
+
+def repeat_ground_track(primary, revolutions, days=1, eccentricity=0,
+                        inclination=0, longitude_of_ascending_node=0,
+                        argument_of_periapsis=0, epoch=0,
+                        mean_anomaly_at_epoch=0):
+    """Orbit whose ground track repeats after some revolutions
+
+    Look for the semi-major axis such that the satellite goes over the same
+    point of the surface after `revolutions` nodal periods, which last
+    about `days` rotations of `primary`. The secular effects of the
+    oblateness of the primary are taken into account (see J2Orbit); the
+    inclination is relative to the equator of the primary.
+    """
+    if primary.rotational_period == 0:
+        raise InvalidElements("primary does not rotate")
+
+    def orbit(semi_major_axis):
+        return J2Orbit.from_semi_major_axis(
+            primary, semi_major_axis, eccentricity,
+            inclination, longitude_of_ascending_node, argument_of_periapsis,
+            epoch, mean_anomaly_at_epoch,
+        )
+
+    def drift(semi_major_axis):
+        """Longitude shift (rad) of the ascending node after the cycle"""
+        o = orbit(semi_major_axis)
+        cycle = revolutions * nodal_period(o)
+        _, longitude = ground_track(o, epoch, epoch + cycle, 2)
+        difference = longitude[1] - longitude[0]
+        return (difference + math.pi) % (2*math.pi) - math.pi
+
+    # initial guess, without perturbations
+    mu = primary.gravitational_parameter
+    mean_motion = 2*math.pi / abs(primary.rotational_period) * \
+        revolutions / days
+    semi_major_axis = (mu / mean_motion**2)**(1/3)
+    if semi_major_axis * (1 - eccentricity) < primary.radius:
+        raise InvalidElements("orbit would go below the surface")
+
+    # the drift is monotonic and does not wrap around near the solution, as
+    # long as the duration of the cycle varies by less than half a rotation
+    width = min(.01, .2 / days)
+    a, b = semi_major_axis * (1 - width), semi_major_axis * (1 + width)
+    if drift(a) * drift(b) > 0:
+        raise InvalidElements("no repeat ground track found")
+    return orbit(bisection_method(drift, a, b))
@@ -0,0 +1,245 @@
+"""Vectorized Kepler propagation
+
+NumPy counterparts of the methods of OrbitAngles and OrbitState, to evaluate
+many orbits, or many times, in a single call. All arguments are broadcast
+against each other.
+"""
+
+import numpy
+
+import spyce.frames
+
+
+def eccentric_anomaly_at_mean_anomaly(eccentricity, mean_anomaly):
+    """Eccentric anomaly at given mean anomaly (see OrbitGeometry)"""
+    e, M = numpy.broadcast_arrays(
+        numpy.asarray(eccentricity, dtype=float),
+        numpy.asarray(mean_anomaly, dtype=float),
+    )
+    elliptic = e < 1
+    hyperbolic = e > 1
+
+    # reduce mean anomaly within [-pi, pi] for closed orbits
+    M = numpy.where(elliptic, numpy.remainder(M + numpy.pi, 2*numpy.pi)
+                    - numpy.pi, M)
+
+    # initial guesses (Danby's starters); parabolic trajectories are solved
+    # directly (see OrbitGeometry)
+    z = numpy.cbrt(M + numpy.sqrt(M**2 + 1))
+    E = numpy.where(
+        elliptic,
+        numpy.where(e < .8, M, numpy.pi * numpy.sign(M)),
+        numpy.where(
+            hyperbolic,
+            numpy.sign(M) * numpy.log(2*abs(M)/numpy.maximum(e, 1) + 1.8),
+            z - 1/z,
+        ),
+    )
+
+    # Newton-Raphson iterations, on all elements at once
+    with numpy.errstate(over='ignore', invalid='ignore'):
+        for _ in range(50):
+            f = numpy.where(elliptic, E - e*numpy.sin(E) - M,
+                            e*numpy.sinh(E) - E - M)
+            f_prime = numpy.where(elliptic, 1 - e*numpy.cos(E),
+                                  e*numpy.cosh(E) - 1)
+            step = numpy.where(elliptic | hyperbolic, f / f_prime, 0.)
+            step = numpy.nan_to_num(step)
+            E = E - step
+            if not numpy.any(abs(step) > 1e-15 * numpy.maximum(1, abs(E))):
+                break
+    return E
+
+
+def true_anomaly_at_eccentric_anomaly(eccentricity, eccentric_anomaly):
+    """True anomaly at given eccentric anomaly (see OrbitGeometry)"""
+    e = numpy.asarray(eccentricity, dtype=float)
+    E = numpy.asarray(eccentric_anomaly, dtype=float)
+    with numpy.errstate(invalid='ignore'):
+        elliptic = 2 * numpy.arctan2(
+            numpy.sqrt(1+e) * numpy.sin(E/2),
+            numpy.sqrt(1-e) * numpy.cos(E/2),
+        )
+        hyperbolic = 2 * numpy.arctan2(
+            numpy.sqrt(e+1) * numpy.sinh(E/2),
+            numpy.sqrt(e-1) * numpy.cosh(E/2),
+        )
+    parabolic = 2 * numpy.arctan(E)
+    return numpy.where(e < 1, elliptic,
+                       numpy.where(e > 1, hyperbolic, parabolic))
+
+
+def true_anomaly_at_mean_anomaly(eccentricity, mean_anomaly):
+    """True anomaly at given mean anomaly (see OrbitGeometry)"""
+    E = eccentric_anomaly_at_mean_anomaly(eccentricity, mean_anomaly)
+    return true_anomaly_at_eccentric_anomaly(eccentricity, E)
+
+
+def mean_anomaly_at_true_anomaly(eccentricity, true_anomaly):
+    """Mean anomaly at given true anomaly (see OrbitGeometry)"""
+    e = numpy.asarray(eccentricity, dtype=float)
+    v = numpy.asarray(true_anomaly, dtype=float)
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        # eccentric anomaly
+        elliptic = 2 * numpy.arctan2(
+            numpy.sqrt(1-e) * numpy.sin(v/2),
+            numpy.sqrt(1+e) * numpy.cos(v/2),
+        )
+        hyperbolic = 2 * numpy.arctanh(
+            numpy.sqrt((e-1)/(e+1)) * numpy.tan(v/2))
+        parabolic = numpy.tan(v/2)
+        E = numpy.where(e < 1, elliptic,
+                        numpy.where(e > 1, hyperbolic, parabolic))
+
+        # mean anomaly
+        return numpy.where(
+            e < 1, E - e*numpy.sin(E),
+            numpy.where(e > 1, e*numpy.sinh(E) - E, (E**3 + E*3) / 2),
+        )
+
+
+def rotation_matrices(longitude_of_ascending_node, inclination,
+                      argument_of_periapsis):
+    """Rotation matrices from the orbital planes (see Mat3)
+
+    Return an array of shape (..., 3, 3)"""
+    c1, s1 = numpy.cos(longitude_of_ascending_node), \
+        numpy.sin(longitude_of_ascending_node)
+    c2, s2 = numpy.cos(inclination), numpy.sin(inclination)
+    c3, s3 = numpy.cos(argument_of_periapsis), \
+        numpy.sin(argument_of_periapsis)
+    c1, s1, c2, s2, c3, s3 = numpy.broadcast_arrays(c1, s1, c2, s2, c3, s3)
+    return numpy.stack([
+        numpy.stack([c1*c3-c2*s1*s3, -c1*s3-c2*c3*s1, s1*s2], axis=-1),
+        numpy.stack([c3*s1+c1*c2*s3, c1*c2*c3-s1*s3, -c1*s2], axis=-1),
+        numpy.stack([s2*s3, c3*s2, c2], axis=-1),
+    ], axis=-2)
+
+
+def state_at_true_anomaly(gravitational_parameter, semi_latus_rectum,
+                          eccentricity, transform, true_anomaly):
+    """Position and velocity vectors at given true anomaly
+
+    `transform` is an array of rotation matrices (see rotation_matrices()).
+    Return two arrays of shape (..., 3).
+    """
+    mu = numpy.asarray(gravitational_parameter, dtype=float)
+    p = numpy.asarray(semi_latus_rectum, dtype=float)
+    e = numpy.asarray(eccentricity, dtype=float)
+    c = numpy.cos(true_anomaly)
+    s = numpy.sin(true_anomaly)
+
+    distance = p / (1 + e*c)
+    zero = numpy.zeros_like(distance)
+    position = numpy.stack([distance*c, distance*s, zero], axis=-1)
+    k = numpy.sqrt(mu / p)
+    velocity = numpy.stack(numpy.broadcast_arrays(-k*s, k*(e+c), zero),
+                           axis=-1)
+
+    position = numpy.einsum('...ij,...j->...i', transform, position)
+    velocity = numpy.einsum('...ij,...j->...i', transform, velocity)
+    return position, velocity
+
+
+def state_from_elements(
+    gravitational_parameter, periapsis, eccentricity, inclination,
+    longitude_of_ascending_node, argument_of_periapsis, mean_anomaly,
+):
+    """Position and velocity vectors from orbital elements
+
+    All arguments are broadcast against each other. Return two arrays of
+    shape (..., 3).
+    """
+    e = numpy.asarray(eccentricity, dtype=float)
+    semi_latus_rectum = numpy.asarray(periapsis, dtype=float) * (1 + e)
+    transform = rotation_matrices(
+        longitude_of_ascending_node, inclination, argument_of_periapsis)
+    v = true_anomaly_at_mean_anomaly(e, mean_anomaly)
+    return state_at_true_anomaly(
+        gravitational_parameter, semi_latus_rectum, e, transform, v)
+
+
+def state_at_time(orbits, time, frame=None):
+    """Positions and velocities of several orbits at given time(s)
+
+    Every orbit is evaluated at every time. `orbits` is a sequence of Orbit
+    (or of any subclass implementing elements_at_time()). `time` may be a
+    number or an array. The vectors are in the frame of the orbital elements
+    of each orbit (see Orbit.reference_frame), or converted to `frame` when
+    given. Return two arrays of shape
+    (len(orbits),) + numpy.shape(time) + (3,).
+    """
+    time = numpy.asarray(time, dtype=float)
+    elements = numpy.array([
+        [
+            numpy.broadcast_to(element, time.shape)
+            for element in orbit.elements_at_time(time) +
+            (orbit.primary.gravitational_parameter,)
+        ]
+        for orbit in orbits
+    ], dtype=float)
+    periapsis, e, i, Omega, omega, M, mu = numpy.moveaxis(elements, 1, 0)
+    position, velocity = state_from_elements(
+        mu, periapsis, e, i, Omega, omega, M)
+    if frame is None:
+        return position, velocity
+
+    # convert the orbits sharing the same frame at once
+    for source in set(orbit.reference_frame for orbit in orbits):
+        if source is frame:
+            continue
+        indices = [index for index, orbit in enumerate(orbits)
+                   if orbit.reference_frame is source]
+        position[indices], velocity[indices] = source.convert(
+            frame, time, position[indices], velocity[indices])
+    return position, velocity
+
+
+def position_at_time(orbit, time):
+    """Positions of an orbit relative to its primary, in the ecliptic frame
+
+    Return an array of shape numpy.shape(time) + (3,).
+    """
+    return relative_state_at_time(orbit, time)[0]
+
+
+def relative_state_at_time(orbit, time):
+    """Positions and velocities of an orbit relative to its primary
+
+    Return two arrays of shape numpy.shape(time) + (3,), in the ecliptic
+    frame.
+    """
+    (position,), (velocity,) = state_at_time(
+        [orbit], time, spyce.frames.ecliptic)
+    return position, velocity
+
+
+def global_position_at_time(body, time):
+    """Positions of a celestial body relative to the root of its system
+
+    See CelestialBody.global_position_at_time(); return an array of shape
+    numpy.shape(time) + (3,).
+    """
+    time = numpy.asarray(time, dtype=float)
+    position = numpy.zeros(time.shape + (3,))
+    while body.orbit is not None:
+        position += position_at_time(body.orbit, time)
+        body = body.orbit.primary
+    return position
+
+
+def global_state_at_time(body, time):
+    """Positions and velocities of a body relative to the root of its system
+
+    Return two arrays of shape numpy.shape(time) + (3,), in the ecliptic
+    frame.
+    """
+    time = numpy.asarray(time, dtype=float)
+    position = numpy.zeros(time.shape + (3,))
+    velocity = numpy.zeros(time.shape + (3,))
+    while body.orbit is not None:
+        p, v = relative_state_at_time(body.orbit, time)
+        position += p
+        velocity += v
+        body = body.orbit.primary
+    return position, velocity
@@ -0,0 +1,113 @@
+"""Lambert's problem
+
+Find the orbit going from one position to another in a given time. This
+implements the universal variable formulation (Bate, Mueller and White,
+"Fundamentals of Astrodynamics", 1971), for transfers of less than one
+revolution. The universal variable is found by bisection, which is slower
+than Newton's method for a single problem but cannot diverge, and works on
+whole arrays of problems at once.
+"""
+
+import math
+
+import numpy
+
+
+def stumpff(z):
+    """Stumpff functions C(z) and S(z)"""
+    z = numpy.asarray(z, dtype=float)
+    small = numpy.abs(z) < 1e-3
+    positive = z > 0
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        root = numpy.sqrt(numpy.abs(z))
+        c = numpy.where(
+            positive,
+            (1 - numpy.cos(root)) / z,
+            (numpy.cosh(root) - 1) / -z,
+        )
+        s = numpy.where(
+            positive,
+            (root - numpy.sin(root)) / root**3,
+            (numpy.sinh(root) - root) / root**3,
+        )
+    # series expansions near zero
+    c = numpy.where(small, 1/2 - z/24 + z**2/720, c)
+    s = numpy.where(small, 1/6 - z/120 + z**2/5040, s)
+    return c, s
+
+
+def solve(gravitational_parameter, position1, position2, time_of_flight,
+          retrograde=False, iterations=80):
+    """Velocities at both ends of the transfer orbits
+
+    Arguments:
+    gravitational_parameter  m^3/s^2, of the primary
+    position1, position2     m, arrays of shape (..., 3)
+    time_of_flight           s, array of shape (...)
+    retrograde               whether the transfer goes clockwise around the
+                             z axis
+
+    Return two arrays of shape (..., 3): the velocities (m/s) on the transfer
+    orbits at `position1` and at `position2`. When there is no solution (or
+    when the positions are opposite, which leaves the plane undefined), the
+    velocities are NaN.
+    """
+    mu = float(gravitational_parameter)
+    r1 = numpy.asarray(position1, dtype=float)
+    r2 = numpy.asarray(position2, dtype=float)
+    time_of_flight = numpy.asarray(time_of_flight, dtype=float)
+    r1, r2 = numpy.broadcast_arrays(r1, r2)
+    shape = numpy.broadcast_shapes(r1.shape[:-1], time_of_flight.shape)
+    r1 = numpy.broadcast_to(r1, shape + (3,))
+    r2 = numpy.broadcast_to(r2, shape + (3,))
+    time_of_flight = numpy.broadcast_to(time_of_flight, shape)
+
+    n1 = numpy.linalg.norm(r1, axis=-1)
+    n2 = numpy.linalg.norm(r2, axis=-1)
+    cos_angle = numpy.einsum('...i,...i->...', r1, r2) / (n1 * n2)
+    cos_angle = numpy.clip(cos_angle, -1, 1)
+    angle = numpy.arccos(cos_angle)
+    normal = numpy.cross(r1, r2)[..., 2]
+    long_way = normal >= 0 if retrograde else normal < 0
+    angle = numpy.where(long_way, 2*math.pi - angle, angle)
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        A = numpy.sin(angle) * numpy.sqrt(n1 * n2 / (1 - cos_angle))
+
+    def y_at(z):
+        c, s = stumpff(z)
+        return n1 + n2 + A * (z * s - 1) / numpy.sqrt(c), c, s
+
+    # the time of flight increases with z, from hyperbolic orbits (z < 0)
+    # to orbits with a period of a full revolution (z = 4 pi^2)
+    lower = numpy.full(shape, -4 * math.pi**2 * 2500)
+    upper = numpy.full(shape, 4 * math.pi**2)
+    sqrt_mu = math.sqrt(mu)
+    for _ in range(iterations):
+        z = (lower + upper) / 2
+        with numpy.errstate(invalid='ignore', divide='ignore'):
+            y, c, s = y_at(z)
+            x = numpy.sqrt(y / c)
+            time = (x**3 * s + A * numpy.sqrt(y)) / sqrt_mu
+        # y < 0 only happens for small z, when A > 0
+        too_short = (y < 0) | (time < time_of_flight)
+        lower = numpy.where(too_short, z, lower)
+        upper = numpy.where(too_short, upper, z)
+
+    z = (lower + upper) / 2
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        y, c, s = y_at(z)
+        x = numpy.sqrt(y / c)
+        time = (x**3 * s + A * numpy.sqrt(y)) / sqrt_mu
+        # Lagrange coefficients
+        f = 1 - y / n1
+        g = A * numpy.sqrt(y / mu)
+        g_dot = 1 - y / n2
+        velocity1 = (r2 - f[..., None] * r1) / g[..., None]
+        velocity2 = (g_dot[..., None] * r2 - r1) / g[..., None]
+
+    converged = numpy.abs(time - time_of_flight) <= 1e-6 * time_of_flight
+    converged &= numpy.abs(A) > 1e-9 * numpy.sqrt(n1 * n2)  # not collinear
+    converged &= y >= 0
+    velocity1[~converged] = numpy.nan
+    velocity2[~converged] = numpy.nan
+    return velocity1, velocity2
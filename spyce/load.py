@@ -4,6 +4,7 @@ import pkgutil
 from spyce.body import CelestialBody
 from spyce.human import to_human_date, to_kerbal_date
 from spyce.orbit import Orbit
+from spyce.orbit_rates import RatedOrbit
 from spyce.coordinates import CelestialCoordinates
 
 
@@ -25,7 +26,12 @@ def load_body(bodies, data, name):
         pass
     else:
         orbit_data["primary"] = load_body(bodies, data, orbit_data["primary"])
-        body_data["orbit"] = Orbit.from_semi_major_axis(**orbit_data)
+        if "rates" in orbit_data:
+            # elements varying over time
+            orbit = RatedOrbit.from_semi_major_axis(**orbit_data)
+        else:
+            orbit = Orbit.from_semi_major_axis(**orbit_data)
+        body_data["orbit"] = orbit
 
     try:
         north_pole = body_data["north_pole"]
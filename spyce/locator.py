@@ -0,0 +1,146 @@
+"""Sphere of influence containing arbitrary positions
+
+Global positions are relative to the star at the root of the system, in the
+ecliptic frame (see spyce.kepler.global_position_at_time()). A point belongs
+to the sphere of influence of the deepest body containing it: the locator
+starts from the star, and descends into a satellite when the point is within
+its sphere of influence.
+
+Most satellites are discarded without computing their positions: a point
+can only be within the sphere of influence of a satellite when its distance
+to the primary is within the shell spanned by the orbit of the satellite,
+from its periapsis minus the radius of the sphere of influence to its
+apoapsis plus this radius. The global positions of the bodies which are
+actually needed are cached for the last few times queried.
+"""
+
+import collections
+import math
+
+import numpy
+
+import spyce.kepler
+
+
+class Locator:
+    """Find the spheres of influence containing global positions"""
+    def __init__(self, root, cache_size=16):
+        """Locator for the system of the star `root`
+
+        The global positions of the bodies are cached for the last
+        `cache_size` times queried.
+        """
+        self.root = root
+        self.cache_size = cache_size
+        self.children = {}  # body -> satellites with a sphere of influence
+        self.shells = {}  # satellite -> (lower, upper) distance to primary
+
+        def collect(body):
+            children = []
+            for satellite in body.satellites:
+                if getattr(satellite, "orbit", None) is None:
+                    continue
+                radius = satellite.sphere_of_influence
+                if not 0 < radius < math.inf:
+                    continue
+                orbit = satellite.orbit
+                upper = orbit.apoapsis if orbit.eccentricity < 1 else math.inf
+                self.shells[satellite] = (
+                    orbit.periapsis - radius, upper + radius)
+                children.append(satellite)
+                collect(satellite)
+            self.children[body] = children
+        collect(root)
+
+        self._positions = collections.OrderedDict()  # time -> {body: pos}
+
+    def __repr__(self):
+        return "<Locator of %s>" % self.root
+
+    def global_position(self, body, time):
+        """Global position of a body (cached), as an array of shape (3,)"""
+        time = float(time)
+        positions = self._positions.get(time)
+        if positions is None:
+            positions = {self.root: numpy.zeros(3)}
+            self._positions[time] = positions
+            while len(self._positions) > self.cache_size:
+                self._positions.popitem(last=False)
+        else:
+            self._positions.move_to_end(time)
+        position = positions.get(body)
+        if position is None:
+            position = self.global_position(body.orbit.primary, time) + \
+                spyce.kepler.position_at_time(body.orbit, time)
+            positions[body] = position
+        return position
+
+    def locate(self, position, time):
+        """Body whose sphere of influence contains a global position (m)"""
+        position = numpy.asarray(position, dtype=float)
+        body = self.root
+        relative = position
+        while True:
+            distance = numpy.linalg.norm(relative)
+            for child in self.children[body]:
+                lower, upper = self.shells[child]
+                if not lower <= distance <= upper:
+                    continue
+                offset = position - self.global_position(child, time)
+                if numpy.linalg.norm(offset) <= child.sphere_of_influence:
+                    body = child
+                    relative = offset
+                    break
+            else:
+                return body
+
+    def locate_state(self, position, velocity, time):
+        """Primary and relative state of a global state
+
+        Return the body whose sphere of influence contains `position` (m),
+        and the position (m) and velocity (m/s) relative to it, in the
+        ecliptic frame; for instance, to start a simulation with
+        Orbit.from_state().
+        """
+        body = self.locate(position, time)
+        body_position, body_velocity = spyce.kepler.global_state_at_time(
+            body, time)
+        return (body, numpy.subtract(position, body_position),
+                numpy.subtract(velocity, body_velocity))
+
+    def locate_many(self, positions, time):
+        """Bodies whose spheres of influence contain global positions (m)
+
+        `positions` is an array of shape (n, 3); `time` is a number, or an
+        array of shape (n,). Return an array of n bodies (of dtype object).
+        """
+        positions = numpy.asarray(positions, dtype=float).reshape(-1, 3)
+        times = numpy.broadcast_to(
+            numpy.asarray(time, dtype=float), positions.shape[:1])
+        result = numpy.empty(len(positions), dtype=object)
+        result[:] = [self.root] * len(positions)
+
+        # (body, indices of the points within its sphere of influence,
+        # relative positions of these points)
+        stack = [(self.root, numpy.arange(len(positions)), positions)]
+        while stack:
+            body, indices, relative = stack.pop()
+            distance = numpy.linalg.norm(relative, axis=-1)
+            remaining = numpy.ones(len(indices), dtype=bool)
+            for child in self.children[body]:
+                lower, upper = self.shells[child]
+                candidates = numpy.flatnonzero(
+                    remaining & (lower <= distance) & (distance <= upper))
+                if len(candidates) == 0:
+                    continue
+                offset = relative[candidates] - spyce.kepler.position_at_time(
+                    child.orbit, times[indices[candidates]])
+                inside = numpy.linalg.norm(offset, axis=-1) <= \
+                    child.sphere_of_influence
+                if not inside.any():
+                    continue
+                selected = candidates[inside]
+                remaining[selected] = False
+                result[indices[selected]] = child
+                stack.append((child, indices[selected], offset[inside]))
+        return result
@@ -0,0 +1,197 @@
+"""Minor Planet Center orbit database (MPCORB)
+
+The catalog of the orbits of the known minor planets (over a million objects)
+is published by the Minor Planet Center as a fixed-width text file, MPCORB.DAT
+(see https://minorplanetcenter.net/iau/info/MPOrbitFormat.html). The records
+are parsed by chunks, one column at a time, and yielded as OrbitArray
+instances; the catalog can also be converted once to a binary file that is
+then memory-mapped.
+
+The elements are heliocentric, relative to the ecliptic of J2000, like those
+of the planets in solar.json.
+"""
+
+import contextlib
+import gzip
+
+import numpy
+
+import spyce.orbit_array
+from spyce.physics import au
+
+
+# fields of a record, as (name, format, offset); offsets start at 0
+fields = (
+    ("designation", "S7", 0),  # packed
+    ("epoch", "S5", 20),  # packed, 0h TT
+    ("mean_anomaly_at_epoch", "S9", 26),  # deg
+    ("argument_of_periapsis", "S9", 37),  # deg
+    ("longitude_of_ascending_node", "S9", 48),  # deg
+    ("inclination", "S9", 59),  # deg
+    ("eccentricity", "S9", 70),  # -
+    ("mean_motion", "S11", 80),  # deg/day
+    ("semi_major_axis", "S11", 92),  # AU
+)
+record_dtype = numpy.dtype({
+    "names": [name for name, _, _ in fields],
+    "formats": [format for _, format, _ in fields],
+    "offsets": [offset for _, _, offset in fields],
+    "itemsize": 103,
+})
+
+
+def is_record(line):
+    """Whether a line of MPCORB.DAT describes an orbit
+
+    Header lines and blank lines are not records.
+    """
+    # check the decimal points of the mean anomaly and of the semi-major axis
+    return (
+        len(line) >= record_dtype.itemsize and
+        line[29:30] == b"." and line[95:96] == b"."
+    )
+
+
+def unpack_digits(codes):
+    """Values of packed digits ("0" to "9", then "A" for 10, and so on)"""
+    codes = codes.astype(int)
+    return numpy.where(codes >= ord("A"), codes - ord("A") + 10,
+                       codes - ord("0"))
+
+
+def unpack_epochs(packed):
+    """Dates (s) from packed epochs (e.g. b"K2427" for 2024-02-07)"""
+    packed = numpy.ascontiguousarray(packed, dtype="S5")
+    digits = unpack_digits(packed.view(numpy.uint8).reshape(-1, 5))
+    year = digits[:, 0]*100 + digits[:, 1]*10 + digits[:, 2]
+    month = digits[:, 3]
+    day = digits[:, 4]
+    date = (year - 1970).astype("datetime64[Y]").astype("datetime64[M]")
+    date = (date + (month - 1)).astype("datetime64[D]") + (day - 1)
+    days = (date - numpy.datetime64("2000-01-01")).astype(float)
+    # J2000 is at noon
+    return (days - .5) * 86400.
+
+
+def parse_records(lines, primary):
+    """Designations and orbits from a list of records (bytes)"""
+    buffer = b"".join(line[:record_dtype.itemsize] for line in lines)
+    records = numpy.frombuffer(buffer, dtype=record_dtype)
+
+    def column(name):
+        return records[name].astype(float)
+
+    eccentricity = column("eccentricity")
+    orbits = spyce.orbit_array.OrbitArray(
+        primary,
+        column("semi_major_axis") * au * (1 - eccentricity),
+        eccentricity,
+        numpy.radians(column("inclination")),
+        numpy.radians(column("longitude_of_ascending_node")),
+        numpy.radians(column("argument_of_periapsis")),
+        unpack_epochs(records["epoch"]),
+        numpy.radians(column("mean_anomaly_at_epoch")),
+    )
+    return numpy.char.strip(records["designation"]), orbits
+
+
+@contextlib.contextmanager
+def open_catalog(file):
+    """Open a path (possibly to a gzipped file) or use a binary file object"""
+    if hasattr(file, "read"):
+        yield file
+    elif str(file).endswith(".gz"):
+        with gzip.open(file) as f:
+            yield f
+    else:
+        with open(file, "rb") as f:
+            yield f
+
+
+def sun():
+    """Default primary of the minor planets"""
+    import spyce.load
+    return spyce.load.solar["Sun"]
+
+
+def read_chunks(file, primary=None, chunk_size=100000):
+    """Parse MPCORB.DAT by chunks of at most `chunk_size` records
+
+    `file` is a path, or a file object opened in binary mode. Yield pairs of
+    an array of packed designations and of an OrbitArray around `primary`
+    (default: the Sun from solar.json).
+    """
+    if primary is None:
+        primary = sun()
+    with open_catalog(file) as f:
+        lines = []
+        for line in f:
+            if not is_record(line):
+                continue
+            lines.append(line)
+            if len(lines) == chunk_size:
+                yield parse_records(lines, primary)
+                lines = []
+        if lines:
+            yield parse_records(lines, primary)
+
+
+def load(file, primary=None, chunk_size=100000):
+    """Designations and orbits of the whole catalog (see read_chunks())"""
+    designations = []
+    orbits = []
+    for chunk_designations, chunk_orbits in \
+            read_chunks(file, primary, chunk_size):
+        designations.append(chunk_designations)
+        orbits.append(chunk_orbits)
+    if not orbits:
+        raise ValueError("no record found in catalog")
+    designations = numpy.concatenate(designations)
+    return designations, spyce.orbit_array.OrbitArray.concatenate(orbits)
+
+
+def convert(file, output, designations_output=None, primary=None,
+            chunk_size=100000):
+    """Convert MPCORB.DAT to a NumPy binary file (see memory_map())
+
+    The catalog is read twice (first to count the records), so that the
+    memory usage does not depend on its size. If `designations_output` is
+    given, the packed designations are saved there, in the same order.
+    """
+    with open_catalog(file) as f:
+        count = sum(1 for line in f if is_record(line))
+    if count == 0:
+        raise ValueError("no record found in catalog")
+    if hasattr(file, "seek"):
+        file.seek(0)
+
+    columns = spyce.orbit_array.OrbitArray.columns
+    data = numpy.lib.format.open_memmap(
+        output, mode="w+", shape=(len(columns), count))
+    designations = None
+    if designations_output is not None:
+        designations = numpy.lib.format.open_memmap(
+            designations_output, mode="w+", dtype="S7", shape=(count,))
+
+    start = 0
+    for chunk_designations, orbits in read_chunks(file, primary, chunk_size):
+        stop = start + len(orbits)
+        data[:, start:stop] = orbits.data
+        if designations is not None:
+            designations[start:stop] = chunk_designations
+        start = stop
+    data.flush()
+    if designations is not None:
+        designations.flush()
+
+
+def memory_map(path, primary=None):
+    """OrbitArray backed by a file written by convert()
+
+    The orbits are only read from disk when accessed. The derived constants
+    (e.g. mean motion) were computed for the primary given to convert().
+    """
+    if primary is None:
+        primary = sun()
+    data = numpy.load(path, mmap_mode="r")
+    return spyce.orbit_array.OrbitArray.from_data(primary, data)
@@ -0,0 +1,280 @@
+"""Communication networks of satellites and ground stations
+
+Two nodes are linked when they are within the range of both antennas (as in
+RemoteTech) and when no celestial body blocks the line of sight. At each
+time step, the ranges and occlusions of all the pairs of nodes are tested at
+once; the positions of the nodes are themselves computed for chunks of time
+steps at once. The changes of the links between two steps are reported, and
+the latency to the home station is the length of the shortest path divided
+by the speed of light. Since relays tend to see most of each other, the graph
+is dense, and the shortest paths are searched on its adjacency matrix.
+"""
+
+import math
+
+import numpy
+
+import spyce.eclipse
+import spyce.frames
+import spyce.kepler
+import spyce.physics
+
+
+class Satellite:
+    """Node of a network on an orbit"""
+    def __init__(self, name, orbit, communication_range):
+        """Satellite with an antenna of given range (m)"""
+        self.name = name
+        self.orbit = orbit
+        self.communication_range = float(communication_range)
+
+    def __repr__(self):
+        return "<Satellite %s>" % self.name
+
+
+class GroundStation:
+    """Node of a network fixed at the surface of a celestial body"""
+    def __init__(self, name, body, latitude, longitude, altitude=0,
+                 communication_range=math.inf):
+        """Station at given latitude, longitude (rad) and altitude (m)"""
+        self.name = name
+        self.body = body
+        self.latitude = float(latitude)
+        self.longitude = float(longitude)
+        self.altitude = float(altitude)
+        self.communication_range = float(communication_range)
+
+    def __repr__(self):
+        return "<GroundStation %s>" % self.name
+
+
+def positions_at_time(nodes, times):
+    """Global positions of nodes at several times
+
+    Return an array of shape (len(times), len(nodes), 3).
+    """
+    times = numpy.asarray(times, dtype=float)
+    positions = numpy.empty((len(times), len(nodes), 3))
+    satellites = [i for i, node in enumerate(nodes)
+                  if isinstance(node, Satellite)]
+
+    # propagate the satellites sharing a primary at once
+    groups = {}
+    for i in satellites:
+        groups.setdefault(nodes[i].orbit.primary, []).append(i)
+    for primary, indices in groups.items():
+        orbits = [nodes[i].orbit for i in indices]
+        position, _ = spyce.kepler.state_at_time(
+            orbits, times, spyce.frames.ecliptic)
+        center = spyce.kepler.global_position_at_time(primary, times)
+        positions[:, indices] = numpy.swapaxes(position, 0, 1) + \
+            center[:, None]
+
+    for i, node in enumerate(nodes):
+        if isinstance(node, GroundStation):
+            position, _ = spyce.frames.surface_state(
+                node.body, node.longitude, node.latitude, node.altitude,
+                times)
+            center = spyce.kepler.global_position_at_time(node.body, times)
+            positions[:, i] = position + center
+    return positions
+
+
+def occluded(first, second, centers, radii):
+    """Whether spheres block the segments from `first` to `second`
+
+    `first` and `second` are arrays of shape (n, 3); `centers` and `radii`
+    describe m spheres. Return an array of booleans of shape (n,).
+    """
+    segment = second - first
+    length = numpy.einsum('ij,ij->i', segment, segment)
+    result = numpy.zeros(len(first), dtype=bool)
+    for center, radius in zip(centers, radii):
+        to_center = center - first
+        with numpy.errstate(invalid='ignore', divide='ignore'):
+            t = numpy.einsum('ij,ij->i', to_center, segment) / length
+        t = numpy.clip(numpy.nan_to_num(t), 0, 1)
+        closest = first + t[:, None] * segment - center
+        distance = numpy.linalg.norm(closest, axis=-1)
+        # ground stations are exactly at the surface
+        result |= distance < radius * (1 - 1e-6)
+    return result
+
+
+class Network:
+    """Links between nodes, updated over time
+
+    Call update() (or iterate over timeline()) to advance the network in
+    time, then query it with links(), latency() or path().
+    """
+
+    def __init__(self, nodes, home, bodies=None, chunk_size=256):
+        """Network of nodes (Satellite or GroundStation)
+
+        `home` is the node to which the latencies are computed. The lines of
+        sight may be blocked by `bodies` (default: the bodies which may
+        eclipse the nodes, see spyce.eclipse.occulting_bodies(), and the
+        star). Positions are computed for `chunk_size` times at once.
+        """
+        self.nodes = list(nodes)
+        self.home = self.nodes.index(home)
+        self.chunk_size = chunk_size
+
+        if bodies is None:
+            bodies = []
+            for node in self.nodes:
+                if isinstance(node, Satellite):
+                    body = node.orbit.primary
+                else:
+                    body = node.body
+                candidates = spyce.eclipse.occulting_bodies(body)
+                candidates.append(spyce.eclipse.root(body))
+                for candidate in candidates:
+                    if candidate not in bodies:
+                        bodies.append(candidate)
+        self.bodies = list(bodies)
+        self.radii = numpy.array([body.radius for body in self.bodies])
+
+        ranges = numpy.array([node.communication_range for node in self.nodes])
+        self.max_distance = numpy.minimum(ranges[:, None], ranges[None, :])
+        self.first, self.second = numpy.triu_indices(len(self.nodes), 1)
+
+        self.time = None
+        self.positions = None
+        self.distances = None
+        self.linked = numpy.zeros(len(self.first), dtype=bool)
+        self._latencies = None
+        self._cache = None  # (times, positions, body centers)
+
+    def chunk_at_time(self, time):
+        """Positions of the nodes and of the bodies, computed by chunks"""
+        if self._cache is not None:
+            times, positions, centers = self._cache
+            index = numpy.searchsorted(times, time)
+            if index < len(times) and times[index] == time:
+                return positions[index], centers[index]
+        return self.positions_at_times([time])
+
+    def positions_at_times(self, times):
+        """Positions of the nodes and of the bodies at several times"""
+        positions = positions_at_time(self.nodes, times)
+        centers = numpy.stack([
+            spyce.kepler.global_position_at_time(body, times)
+            for body in self.bodies
+        ], axis=1)
+        if len(times) == 1:
+            return positions[0], centers[0]
+        return positions, centers
+
+    def update(self, time):
+        """Compute the links at given time (s)
+
+        Return the lists of the added and removed links, as pairs of nodes.
+        """
+        positions, centers = self.chunk_at_time(time)
+        first, second = self.first, self.second
+        difference = positions[second] - positions[first]
+        distances = numpy.linalg.norm(difference, axis=-1)
+        linked = distances <= self.max_distance[first, second]
+        candidates = numpy.flatnonzero(linked)
+        linked[candidates] = ~occluded(
+            positions[first[candidates]], positions[second[candidates]],
+            centers, self.radii,
+        )
+
+        changed = linked != self.linked
+        added = self.pairs(changed & linked)
+        removed = self.pairs(changed & self.linked)
+
+        self.time = time
+        self.positions = positions
+        self.distances = distances
+        self.linked = linked
+        self._latencies = None
+        return added, removed
+
+    def timeline(self, times):
+        """Update the network at successive times
+
+        Yield tuples (time, added, removed); see update().
+        """
+        times = numpy.asarray(times, dtype=float)
+        for start in range(0, len(times), self.chunk_size):
+            chunk = times[start:start+self.chunk_size]
+            self._cache = (chunk,) + self.positions_at_times(chunk) \
+                if len(chunk) > 1 else None
+            for time in chunk:
+                added, removed = self.update(time)
+                yield time, added, removed
+        self._cache = None
+
+    def pairs(self, mask):
+        """Pairs of nodes selected by a mask over all the pairs"""
+        first = self.first[mask].tolist()
+        second = self.second[mask].tolist()
+        return [(self.nodes[i], self.nodes[j]) for i, j in zip(first, second)]
+
+    def links(self):
+        """Current links, as pairs of nodes"""
+        return self.pairs(self.linked)
+
+    def distance(self, i, j):
+        """Current distance (m) between nodes of given indices"""
+        return numpy.linalg.norm(self.positions[i] - self.positions[j])
+
+    def latencies(self):
+        """Shortest paths from the home station (Dijkstra's algorithm)
+
+        Return two arrays: the latencies (s) of each node (math.inf when not
+        connected), and the index of the previous node on its path (-1 for
+        the home station and for nodes not connected).
+        """
+        if self._latencies is not None:
+            return self._latencies
+        n = len(self.nodes)
+        delay = numpy.full((n, n), math.inf)
+        first = self.first[self.linked]
+        second = self.second[self.linked]
+        delay[first, second] = self.distances[self.linked] / spyce.physics.c
+        delay[second, first] = delay[first, second]
+
+        latency = numpy.full(n, math.inf)
+        previous = numpy.full(n, -1)
+        done = numpy.zeros(n, dtype=bool)
+        latency[self.home] = 0.
+        for _ in range(n):
+            i = numpy.argmin(numpy.where(done, math.inf, latency))
+            if done[i] or latency[i] == math.inf:
+                break
+            done[i] = True
+            # relax all the links of the closest node at once
+            through = latency[i] + delay[i]
+            better = through < latency
+            latency[better] = through[better]
+            previous[better] = i
+        self._latencies = latency, previous
+        return self._latencies
+
+    def latency(self, node):
+        """Current latency (s) between a node and the home station"""
+        latency, _ = self.latencies()
+        return latency[self.nodes.index(node)]
+
+    def connected(self, node):
+        """Whether a node can currently reach the home station"""
+        return self.latency(node) < math.inf
+
+    def path(self, node):
+        """Current shortest path from a node to the home station
+
+        Return the list of the nodes, or None when not connected.
+        """
+        _, previous = self.latencies()
+        i = self.nodes.index(node)
+        if i != self.home and previous[i] < 0:
+            return None
+        path = [self.nodes[i]]
+        while i != self.home:
+            i = previous[i]
+            path.append(self.nodes[i])
+        return path
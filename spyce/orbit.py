@@ -1,27 +1,35 @@
 import math
 
 from spyce.vector import Mat3
+import spyce.frames
 import spyce.orbit_determination
 import spyce.orbit_angles
 import spyce.orbit_state
 import spyce.orbit_target
+import spyce.orbit_maneuver
 
 
-# NOTE: to ease reading, Orbit is split into three base classes
+# NOTE: to ease reading, Orbit is split into several base classes
 #       OrbitDetermination contains alternate constructors
 #       OrbitAngles contains methods to convert anomalies and times
 #       OrbitState contains methods to predict position and velocity
 #       OrbitTarget contains methods to predict near approaches and encounters
+#       OrbitManeuver contains methods to plan and apply impulsive burns
 class Orbit(
         spyce.orbit_determination.OrbitDetermination,
         spyce.orbit_angles.OrbitAngles,
         spyce.orbit_state.OrbitState,
         spyce.orbit_target.OrbitTarget,
+        spyce.orbit_maneuver.OrbitManeuver,
         ):
     """Kepler orbit
 
     Two-body approximation of a body orbiting a mass-point.
     """
+
+    # frame in which the elements are given (see spyce.frames)
+    reference_frame = spyce.frames.ecliptic
+
     def __init__(
         self, primary, periapsis, eccentricity=0,
         inclination=0, longitude_of_ascending_node=0, argument_of_periapsis=0,
@@ -99,6 +107,28 @@ class Orbit(
             % self.__dict__
         )
 
+    def elements_at_time(self, time):
+        """Orbital elements at given time (s)
+
+        Return periapsis, eccentricity, inclination, longitude of ascending
+        node, argument of periapsis and mean anomaly. Only the latter varies
+        for a Kepler orbit. Time may also be a NumPy array (see spyce.kepler).
+        """
+        return (
+            self.periapsis, self.eccentricity, self.inclination,
+            self.longitude_of_ascending_node, self.argument_of_periapsis,
+            self.mean_anomaly_at_time(time),
+        )
+
+    def ground_track(self, start, end, n=1000):
+        """Latitudes and longitudes (rad) of the sub-satellite point
+
+        The track is sampled at `n` times evenly spaced from `start` to `end`
+        (s); see spyce.ground_track (requires NumPy).
+        """
+        import spyce.ground_track
+        return spyce.ground_track.ground_track(self, start, end, n)
+
     def darkness_time(self):
         """How long the object stays in the shadow of its primary
 
@@ -0,0 +1,319 @@
+"""Structure-of-arrays container for large numbers of orbits"""
+
+import numpy
+
+import spyce.kepler
+import spyce.orbit
+
+
+class InvalidOrbitArray(Exception):
+    pass
+
+
+class OrbitArray:
+    """Many Kepler orbits sharing the same primary
+
+    Instead of one Orbit instance per orbit, the elements and the derived
+    constants are stored as contiguous float64 columns; they are the rows of
+    a single two-dimensional array, `data`. Each column is also available as
+    an attribute named like the corresponding attribute of Orbit.
+
+    Indexing with an integer materializes a single Orbit. Indexing with a
+    slice returns an OrbitArray sharing the same data, while boolean masks
+    and arrays of indices return copies (following NumPy semantics).
+    """
+
+    columns = (
+        # elements
+        "periapsis", "eccentricity", "inclination",
+        "longitude_of_ascending_node", "argument_of_periapsis", "epoch",
+        "mean_anomaly_at_epoch",
+        # derived constants
+        "semi_major_axis", "apoapsis", "semi_latus_rectum", "mean_motion",
+        "period",
+    )
+
+    def __init__(
+        self, primary, periapsis, eccentricity=0,
+        inclination=0, longitude_of_ascending_node=0, argument_of_periapsis=0,
+        epoch=0, mean_anomaly_at_epoch=0,
+    ):
+        """Orbits from arrays of orbital elements (see Orbit)
+
+        The arguments are broadcast against each other.
+        """
+        elements = numpy.broadcast_arrays(*(
+            numpy.asarray(x, dtype=float) for x in (
+                periapsis, eccentricity, inclination,
+                longitude_of_ascending_node, argument_of_periapsis,
+                epoch, mean_anomaly_at_epoch,
+            )
+        ))
+        shape = elements[0].shape
+        if len(shape) > 1:
+            raise InvalidOrbitArray("elements should be one-dimensional")
+        data = numpy.empty((len(self.columns), elements[0].size))
+        for row, element in zip(data, elements):
+            row[:] = element
+        self.primary = primary
+        self.data = data
+        self.update_derived_constants()
+
+    @classmethod
+    def from_data(cls, primary, data):
+        """Wrap an existing array of columns (e.g. a memory map)
+
+        `data` should have one row per entry of OrbitArray.columns. It is not
+        copied.
+        """
+        if len(data) != len(cls.columns):
+            raise InvalidOrbitArray("expected %i columns" % len(cls.columns))
+        self = cls.__new__(cls)
+        self.primary = primary
+        self.data = data
+        return self
+
+    def update_derived_constants(self):
+        """Normalize the elements and compute the derived constants
+
+        See Orbit.__init__()
+        """
+        i = self.inclination
+        i %= 2*numpy.pi
+        retrograde = i > numpy.pi
+        i[retrograde] = 2*numpy.pi - i[retrograde]
+        self.longitude_of_ascending_node[retrograde] -= numpy.pi
+        self.argument_of_periapsis[retrograde] -= numpy.pi
+        self.longitude_of_ascending_node %= 2*numpy.pi
+        self.argument_of_periapsis %= 2*numpy.pi
+
+        q = self.periapsis
+        e = self.eccentricity
+        parabolic = e == 1
+        mu = self.primary.gravitational_parameter
+        with numpy.errstate(divide='ignore'):
+            a = numpy.where(parabolic, numpy.inf, q / (1 - e))
+            self.semi_major_axis[:] = a
+            self.apoapsis[:] = a * (1 + e)
+            p = self.semi_latus_rectum
+            p[:] = q * (1 + e)
+            self.mean_motion[:] = numpy.where(
+                parabolic,
+                3 * numpy.sqrt(mu / p**3),
+                numpy.sqrt(mu / abs(a)**3),
+            )
+            self.period[:] = numpy.where(
+                e >= 1, numpy.inf, 2*numpy.pi / self.mean_motion)
+
+    @classmethod
+    def from_semi_major_axis(
+        cls, primary, semi_major_axis, eccentricity,
+        inclination=0, longitude_of_ascending_node=0, argument_of_periapsis=0,
+        epoch=0, mean_anomaly_at_epoch=0,
+    ):
+        """Orbits from semi-major axes (m) and eccentricities (-)"""
+        e = numpy.asarray(eccentricity, dtype=float)
+        periapsis = numpy.asarray(semi_major_axis, dtype=float) * (1 - e)
+        return cls(
+            primary, periapsis, e,
+            inclination, longitude_of_ascending_node, argument_of_periapsis,
+            epoch, mean_anomaly_at_epoch
+        )
+
+    @classmethod
+    def from_orbits(cls, orbits):
+        """Gather Orbit instances sharing the same primary"""
+        orbits = list(orbits)
+        if not orbits:
+            raise InvalidOrbitArray("cannot infer primary of no orbit")
+        primary = orbits[0].primary
+        if any(orbit.primary is not primary for orbit in orbits):
+            raise InvalidOrbitArray("orbits should share the same primary")
+        elements = numpy.array([
+            (
+                orbit.periapsis, orbit.eccentricity, orbit.inclination,
+                orbit.longitude_of_ascending_node,
+                orbit.argument_of_periapsis, orbit.epoch,
+                orbit.mean_anomaly_at_epoch,
+            )
+            for orbit in orbits
+        ]).T
+        return cls(primary, *elements)
+
+    @classmethod
+    def from_state(cls, primary, position, velocity, epoch=0):
+        """Orbits from arrays of positions and velocities
+
+        See Orbit.from_state(); `position` and `velocity` have shape (n, 3).
+        """
+        position = numpy.asarray(position, dtype=float)
+        velocity = numpy.asarray(velocity, dtype=float)
+        mu = primary.gravitational_parameter
+
+        distance = numpy.linalg.norm(position, axis=-1)
+        speed = numpy.linalg.norm(velocity, axis=-1)
+        normal = numpy.cross(position, velocity)
+        normal_norm = numpy.linalg.norm(normal, axis=-1)
+
+        # eccentricity
+        rv = numpy.einsum('...i,...i->...', position, velocity)
+        eccentricity_vector = (
+            (speed**2)[..., None] * position - rv[..., None] * velocity
+        ) / mu - position / distance[..., None]
+        eccentricity = numpy.linalg.norm(eccentricity_vector, axis=-1)
+
+        # periapsis
+        periapsis = normal_norm**2 / mu / (1 + eccentricity)
+        x_axis = numpy.array([1., 0., 0.])
+        periapsis_dir = numpy.where(
+            (eccentricity > 0)[..., None], eccentricity_vector, x_axis)
+
+        # inclination
+        inclination = numpy.arccos(numpy.clip(
+            normal[..., 2] / normal_norm, -1, 1))
+
+        # ascending node
+        equatorial = (normal[..., 0] == 0) & (normal[..., 1] == 0)
+        node_dir = numpy.stack([
+            -normal[..., 1], normal[..., 0], numpy.zeros_like(distance),
+        ], axis=-1)
+        node_dir[equatorial] = x_axis
+        longitude_of_ascending_node = numpy.arctan2(
+            node_dir[..., 1], node_dir[..., 0])
+
+        def oriented_angle(u, v):
+            """Angle from u to v, oriented by the orbital plane normal"""
+            sine = numpy.einsum('...i,...i->...', numpy.cross(u, v), normal)
+            cosine = numpy.einsum('...i,...i->...', u, v) * normal_norm
+            return numpy.arctan2(sine, cosine)
+
+        argument_of_periapsis = oriented_angle(node_dir, periapsis_dir)
+        true_anomaly = oriented_angle(periapsis_dir, position)
+        mean_anomaly_at_epoch = spyce.kepler.mean_anomaly_at_true_anomaly(
+            eccentricity, true_anomaly)
+
+        return cls(
+            primary, periapsis, eccentricity,
+            inclination, longitude_of_ascending_node, argument_of_periapsis,
+            epoch, mean_anomaly_at_epoch
+        )
+
+    @classmethod
+    def concatenate(cls, arrays):
+        """Join several OrbitArray sharing the same primary"""
+        arrays = list(arrays)
+        primary = arrays[0].primary
+        if any(array.primary is not primary for array in arrays):
+            raise InvalidOrbitArray("orbits should share the same primary")
+        data = numpy.concatenate([array.data for array in arrays], axis=1)
+        return cls.from_data(primary, data)
+
+    def __repr__(self):
+        return "<OrbitArray of %i orbits around %s>" % \
+            (len(self), self.primary)
+
+    def __len__(self):
+        return self.data.shape[1]
+
+    def __getitem__(self, key):
+        """Materialize an Orbit, or select a subset of the orbits"""
+        if isinstance(key, (int, numpy.integer)):
+            return self.orbit(key)
+        return OrbitArray.from_data(self.primary, self.data[:, key])
+
+    def orbit(self, index):
+        """Materialize a single row as an Orbit"""
+        elements = self.data[:7, index]
+        return spyce.orbit.Orbit(self.primary, *elements.tolist())
+
+    def mean_anomaly_at_time(self, time):
+        """Mean anomalies (rad) at given time(s) (s)"""
+        return self.mean_anomaly_at_epoch + \
+            self.mean_motion * (time - self.epoch)
+
+    def true_anomaly_at_time(self, time):
+        """True anomalies (rad) at given time(s) (s)"""
+        M = self.mean_anomaly_at_time(time)
+        return spyce.kepler.true_anomaly_at_mean_anomaly(self.eccentricity, M)
+
+    def state_at_time(self, time):
+        """Positions and velocities at given time(s) (s)
+
+        `time` is broadcast against the orbits; for instance, a number gives
+        the state of every orbit at the same time, while a column of shape
+        (m, 1) gives the states of every orbit at m different times. Return
+        two arrays of shape (..., 3).
+        """
+        transform = spyce.kepler.rotation_matrices(
+            self.longitude_of_ascending_node, self.inclination,
+            self.argument_of_periapsis,
+        )
+        v = self.true_anomaly_at_time(time)
+        return spyce.kepler.state_at_true_anomaly(
+            self.primary.gravitational_parameter, self.semi_latus_rectum,
+            self.eccentricity, transform, v,
+        )
+
+    def position_at_time(self, time):
+        """Position vectors at given time(s) (see state_at_time())"""
+        return self.state_at_time(time)[0]
+
+    def velocity_at_time(self, time):
+        """Velocity vectors at given time(s) (see state_at_time())"""
+        return self.state_at_time(time)[1]
+
+    def apply_impulse(self, time, prograde=0, normal=0, radial=0):
+        """Orbits after instantaneous burns (see Orbit.apply_impulse())
+
+        `time` and the components of the burns (m/s) are broadcast against
+        the orbits; for instance, many candidate burns can be evaluated on a
+        single orbit with OrbitArray.from_orbits([orbit]).
+        """
+        position, velocity = self.state_at_time(time)
+        prograde_dir = velocity / numpy.linalg.norm(
+            velocity, axis=-1, keepdims=True)
+        normal_dir = numpy.cross(position, velocity)
+        normal_dir /= numpy.linalg.norm(normal_dir, axis=-1, keepdims=True)
+        radial_dir = numpy.cross(prograde_dir, normal_dir)
+        velocity = velocity + sum(
+            numpy.asarray(amount, dtype=float)[..., None] * direction
+            for amount, direction in zip(
+                (prograde, normal, radial),
+                (prograde_dir, normal_dir, radial_dir),
+            )
+        )
+        position, velocity = numpy.broadcast_arrays(position, velocity)
+        epoch = numpy.broadcast_to(time, position.shape[:-1])
+        return OrbitArray.from_state(self.primary, position, velocity, epoch)
+
+    def crossing(self, lower, upper=None):
+        """Mask of the orbits reaching some distance from the primary
+
+        The orbits are selected when their range of distances, from
+        periapsis to apoapsis, intersects [lower, upper]. If `upper` is
+        omitted, it is taken equal to `lower`.
+        """
+        if upper is None:
+            upper = lower
+        # open trajectories have no apoapsis
+        apoapsis = numpy.where(self.eccentricity < 1, self.apoapsis,
+                               numpy.inf)
+        return (self.periapsis <= upper) & (apoapsis >= lower)
+
+    def period_between(self, lower, upper):
+        """Mask of the orbits whose period (s) is within [lower, upper]"""
+        return (lower <= self.period) & (self.period <= upper)
+
+
+def _column(index):
+    """Expose a row of `data` as an attribute"""
+    def get(self):
+        return self.data[index]
+
+    def set(self, value):
+        self.data[index] = value
+    return property(get, set)
+
+
+for index, name in enumerate(OrbitArray.columns):
+    setattr(OrbitArray, name, _column(index))
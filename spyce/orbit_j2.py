@@ -0,0 +1,113 @@
+import math
+
+import spyce.frames
+import spyce.orbit_rates
+from spyce.orbit_determination import InvalidElements
+
+
+class J2Orbit(spyce.orbit_rates.RatedOrbit):
+    """Kepler orbit with secular J2 perturbations
+
+    The oblateness of the primary (second zonal harmonic, "j2" attribute)
+    makes the orbital plane precess around the primary's axis (nodal
+    regression), the line of apsides rotate within the orbital plane (apsidal
+    precession), and slightly changes the mean motion. Only these secular
+    effects are modelled; they vary linearly with time, so positions cost
+    about as much as for a plain Kepler orbit.
+
+    The elements are mean elements, and must be given relative to the
+    equatorial plane of the primary (see reference_frame). Like for other
+    orbits, positions and velocities are returned in the ecliptic frame.
+
+    To evaluate many orbits at once, see spyce.kepler.state_at_time().
+    """
+
+    # inclination at which the apsidal precession vanishes (Molniya orbits)
+    critical_inclination = math.acos(math.sqrt(1/5))
+
+    def __init__(
+        self, primary, periapsis, eccentricity=0,
+        inclination=0, longitude_of_ascending_node=0, argument_of_periapsis=0,
+        epoch=0, mean_anomaly_at_epoch=0, **_
+    ):
+        """Orbit from the orbital elements (see Orbit)
+
+        The primary should have "j2" (-) and "radius" (m) attributes.
+        """
+        super().__init__(
+            primary, periapsis, eccentricity,
+            inclination, longitude_of_ascending_node, argument_of_periapsis,
+            epoch, mean_anomaly_at_epoch,
+        )
+
+        # secular rates are only meaningful for closed orbits
+        j2 = getattr(primary, "j2", 0.)
+        if self.eccentricity >= 1 or not j2:
+            return
+
+        # see for instance Vallado, Fundamentals of Astrodynamics and
+        # Applications, section 9.6
+        e = self.eccentricity
+        n = self.mean_motion
+        k = 1.5 * n * j2 * (primary.radius / self.semi_latus_rectum)**2
+        c = math.cos(self.inclination)
+        s2 = math.sin(self.inclination)**2
+        self.rates["longitude_of_ascending_node"] = -k * c
+        self.rates["argument_of_periapsis"] = k * (2 - 2.5*s2)
+        self.rates["mean_anomaly"] = n + k * math.sqrt(1 - e*e) * (1 - 1.5*s2)
+        self.update_mean_motion()
+
+    @property
+    def reference_frame(self):
+        """Equatorial frame of the primary (see spyce.frames)"""
+        return spyce.frames.body_equatorial(self.primary)
+
+    def state_at_time(self, time):
+        """Position and velocity vectors at a given time (s)
+
+        See RatedOrbit.state_at_time(); the vectors are rotated from the
+        equatorial frame of the primary to the ecliptic frame.
+        """
+        position, velocity = super().state_at_time(time)
+        rotation = self.reference_frame.rotation_at_time(time)
+        return rotation * position, rotation * velocity
+
+    @property
+    def nodal_precession_rate(self):
+        """Rate of the longitude of the ascending node (rad/s)"""
+        return self.rates["longitude_of_ascending_node"]
+
+    @property
+    def apsidal_precession_rate(self):
+        """Rate of the argument of periapsis (rad/s)"""
+        return self.rates["argument_of_periapsis"]
+
+    @classmethod
+    def sun_synchronous(
+        cls, primary, semi_major_axis, eccentricity=0,
+        longitude_of_ascending_node=0, argument_of_periapsis=0,
+        epoch=0, mean_anomaly_at_epoch=0, **_
+    ):
+        """Orbit whose plane precesses once per orbit of the primary
+
+        The inclination is chosen so that the nodal precession matches the
+        mean motion of the primary around its own primary.
+        """
+        if eccentricity >= 1:
+            raise InvalidElements("sun-synchronous trajectory must be closed")
+        if primary.orbit is None:
+            raise InvalidElements("primary does not orbit anything")
+
+        mu = primary.gravitational_parameter
+        n = math.sqrt(mu / semi_major_axis**3)
+        semi_latus_rectum = semi_major_axis * (1 - eccentricity**2)
+        k = 1.5 * n * primary.j2 * (primary.radius / semi_latus_rectum)**2
+        c = -(2*math.pi / primary.orbit.period) / k
+        if abs(c) > 1:
+            raise InvalidElements("orbit too high for sun-synchronicity")
+
+        return cls.from_semi_major_axis(
+            primary, semi_major_axis, eccentricity,
+            math.acos(c), longitude_of_ascending_node, argument_of_periapsis,
+            epoch, mean_anomaly_at_epoch
+        )
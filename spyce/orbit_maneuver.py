@@ -0,0 +1,191 @@
+import math
+
+from spyce.vector import Vec3
+from spyce.orbit_determination import InvalidElements
+
+
+class OrbitManeuver:
+    """Impulsive maneuvers
+
+    Burns are given as in KSP maneuver nodes, by their components (m/s)
+    along three directions at the time of the burn:
+
+    * prograde, along the velocity
+    * normal, along the angular momentum
+    * radial, completing the frame (pointing away from the primary)
+    """
+    def __init__(self):
+        raise NotImplementedError
+
+    def maneuver_basis(self, time):
+        """Prograde, normal and radial directions at a given time (s)"""
+        position = Vec3(self.position_at_time(time))
+        velocity = Vec3(self.velocity_at_time(time))
+        prograde = velocity * (1 / velocity.norm())
+        normal = position.cross(velocity)
+        normal = normal * (1 / normal.norm())
+        radial = prograde.cross(normal)
+        return prograde, normal, radial
+
+    def burn_components(self, time, delta_v):
+        """Components (m/s) of a delta-v vector in the maneuver basis"""
+        return tuple(
+            Vec3(delta_v).dot(direction)
+            for direction in self.maneuver_basis(time)
+        )
+
+    def apply_impulse(self, time, prograde=0, normal=0, radial=0):
+        """Orbit after an instantaneous burn at a given time (s)
+
+        Arguments:
+        time      s, time of the burn
+        prograde  m/s, optional
+        normal    m/s, optional
+        radial    m/s, optional
+        """
+        position = Vec3(self.position_at_time(time))
+        velocity = Vec3(self.velocity_at_time(time))
+        directions = self.maneuver_basis(time)
+        for amount, direction in zip((prograde, normal, radial), directions):
+            velocity = velocity + direction * amount
+        return type(self).from_state(self.primary, position, velocity, time)
+
+    def _burn_for_apsis(self, time, apsis):
+        """Prograde burn (m/s) at given time (s) making `apsis` (m) an apsis
+
+        A prograde burn keeps the flight path angle; the new speed is then
+        given by the conservation of energy and of angular momentum between
+        the current position and the apsis.
+        """
+        mu = self.primary.gravitational_parameter
+        position = Vec3(self.position_at_time(time))
+        velocity = Vec3(self.velocity_at_time(time))
+        distance = position.norm()
+        speed = velocity.norm()
+        # sine of the flight path angle
+        sine = position.dot(velocity) / (distance * speed)
+
+        numerator = 2 * mu * apsis * (apsis - distance)
+        denominator = distance * (
+            (apsis - distance) * (apsis + distance) + (distance * sine)**2
+        )
+        if denominator == 0:  # already at the apsis, on a circular orbit
+            new_speed = math.sqrt(mu / distance)
+        elif numerator / denominator <= 0:
+            raise InvalidElements("apsis cannot be reached by prograde burn")
+        else:
+            new_speed = math.sqrt(numerator / denominator)
+        return new_speed - speed, 0., 0.
+
+    def burn_for_apoapsis(self, time, apoapsis):
+        """Burn (m/s) at given time (s) to reach given apoapsis (m)
+
+        Return the components (prograde, normal, radial) of the burn, for
+        apply_impulse(). The burn is cheapest at periapsis.
+        """
+        distance = Vec3(self.position_at_time(time)).norm()
+        if apoapsis < distance:
+            raise InvalidElements("apoapsis below current altitude")
+        return self._burn_for_apsis(time, apoapsis)
+
+    def burn_for_periapsis(self, time, periapsis):
+        """Burn (m/s) at given time (s) to reach given periapsis (m)
+
+        See burn_for_apoapsis(); the burn is cheapest at apoapsis.
+        """
+        distance = Vec3(self.position_at_time(time)).norm()
+        if periapsis > distance:
+            raise InvalidElements("periapsis above current altitude")
+        return self._burn_for_apsis(time, periapsis)
+
+    def burn_for_circularization(self, time):
+        """Burn (m/s) at given time (s) to make the orbit circular
+
+        The new velocity is horizontal, with the circular speed at the
+        current distance.
+        """
+        mu = self.primary.gravitational_parameter
+        position = Vec3(self.position_at_time(time))
+        velocity = Vec3(self.velocity_at_time(time))
+        _, normal, _ = self.maneuver_basis(time)
+        distance = position.norm()
+        horizontal = normal.cross(position) * (1 / distance)
+        target = horizontal * math.sqrt(mu / distance)
+        return self.burn_components(time, target - velocity)
+
+    def burn_for_inclination(self, time, inclination):
+        """Burn (m/s) at given time (s) to reach given inclination (rad)
+
+        The velocity is rotated around the current position, which keeps the
+        shape of the orbit. The burn is cheapest at the nodes, where the
+        rotation is simply the change in inclination; elsewhere, the smallest
+        rotation reaching the inclination is used.
+        """
+        position = Vec3(self.position_at_time(time))
+        velocity = Vec3(self.velocity_at_time(time))
+        axis = position * (1 / position.norm())
+        momentum = position.cross(velocity)
+
+        # rotating the velocity by an angle x around the axis rotates the
+        # angular momentum h likewise: h' = h cos x + (axis ^ h) sin x
+        a = momentum[2]
+        b = axis.cross(momentum)[2]
+        c = momentum.norm() * math.cos(inclination)
+        amplitude = math.hypot(a, b)
+        if abs(c) > amplitude:
+            raise InvalidElements("inclination cannot be reached from here")
+        phase = math.atan2(b, a)
+        offset = math.acos(c / amplitude)
+        candidates = [
+            (x + math.pi) % (2*math.pi) - math.pi
+            for x in (phase + offset, phase - offset)
+        ]
+        angle = min(candidates, key=abs)
+
+        # Rodrigues' rotation formula
+        cos, sin = math.cos(angle), math.sin(angle)
+        rotated = (
+            velocity * cos + axis.cross(velocity) * sin +
+            axis * (axis.dot(velocity) * (1 - cos))
+        )
+        return self.burn_components(time, rotated - velocity)
+
+    def finite_burn(self, time, delta_v, thrust, mass, exhaust_velocity,
+                    iterations=8):
+        """Finite burn approximating an impulse at given time (s)
+
+        Arguments:
+        time              s, time of the impulse (maneuver node)
+        delta_v           m/s, magnitude of the impulse
+        thrust            N
+        mass              kg, at the start of the burn
+        exhaust_velocity  m/s, specific impulse times g0
+
+        The duration of the burn follows from the rocket equation. The burn
+        is held in a fixed direction while the velocity turns by the angle
+        swept on the orbit; its useful component is reduced by the factor
+        sin(x/2)/(x/2) where x is this angle, which is compensated for by
+        burning longer. The burn starts when half of the delta-v remains
+        before the node.
+
+        Return the start (s) and duration (s) of the burn, and the delta-v
+        (m/s) to actually spend.
+        """
+        position = Vec3(self.position_at_time(time))
+        velocity = Vec3(self.velocity_at_time(time))
+        # angular rate on the orbit at the node
+        rate = position.cross(velocity).norm() / position.dot(position)
+        flow = thrust / (mass * exhaust_velocity)
+
+        def duration_for(dv):
+            return -math.expm1(-dv / exhaust_velocity) / flow
+
+        corrected = delta_v
+        for _ in range(iterations):
+            half_angle = rate * duration_for(corrected) / 2
+            if half_angle >= math.pi / 2:
+                raise InvalidElements("burn too long for the thrust")
+            if half_angle > 0:
+                corrected = delta_v * half_angle / math.sin(half_angle)
+        start = time - duration_for(corrected / 2)
+        return start, duration_for(corrected), corrected
@@ -0,0 +1,158 @@
+import math
+
+from spyce.vector import Vec3
+import spyce.orbit
+import spyce.orbit_angles
+
+
+class RatedOrbit(spyce.orbit.Orbit):
+    """Kepler orbit whose elements vary linearly with time
+
+    Each element is given at epoch, along with its rate of change. This is
+    how JPL gives approximate positions of the planets (see
+    misc/aprx_pos_planets.md); for the planets of solar.json, the rates are
+    those fitted over 1800 AD -- 2050 AD, and should not be used outside of
+    this interval.
+
+    Only the state vectors (position_at_time(), velocity_at_time() and
+    state_at_time()), the mean anomaly and elements_at_time() follow the
+    rates. The other methods inherited from Orbit (conversions between
+    anomalies and times, apsides, period, targeting, maneuvers) use the
+    elements at epoch; the mean motion is the rate of the mean anomaly.
+
+    To evaluate many orbits at many times at once, see
+    spyce.kepler.state_at_time().
+    """
+
+    elements = (
+        "semi_major_axis", "eccentricity", "inclination",
+        "longitude_of_ascending_node", "argument_of_periapsis", "mean_anomaly",
+    )
+
+    def __init__(
+        self, primary, periapsis, eccentricity=0,
+        inclination=0, longitude_of_ascending_node=0, argument_of_periapsis=0,
+        epoch=0, mean_anomaly_at_epoch=0, rates=None,
+    ):
+        """Orbit from the orbital elements and their rates
+
+        Arguments are those of Orbit, and `rates`, a dictionary mapping the
+        names of elements (see RatedOrbit.elements) to their rate of change
+        (unit/s). The rate of the mean anomaly includes the mean motion; if
+        omitted, it defaults to the mean motion of the Kepler orbit.
+        """
+        # Orbit() makes a negative inclination positive, by moving the
+        # ascending node to the other side: the inclination then changes the
+        # other way (the node and the periapsis only move by a constant)
+        self.inclination_sign = \
+            -1. if inclination % (2*math.pi) > math.pi else 1.
+        super().__init__(
+            primary, periapsis, eccentricity,
+            inclination, longitude_of_ascending_node, argument_of_periapsis,
+            epoch, mean_anomaly_at_epoch,
+        )
+
+        self.set_rates(rates)
+
+    @classmethod
+    def from_semi_major_axis(
+        cls, primary, semi_major_axis, eccentricity,
+        inclination=0, longitude_of_ascending_node=0, argument_of_periapsis=0,
+        epoch=0, mean_anomaly_at_epoch=0, rates=None,
+    ):
+        """Orbit from semi-major axis (m), eccentricity (-) and rates
+
+        See Orbit.from_semi_major_axis() and RatedOrbit()
+        """
+        orbit = super().from_semi_major_axis(
+            primary, semi_major_axis, eccentricity,
+            inclination, longitude_of_ascending_node, argument_of_periapsis,
+            epoch, mean_anomaly_at_epoch,
+        )
+        if rates is not None:
+            orbit.set_rates(rates)
+        return orbit
+
+    def set_rates(self, rates):
+        """Set the rates of change of the elements (see RatedOrbit())"""
+        rates = dict(rates or {})
+        rates.setdefault("mean_anomaly", self.mean_motion)
+        self.rates = {
+            element: float(rates.get(element, 0))
+            for element in self.elements
+        }
+        self.rates["inclination"] *= self.inclination_sign
+        self.update_mean_motion()
+
+    def update_mean_motion(self):
+        """Make mean motion and period follow the rate of the mean anomaly"""
+        self.mean_motion = self.rates["mean_anomaly"]
+        if self.eccentricity < 1:
+            self.period = 2*math.pi / self.mean_motion
+
+    def elements_at_time(self, time):
+        """Orbital elements at given time (s)
+
+        See Orbit.elements_at_time()
+        """
+        elapsed = time - self.epoch
+        rates = self.rates
+        semi_major_axis = \
+            self.semi_major_axis + rates["semi_major_axis"] * elapsed
+        eccentricity = self.eccentricity + rates["eccentricity"] * elapsed
+        if self.eccentricity == 1:  # parabolic trajectory
+            periapsis = self.periapsis
+        else:
+            periapsis = semi_major_axis * (1 - eccentricity)
+        return (
+            periapsis, eccentricity,
+            self.inclination + rates["inclination"] * elapsed,
+            self.longitude_of_ascending_node +
+            rates["longitude_of_ascending_node"] * elapsed,
+            self.argument_of_periapsis +
+            rates["argument_of_periapsis"] * elapsed,
+            self.mean_anomaly_at_time(time),
+        )
+
+    def orbit_at_time(self, time):
+        """Kepler orbit matching the elements at given time (s)"""
+        elements = self.elements_at_time(time)
+        return spyce.orbit.Orbit(self.primary, *elements[:5], time,
+                                 elements[5])
+
+    def state_at_time(self, time):
+        """Position and velocity vectors at a given time (s)
+
+        Computed directly from the elements at `time`, without building an
+        Orbit. The (slow) change of the orbit itself is neglected in the
+        velocity.
+        """
+        periapsis, e, i, Omega, omega, M = self.elements_at_time(time)
+        geometry = spyce.orbit_angles.OrbitGeometry(e)
+        v = geometry.true_anomaly_at_mean_anomaly(M)
+        c, s = math.cos(v), math.sin(v)
+        p = periapsis * (1 + e)  # semi-latus rectum
+        distance = p / (1 + e*c)
+        speed = math.sqrt(self.primary.gravitational_parameter / p)
+        # first two columns of Mat3.from_euler_angles(Omega, i, omega)
+        c1, s1 = math.cos(Omega), math.sin(Omega)
+        c2, s2 = math.cos(i), math.sin(i)
+        c3, s3 = math.cos(omega), math.sin(omega)
+        P = (c1*c3 - c2*s1*s3, c3*s1 + c1*c2*s3, s2*s3)
+        Q = (-c1*s3 - c2*c3*s1, c1*c2*c3 - s1*s3, c3*s2)
+        x, y = distance*c, distance*s
+        vx, vy = -speed*s, speed*(e + c)
+        position = Vec3([x*a + y*b for a, b in zip(P, Q)])
+        velocity = Vec3([vx*a + vy*b for a, b in zip(P, Q)])
+        return position, velocity
+
+    def position_at_time(self, time):
+        """Position vector at a given time (s)"""
+        return self.state_at_time(time)[0]
+
+    def velocity_at_time(self, time):
+        """Velocity vector at a given time (s)
+
+        The (slow) change of the orbit itself is neglected.
+        """
+        return self.state_at_time(time)[1]
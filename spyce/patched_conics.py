@@ -0,0 +1,292 @@
+"""Prediction of trajectories across spheres of influence
+
+A trajectory is approximated by a chain of conics (patches), each one around
+a single primary, and valid between two times. A patch ends when:
+
+* the trajectory leaves the sphere of influence of the primary (escape); the
+  time is found analytically from the true anomaly at escape
+* the trajectory enters the sphere of influence of a satellite of the
+  primary (encounter); the distance to each satellite is sampled, and the
+  time of entry is refined by root-finding
+* the trajectory hits the surface of the primary (impact)
+* the trajectory is changed by a burn (maneuver)
+
+The chain is computed lazily, up to the requested time, and cached. When the
+trajectory changes at some time, only the patches after that time are
+discarded.
+"""
+
+import bisect
+import math
+
+from spyce.vector import Vec3
+import spyce.analysis
+import spyce.orbit
+
+ESCAPE = "escape"
+ENCOUNTER = "encounter"
+IMPACT = "impact"
+MANEUVER = "maneuver"
+
+
+def next_occurrence(orbit, time, start):
+    """First time (s) after `start` when a closed orbit is as at `time`"""
+    if orbit.eccentricity < 1:
+        time = start + (time - start) % orbit.period
+    return time
+
+
+def next_encounter(orbit, satellite, start, end, samples=32):
+    """Time (s) when `orbit` enters the sphere of influence of `satellite`
+
+    The distance is sampled `samples` times per revolution (of the orbit or
+    of the satellite, whichever is faster) between `start` and `end`. The
+    entry is found by bisection when a sample falls inside the sphere of
+    influence, or when the distance reaches a local minimum inside of it
+    between two samples. Return None when no entry is found.
+    """
+    radius = satellite.sphere_of_influence
+    target = satellite.orbit
+
+    # in most situations, orbits do not reach satellites
+    if 0 < orbit.apoapsis < target.periapsis - radius:
+        return None
+    if target.apoapsis + radius < orbit.periapsis:
+        return None
+
+    def f(t):
+        """Distance to the sphere of influence"""
+        position = Vec3(orbit.position_at_time(t))
+        return (position - target.position_at_time(t)).norm() - radius
+
+    period = min(orbit.period, target.period)
+    step = period / samples
+    before = None
+    previous = start, f(start)
+    while previous[0] < end:
+        time = min(previous[0] + step, end)
+        current = time, f(time)
+        if previous[1] > 0 and current[1] <= 0:
+            return spyce.analysis.bisection_method(f, previous[0], time)
+        # the distance may dip below the radius between two samples
+        if before is not None and previous[1] > 0 and \
+                before[1] > previous[1] < current[1]:
+            minimum = spyce.analysis.golden_section_search(
+                f, before[0], time)
+            if minimum is not None and f(minimum) <= 0:
+                return spyce.analysis.bisection_method(
+                    f, before[0], minimum)
+        before, previous = previous, current
+    return None
+
+
+class Patch:
+    """Part of a trajectory described by a single conic"""
+    def __init__(self, orbit, start):
+        """Patch following `orbit` from `start` (s)
+
+        The end of the patch is unknown until it is predicted.
+        """
+        self.orbit = orbit
+        self.start = start
+        self.end = math.inf
+        self.transition = None
+        self.body = None  # satellite entered, for encounters
+        self.searched = start  # encounters are known until then
+
+        # escape and impact do not depend on other bodies; on open orbits,
+        # they only happen once, and may be over before `start`
+        self.limit = math.inf
+        self.limit_transition = None
+        primary = orbit.primary
+        if not math.isinf(primary.sphere_of_influence):
+            v = orbit.true_anomaly_at_escape()
+            if not math.isnan(v):
+                time = orbit.time_at_true_anomaly(v)
+                time = next_occurrence(orbit, time, start)
+                if time >= start:
+                    self.limit = time
+                    self.limit_transition = ESCAPE
+        if orbit.periapsis < primary.radius:
+            v = orbit.true_anomaly_at_distance(primary.radius)
+            if not math.isnan(v):
+                time = orbit.time_at_true_anomaly(-v)
+                time = next_occurrence(orbit, time, start)
+                if start <= time < self.limit:
+                    self.limit = time
+                    self.limit_transition = IMPACT
+
+    def __repr__(self):
+        if self.transition is None:
+            return "<Patch around %s from %.0f s>" % (self.primary, self.start)
+        return "<Patch around %s from %.0f s to %.0f s (%s)>" % (
+            self.primary, self.start, self.end, self.transition)
+
+    @property
+    def primary(self):
+        return self.orbit.primary
+
+    def reopen(self, time):
+        """Forget the end of the patch, and the encounters after `time`"""
+        self.end = math.inf
+        self.transition = None
+        self.body = None
+        self.searched = max(self.start, min(self.searched, time))
+
+    def close(self, time, transition, body=None):
+        """End the patch at `time` (s)"""
+        self.end = time
+        self.transition = transition
+        self.body = body
+        self.searched = time
+
+    def next_patch(self):
+        """Patch following a closed patch, or None after an impact"""
+        t = self.end
+        position = Vec3(self.orbit.position_at_time(t))
+        velocity = Vec3(self.orbit.velocity_at_time(t))
+        if self.transition == ENCOUNTER:
+            primary = self.body
+            position -= primary.orbit.position_at_time(t)
+            velocity -= primary.orbit.velocity_at_time(t)
+        elif self.transition == ESCAPE:
+            position += self.primary.orbit.position_at_time(t)
+            velocity += self.primary.orbit.velocity_at_time(t)
+            primary = self.primary.orbit.primary
+        else:
+            return None
+        orbit = spyce.orbit.Orbit.from_state(primary, position, velocity, t)
+        return Patch(orbit, t)
+
+
+class PatchedConics:
+    """Cached chain of patched conics"""
+    def __init__(self, orbit, start=None, max_patches=16, samples=32,
+                 universe=None):
+        """Trajectory following `orbit` from `start` (s)
+
+        Arguments:
+        orbit        Orbit at the start
+        start        s, optional (default is the epoch of the orbit)
+        max_patches  the prediction stops after this many patches
+        samples      number of samples per revolution to look for encounters
+                     (see next_encounter())
+        universe     if given, only the bodies of this Universe are
+                     encountered
+        """
+        if start is None:
+            start = orbit.epoch
+        self.patches = [Patch(orbit, start)]
+        self.max_patches = max_patches
+        self.samples = samples
+        self.universe = universe
+
+    def __repr__(self):
+        return "<PatchedConics with %i patches>" % len(self.patches)
+
+    def predict(self, time):
+        """Patches of the trajectory until `time` (s)
+
+        Return the list of patches, which is only extended as needed; the
+        last one may continue after `time`.
+        """
+        while len(self.patches) <= self.max_patches:
+            patch = self.patches[-1]
+            if patch.transition is None:
+                if patch.searched >= time:
+                    break
+                self._search(patch, time)
+                if patch.transition is None:
+                    break
+            if len(self.patches) == self.max_patches:
+                break
+            following = patch.next_patch()
+            if following is None:
+                break
+            self.patches.append(following)
+        return self.patches
+
+    def _search(self, patch, time):
+        """Look for the end of the last patch until `time` (s)"""
+        end = min(time, patch.limit)
+        first = None
+        if self.universe is None:
+            satellites = patch.primary.satellites
+        else:
+            satellites = self.universe.children(patch.primary)
+        for satellite in satellites:
+            if getattr(satellite, "sphere_of_influence", 0) <= 0:
+                continue
+            entry = next_encounter(patch.orbit, satellite, patch.searched,
+                                   end, self.samples)
+            if entry is not None and (first is None or entry < first[0]):
+                first = entry, satellite
+        if first is not None:
+            patch.close(first[0], ENCOUNTER, first[1])
+        elif patch.limit <= time:
+            patch.close(patch.limit, patch.limit_transition)
+        else:
+            patch.searched = time
+
+    def index_at_time(self, time):
+        """Index of the patch followed at `time` (s)"""
+        patches = self.predict(time)
+        starts = [patch.start for patch in patches]
+        return max(bisect.bisect_right(starts, time) - 1, 0)
+
+    def patch_at_time(self, time):
+        """Patch followed at `time` (s)"""
+        return self.patches[self.index_at_time(time)]
+
+    def state_at_time(self, time):
+        """Primary, position and velocity at `time` (s)"""
+        orbit = self.patch_at_time(time).orbit
+        position = orbit.position_at_time(time)
+        velocity = orbit.velocity_at_time(time)
+        return orbit.primary, position, velocity
+
+    def invalidate(self, time):
+        """Forget the predictions after `time` (s)"""
+        index = self.index_at_time(time)
+        del self.patches[index + 1:]
+        self.patches[index].reopen(time)
+
+    def replace(self, time, orbit):
+        """Follow `orbit` from `time` (s) on
+
+        The patches before `time` are kept.
+        """
+        self.invalidate(time)
+        patch = self.patches[-1]
+        if patch.start >= time:
+            self.patches.pop()
+        else:
+            patch.close(time, MANEUVER)
+        self.patches.append(Patch(orbit, time))
+
+    def add_maneuver(self, time, prograde=0, normal=0, radial=0):
+        """Apply an impulse at `time` (s) (see Orbit.apply_impulse())"""
+        orbit = self.patch_at_time(time).orbit
+        self.replace(time, orbit.apply_impulse(time, prograde, normal, radial))
+
+    def update(self, orbit, position_tolerance=1., velocity_tolerance=1e-3):
+        """Follow the actual trajectory `orbit` from its epoch
+
+        The past patches are dropped. The prediction is kept when `orbit`
+        agrees with it at its epoch within the tolerances (m and m/s).
+        Return True when the prediction was discarded.
+        """
+        time = orbit.epoch
+        index = self.index_at_time(time)
+        del self.patches[:index]
+        predicted = self.patches[0].orbit
+        if predicted.primary is orbit.primary:
+            position = Vec3(orbit.position_at_time(time))
+            velocity = Vec3(orbit.velocity_at_time(time))
+            position -= predicted.position_at_time(time)
+            velocity -= predicted.velocity_at_time(time)
+            if position.norm() <= position_tolerance and \
+                    velocity.norm() <= velocity_tolerance:
+                return False
+        self.patches = [Patch(orbit, time)]
+        return True
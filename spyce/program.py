@@ -0,0 +1,65 @@
+"""Flight programs as resumable state machines
+
+A flight program written as a generator cannot be saved: its progress is
+hidden in the frame of the generator. A FlightProgram keeps its progress in
+plain attributes instead: the name of its next state, the Condition it is
+waiting for, and any variable of the program. It can then be saved in a
+checkpoint, and resumed later (see spyce.checkpoint).
+
+For instance:
+
+    class Ascent(FlightProgram):
+        def start(self, rocket):
+            return "gravity_turn", AltitudeAbove(10e3)
+
+        def gravity_turn(self, rocket):
+            rocket.rotate(radians(-45), 1, 0, 0)
+            return "coast", ApoapsisAbove(700e3)
+
+        def coast(self, rocket):
+            rocket.throttle = 0.
+
+    rocket = Rocket(kerbin, Ascent())
+"""
+
+import math
+
+
+class FlightProgram:
+    """Flight program made of states
+
+    Each state is a method, called with the rocket when the program enters
+    it. It acts on the rocket, and returns the name of the next state and
+    the Condition (see spyce.conditions) to wait for before entering it; or
+    None to end the program.
+
+    The attributes of the program are saved in checkpoints; they should only
+    hold numbers, strings, containers of them, vectors and conditions.
+    """
+    initial_state = "start"
+
+    def __init__(self):
+        self.state = self.initial_state  # next state
+        self.condition = None  # awaited before entering the next state
+
+    def __repr__(self):
+        return "<%s in state %s>" % (type(self).__name__, self.state)
+
+    def __call__(self, rocket):
+        """Generator of the awaited conditions, as expected by Rocket"""
+        while self.state is not None:
+            transition = getattr(self, self.state)(rocket)
+            if transition is None:
+                self.state = self.condition = None
+                return
+            self.state, self.condition = transition
+            yield self.condition
+
+    def resume(self, rocket):
+        """Resume the program on `rocket`, waiting for the saved condition"""
+        rocket.flight_program = self
+        rocket.program = self(rocket)
+        if self.condition is None:  # ended
+            rocket.resume_condition = lambda: math.inf
+        else:
+            rocket.resume_condition = self.condition
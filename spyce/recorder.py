@@ -0,0 +1,224 @@
+"""Recording of trajectories in binary files
+
+A recording is made of fixed-size records (time, position, velocity, mass,
+throttle and primary of a vessel), appended to a memory-mapped file, so that
+logs of hundreds of millions of steps are neither kept in memory nor parsed
+when read again. The records are contiguous in the file: any range of them
+is a NumPy view over the memory map, without any copy.
+
+The file starts with a header of HEADER_SIZE bytes:
+
+    magic        8s   b"SPYCEREC"
+    version      H
+    record size  H
+    stride       I    number of records per block of the index
+    count        Q    number of records
+    primaries         names of the primaries, UTF-8, separated by NUL bytes
+
+The records refer to their primary by its rank in this list.
+
+Every `stride` records, the time of the first record of the new block is
+appended to an index, in a companion file (with the suffix ".index"). A
+lookup by time first looks for the block in the small index, then for the
+record in the block, so that only a few pages of the recording are read.
+"""
+
+import struct
+
+import numpy
+
+MAGIC = b"SPYCEREC"
+VERSION = 1
+HEADER_SIZE = 4096
+
+RECORD = numpy.dtype([
+    ("time", "<f8"),
+    ("position", "<f8", (3,)),
+    ("velocity", "<f8", (3,)),
+    ("mass", "<f8"),
+    ("throttle", "<f8"),
+    ("primary", "<u4"),
+    ("padding", "V4"),
+])
+
+_header = struct.Struct("<8sHHIQ")
+
+
+def index_path(path):
+    """Path of the index of the recording at `path`"""
+    return path + ".index"
+
+
+class Recorder:
+    """Writer of a recording"""
+    def __init__(self, path, stride=4096, capacity=1 << 16):
+        """Start a new recording at `path`
+
+        The file is grown by steps of at least `capacity` records.
+        """
+        self.path = path
+        self.stride = stride
+        self.count = 0
+        self.primaries = []
+        self._ids = {}  # name of primary -> rank
+        self._last_time = -numpy.inf
+        self._file = open(path, "w+b")
+        self._index = open(index_path(path), "wb")
+        self._capacity = 0
+        self._records = None
+        self._grow(capacity)
+
+    def __repr__(self):
+        return "<Recorder of %i records to %s>" % (self.count, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def _grow(self, capacity):
+        """Extend the file to hold `capacity` records"""
+        if self._records is not None:
+            self._records.flush()
+        self._file.truncate(HEADER_SIZE + capacity * RECORD.itemsize)
+        self._capacity = capacity
+        self._records = numpy.memmap(
+            self._file, RECORD, "r+", HEADER_SIZE, (capacity,))
+
+    def _write_header(self):
+        names = b"\0".join(name.encode() for name in self.primaries)
+        header = _header.pack(
+            MAGIC, VERSION, RECORD.itemsize, self.stride, self.count)
+        if len(header) + len(names) > HEADER_SIZE:
+            raise ValueError("too many primaries for the header")
+        self._file.seek(0)
+        self._file.write(header + names)
+
+    def append(self, time, position, velocity, mass, throttle, primary):
+        """Append a record; `primary` is the name of the primary
+
+        Times must be increasing.
+        """
+        if time < self._last_time:
+            raise ValueError("time %g s is before the last record" % time)
+        self._last_time = time
+
+        rank = self._ids.get(primary)
+        if rank is None:
+            rank = self._ids[primary] = len(self.primaries)
+            self.primaries.append(primary)
+
+        if self.count == self._capacity:
+            self._grow(self._capacity + max(self._capacity, 1 << 16))
+        if self.count % self.stride == 0:
+            self._index.write(struct.pack("<d", time))
+        self._records[self.count] = (
+            time, position, velocity, mass, throttle, rank, b"")
+        self.count += 1
+
+    def record(self, time, vessel):
+        """Append the state of `vessel` (e.g. a Rocket) at `time` (s)"""
+        self.append(
+            time, vessel.position, vessel.velocity,
+            vessel.dry_mass + vessel.propellant, vessel.throttle,
+            vessel.primary.name,
+        )
+
+    def flush(self):
+        """Make the records written so far readable"""
+        self._records.flush()
+        self._write_header()
+        self._file.flush()
+        self._index.flush()
+
+    def close(self):
+        """Finish the recording"""
+        self.flush()
+        self._records = None
+        self._file.truncate(HEADER_SIZE + self.count * RECORD.itemsize)
+        self._file.close()
+        self._index.close()
+
+
+class Recording:
+    """Reader of a recording"""
+    def __init__(self, path):
+        """Open the recording at `path` (written up to its last flush)"""
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        magic, version, size, self.stride, count = \
+            _header.unpack_from(header)
+        if magic != MAGIC or version != VERSION or size != RECORD.itemsize:
+            raise ValueError("%s is not a recording of version %i" % (
+                path, VERSION))
+        names = header[_header.size:].rstrip(b"\0")
+        self.primaries = names.decode().split("\0") if names else []
+
+        if count == 0:
+            self.records = numpy.empty(0, RECORD)
+        else:
+            self.records = numpy.memmap(
+                path, RECORD, "r", HEADER_SIZE, (count,))
+        self.index = numpy.fromfile(index_path(path), "<f8")
+        self.index = self.index[:(count + self.stride - 1) // self.stride]
+
+    def __repr__(self):
+        return "<Recording of %i records from %s>" % (len(self), self.path)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def start(self):
+        """Time (s) of the first record"""
+        return self.records[0]["time"]
+
+    @property
+    def end(self):
+        """Time (s) of the last record"""
+        return self.records[-1]["time"]
+
+    def search(self, time, side="left"):
+        """Rank of `time` (s) among the times of the records
+
+        Like numpy.searchsorted(), but only reading the block of the index
+        containing `time`.
+        """
+        block = numpy.searchsorted(self.index, time, side) - 1
+        if block < 0:
+            return 0
+        start = block * self.stride
+        times = self.records["time"][start:start + self.stride]
+        return start + int(numpy.searchsorted(times, time, side))
+
+    def index_at_time(self, time):
+        """Rank of the last record at or before `time` (s), or -1"""
+        return self.search(time, "right") - 1
+
+    def between(self, start, end):
+        """View of the records with time in [`start`, `end`) (s)"""
+        return self.records[self.search(start):self.search(end)]
+
+    def primary(self, record):
+        """Name of the primary of a record"""
+        return self.primaries[record["primary"]]
+
+    def state_at_time(self, time):
+        """Primary, position and velocity at `time` (s)
+
+        Interpolated linearly between the records around `time`, if they
+        share the same primary.
+        """
+        i = min(max(self.index_at_time(time), 0), len(self) - 1)
+        before = self.records[i]
+        position, velocity = before["position"], before["velocity"]
+        if i + 1 < len(self):
+            after = self.records[i + 1]
+            duration = after["time"] - before["time"]
+            if after["primary"] == before["primary"] and duration > 0:
+                x = min(max((time - before["time"]) / duration, 0), 1)
+                position = position + (after["position"] - position) * x
+                velocity = velocity + (after["velocity"] - velocity) * x
+        return self.primary(before), position, velocity
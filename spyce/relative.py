@@ -0,0 +1,171 @@
+"""Relative motion for proximity operations
+
+Near a target on a circular orbit, the motion of a chaser is described in
+the local-vertical local-horizontal (LVLH) frame of the target, also called
+the Hill frame:
+
+* x points away from the primary (radial)
+* y points along the velocity of the target (along-track)
+* z completes the frame, along the angular momentum (cross-track)
+
+In this rotating frame, the linearized equations of motion of the chaser are
+the Clohessy-Wiltshire equations, whose solution is given in closed form by
+a state-transition matrix. Propagating many relative states, or targeting
+many rendezvous, is then a matter of matrix products. The approximation is
+good as long as the distance remains small compared to the radius of the
+orbit, and as long as the orbit of the target is nearly circular.
+"""
+
+import numpy
+
+import spyce.frames
+import spyce.kepler
+
+
+def lvlh_basis(position, velocity):
+    """Rotation matrices from the LVLH frame to the inertial frame
+
+    `position` and `velocity` are arrays of shape (..., 3) describing the
+    states of the target. Return an array of shape (..., 3, 3) whose columns
+    are the axes of the LVLH frame.
+    """
+    position = numpy.asarray(position, dtype=float)
+    velocity = numpy.asarray(velocity, dtype=float)
+    x = position / numpy.linalg.norm(position, axis=-1, keepdims=True)
+    z = numpy.cross(position, velocity)
+    z /= numpy.linalg.norm(z, axis=-1, keepdims=True)
+    y = numpy.cross(z, x)
+    return numpy.stack([x, y, z], axis=-1)
+
+
+def angular_velocity(position, velocity):
+    """Angular velocity (rad/s) of the LVLH frame, about its z axis"""
+    position = numpy.asarray(position, dtype=float)
+    momentum = numpy.linalg.norm(numpy.cross(position, velocity), axis=-1)
+    return momentum / numpy.einsum('...i,...i->...', position, position)
+
+
+def to_lvlh(target_position, target_velocity, position, velocity):
+    """Relative state of a chaser in the LVLH frame of a target
+
+    All the arguments are arrays of shape (..., 3) in the same inertial
+    frame. Return the relative position and velocity, as seen from the
+    rotating frame.
+    """
+    basis = lvlh_basis(target_position, target_velocity)
+    rate = angular_velocity(target_position, target_velocity)
+    relative_position = numpy.einsum(
+        '...ji,...j->...i', basis, numpy.subtract(position, target_position))
+    relative_velocity = numpy.einsum(
+        '...ji,...j->...i', basis, numpy.subtract(velocity, target_velocity))
+    # remove the rotation of the frame: - omega x rho
+    relative_velocity[..., 0] += rate * relative_position[..., 1]
+    relative_velocity[..., 1] -= rate * relative_position[..., 0]
+    return relative_position, relative_velocity
+
+
+def from_lvlh(target_position, target_velocity, position, velocity):
+    """Inertial state of a chaser from its relative state
+
+    Inverse of to_lvlh().
+    """
+    basis = lvlh_basis(target_position, target_velocity)
+    rate = angular_velocity(target_position, target_velocity)
+    position = numpy.asarray(position, dtype=float)
+    velocity = numpy.array(velocity, dtype=float)
+    # add the rotation of the frame: + omega x rho
+    velocity[..., 0] -= rate * position[..., 1]
+    velocity[..., 1] += rate * position[..., 0]
+    inertial_position = numpy.einsum('...ij,...j->...i', basis, position)
+    inertial_velocity = numpy.einsum('...ij,...j->...i', basis, velocity)
+    return (target_position + inertial_position,
+            target_velocity + inertial_velocity)
+
+
+def relative_state(target, chaser, time):
+    """Relative state of a chaser in the LVLH frame of a target
+
+    `target` and `chaser` are Orbit around the same primary; `time` may be
+    an array.
+    """
+    position, velocity = spyce.kepler.state_at_time(
+        [target, chaser], time, spyce.frames.ecliptic)
+    return to_lvlh(position[0], velocity[0], position[1], velocity[1])
+
+
+def transition_matrices(mean_motion, time):
+    """Clohessy-Wiltshire state-transition matrices
+
+    `mean_motion` (rad/s) is that of the target; `time` (s) may be an array.
+    Return an array of shape numpy.shape(time) + (6, 6) mapping the initial
+    relative states (x, y, z, vx, vy, vz) to the states after `time`.
+    """
+    n = float(mean_motion)
+    angle = n * numpy.asarray(time, dtype=float)
+    c, s = numpy.cos(angle), numpy.sin(angle)
+    matrices = numpy.zeros(angle.shape + (6, 6))
+    # position from position
+    matrices[..., 0, 0] = 4 - 3*c
+    matrices[..., 1, 0] = 6 * (s - angle)
+    matrices[..., 1, 1] = 1
+    matrices[..., 2, 2] = c
+    # position from velocity
+    matrices[..., 0, 3] = s / n
+    matrices[..., 0, 4] = 2 * (1 - c) / n
+    matrices[..., 1, 3] = 2 * (c - 1) / n
+    matrices[..., 1, 4] = (4*s - 3*angle) / n
+    matrices[..., 2, 5] = s / n
+    # velocity from position
+    matrices[..., 3, 0] = 3 * n * s
+    matrices[..., 4, 0] = 6 * n * (c - 1)
+    matrices[..., 5, 2] = -n * s
+    # velocity from velocity
+    matrices[..., 3, 3] = c
+    matrices[..., 3, 4] = 2 * s
+    matrices[..., 4, 3] = -2 * s
+    matrices[..., 4, 4] = 4*c - 3
+    matrices[..., 5, 5] = c
+    return matrices
+
+
+def propagate(position, velocity, mean_motion, time):
+    """Relative states after given time(s) (s)
+
+    `position` and `velocity` are arrays of shape (..., 3), broadcast
+    against `time`. Return the propagated positions and velocities.
+    """
+    state = numpy.concatenate(numpy.broadcast_arrays(
+        numpy.asarray(position, dtype=float),
+        numpy.asarray(velocity, dtype=float)), axis=-1)
+    matrices = transition_matrices(mean_motion, time)
+    state = numpy.einsum('...ij,...j->...i', matrices, state)
+    return state[..., :3], state[..., 3:]
+
+
+def two_impulse(position, velocity, mean_motion, time_of_flight,
+                final_position=(0, 0, 0), final_velocity=(0, 0, 0)):
+    """Burns to go from a relative state to another in a given time
+
+    The first burn, at the start, puts the chaser on the path to
+    `final_position` after `time_of_flight` (s); the second one matches
+    `final_velocity` (by default, the target itself). All the arguments are
+    broadcast against each other. Return the two delta-v vectors (m/s), in
+    the LVLH frame.
+    """
+    matrices = transition_matrices(mean_motion, time_of_flight)
+    position = numpy.asarray(position, dtype=float)
+    velocity = numpy.asarray(velocity, dtype=float)
+    position_from_position = matrices[..., :3, :3]
+    position_from_velocity = matrices[..., :3, 3:]
+    velocity_from_position = matrices[..., 3:, :3]
+    velocity_from_velocity = matrices[..., 3:, 3:]
+
+    # velocity needed at the start
+    missing = numpy.asarray(final_position, dtype=float) - numpy.einsum(
+        '...ij,...j->...i', position_from_position, position)
+    required = numpy.linalg.solve(position_from_velocity,
+                                  missing[..., None])[..., 0]
+    arrival = numpy.einsum(
+        '...ij,...j->...i', velocity_from_position, position) + \
+        numpy.einsum('...ij,...j->...i', velocity_from_velocity, required)
+    return required - velocity, final_velocity - arrival
@@ -0,0 +1,219 @@
+"""Rendezvous planning
+
+A chaser catches up with a target orbiting the same primary in one of two
+ways:
+
+* waiting on its orbit for a window, and then doing a Hohmann transfer to
+  the orbit of the target, so that both arrive at the same time
+* burning at once to a phasing orbit, which brings it back to the same point
+  after a few revolutions, at the right moment for the Hohmann transfer (or
+  directly next to the target, when both share the same orbit)
+
+The options are computed analytically, assuming circular and coplanar
+orbits. The departure times of all the options are then refined at once by
+Newton's method on the actual positions of the chaser and of the target,
+which corrects for small eccentricities.
+"""
+
+import math
+
+import numpy
+
+import spyce.deltav
+import spyce.kepler
+
+
+class Option:
+    """A way for a chaser to rendezvous with a target"""
+    def __init__(self, start, revolutions, period, departure,
+                 transfer_time, delta_v):
+        """Rendezvous option
+
+        Arguments:
+        start          s, time of the first burn
+        revolutions    number of revolutions on the phasing orbit (0 when
+                       waiting for the window instead)
+        period         s, period of the phasing orbit
+        departure      s, time of the Hohmann transfer
+        transfer_time  s, duration of the Hohmann transfer
+        delta_v        m/s, total
+        """
+        self.start = start
+        self.revolutions = revolutions
+        self.period = period
+        self.departure = departure
+        self.transfer_time = transfer_time
+        self.delta_v = delta_v
+
+    def __repr__(self):
+        return "<Option %i revolutions, %.0f m/s, arrival at %.0f s>" % (
+            self.revolutions, self.delta_v, self.arrival)
+
+    @property
+    def arrival(self):
+        """Time (s) of the rendezvous"""
+        return self.departure + self.transfer_time
+
+    @property
+    def duration(self):
+        """Time (s) from now to the rendezvous"""
+        return self.arrival - self.start
+
+    def burn_times(self):
+        """Times (s) of the burns
+
+        Leaving the phasing orbit and starting the transfer is a single
+        burn, at the departure.
+        """
+        times = [self.departure]
+        if self.revolutions:
+            times.insert(0, self.start)
+        if self.transfer_time:
+            times.append(self.arrival)
+        return times
+
+
+def phase_angle(chaser, target, time):
+    """Angle (rad) by which the target leads the chaser, in [0, 2 pi)
+
+    The angle is measured in the orbital plane of the chaser; `time` may be
+    an array.
+    """
+    angle = longitude(chaser, target, time) - longitude(chaser, chaser, time)
+    return angle % (2*math.pi)
+
+
+def longitude(chaser, orbit, time, reference_time=0):
+    """Angle (rad) of positions on an orbit, in the plane of the chaser"""
+    first = spyce.kepler.position_at_time(chaser, reference_time)
+    second = spyce.kepler.position_at_time(
+        chaser, reference_time + chaser.period / 4)
+    x = first / numpy.linalg.norm(first)
+    z = numpy.cross(first, second)
+    z /= numpy.linalg.norm(z)
+    y = numpy.cross(z, x)
+    position = spyce.kepler.position_at_time(orbit, time)
+    return numpy.arctan2(position @ y, position @ x) % (2*math.pi)
+
+
+def phasing_delta_v(orbit, period, departure_speed=None):
+    """Delta-v (m/s) to enter and leave a phasing orbit
+
+    The phasing orbit of given period(s) (s) touches the circular orbit of
+    radius the semi-major axis of `orbit`. It is left at `departure_speed`
+    (m/s), by default the speed on the circular orbit.
+    """
+    mu = orbit.primary.gravitational_parameter
+    radius = orbit.semi_major_axis
+    semi_major_axis = (mu * (numpy.asarray(period) / (2*math.pi))**2)**(1/3)
+    # vis-viva equation
+    speed = numpy.sqrt(mu * (2/radius - 1/semi_major_axis))
+    circular = math.sqrt(mu / radius)
+    if departure_speed is None:
+        departure_speed = circular
+    return numpy.abs(speed - circular) + numpy.abs(departure_speed - speed)
+
+
+def plan(chaser, target, time, max_revolutions=10, max_windows=3,
+         iterations=8):
+    """Options for the chaser to rendezvous with the target
+
+    Arguments:
+    chaser, target   Orbit around the same primary
+    time             s, time from which the chaser can start
+    max_revolutions  maximum number of revolutions on phasing orbits
+    max_windows      number of Hohmann windows considered
+    iterations       number of iterations of the refinement
+
+    Phasing orbits which would dip below the atmosphere of the primary (or
+    its surface), or leave its sphere of influence, are discarded. Return a
+    list of Option, sorted by delta-v (see rank()).
+    """
+    primary = chaser.primary
+    mu = primary.gravitational_parameter
+    chaser_motion = 2*math.pi / chaser.period
+    target_motion = 2*math.pi / target.period
+    r1 = chaser.semi_major_axis
+    r2 = target.semi_major_axis
+
+    # Hohmann transfer
+    if abs(r1 - r2) > 1e-6 * r2:
+        transfer_time = math.pi * math.sqrt(((r1 + r2) / 2)**3 / mu)
+        burn1, burn2 = spyce.deltav.hohmann(primary, r1, r2)
+        transfer_delta_v = burn1 + burn2
+        transfer_angle = math.pi
+        # speed at the start of the transfer (vis-viva equation)
+        departure_speed = math.sqrt(mu * (2/r1 - 2/(r1 + r2)))
+    else:
+        transfer_time = 0.
+        burn2 = 0.
+        transfer_delta_v = 0.
+        transfer_angle = 0.
+        departure_speed = math.sqrt(mu / r1)
+    # phase of the target at the departure for the transfer
+    required = (transfer_angle - target_motion * transfer_time) % (2*math.pi)
+    phase = float(phase_angle(chaser, target, time))
+
+    # waiting for windows
+    waits = []
+    drift = target_motion - chaser_motion
+    if abs(drift) > 1e-12 * chaser_motion:
+        first = ((required - phase) / drift) % (2*math.pi / abs(drift))
+        waits = [first + k * 2*math.pi / abs(drift)
+                 for k in range(max_windows)]
+
+    # phasing orbits: after n revolutions of period P, the target has moved
+    # by target_motion * n * P, which must bring it to the required phase
+    lowest = primary.radius + primary.atmosphere_height
+    highest = primary.sphere_of_influence
+    phasing = []
+    for n in range(1, max_revolutions + 1):
+        # number of revolutions of the target
+        nearest = math.floor(n * target_motion / chaser_motion)
+        for m in range(max(nearest - 1, 0), nearest + 2):
+            angle = (required - phase) % (2*math.pi) + 2*math.pi * m
+            period = angle / (target_motion * n)
+            a = (mu * (period / (2*math.pi))**2)**(1/3)
+            other_apsis = 2*a - r1
+            if lowest < other_apsis < highest:
+                phasing.append((n, period))
+
+    # refine the departure times of all the options at once
+    revolutions = numpy.array([0] * len(waits) + [n for n, _ in phasing])
+    departure = time + numpy.array(waits + [n * p for n, p in phasing])
+    if len(departure) == 0:
+        return []
+    wait = revolutions == 0
+    start_longitude = longitude(chaser, chaser, time, time)
+    slope = numpy.where(wait, drift, target_motion)
+    for _ in range(iterations):
+        chaser_longitude = numpy.where(
+            wait, longitude(chaser, chaser, departure, time), start_longitude)
+        target_longitude = longitude(
+            chaser, target, departure + transfer_time, time)
+        error = target_longitude - chaser_longitude - transfer_angle
+        error = (error + math.pi) % (2*math.pi) - math.pi
+        departure = departure - error / slope
+        departure = numpy.where(wait, numpy.maximum(departure, time),
+                                departure)
+
+    options = []
+    for n, t in zip(revolutions.tolist(), departure.tolist()):
+        if n == 0:
+            options.append(Option(time, 0, 0., t, transfer_time,
+                                  transfer_delta_v))
+        else:
+            # the transfer starts with the burn leaving the phasing orbit
+            period = (t - time) / n
+            delta_v = float(phasing_delta_v(chaser, period, departure_speed))
+            options.append(Option(time, n, period, t, transfer_time,
+                                  delta_v + burn2))
+    return rank(options)
+
+
+def rank(options, time_cost=0):
+    """Sort options by delta-v plus `time_cost` (m/s/s) times duration"""
+    return sorted(
+        options,
+        key=lambda option: option.delta_v + time_cost * option.duration,
+    )
@@ -1,3 +1,4 @@
+import array
 import math
 
 from spyce.vector import Vec3, Mat3
@@ -5,6 +6,14 @@ import spyce.physics
 import spyce.body
 import spyce.orbit
 import spyce.analysis
+import spyce.patched_conics
+import spyce.conditions
+
+# if available, use C extension
+try:
+    from spyce.cext import integrate as cext
+except ImportError:
+    cext = None
 
 
 class RocketPart:
@@ -53,7 +62,12 @@ class RocketPart:
 
 class Rocket(spyce.body.CelestialBody):
     """A rocket, or a spaceship, or a duck"""
-    def __init__(self, primary=None, program=None):
+    def __init__(self, primary=None, program=None, universe=None):
+        """Rocket on the surface of `primary`
+
+        When given a Universe, the rocket is tracked by it, and only
+        considers the celestial bodies of this universe.
+        """
         self.parts = set()
         self.update_parts()
         self.throttle = 1.
@@ -70,23 +84,37 @@ class Rocket(spyce.body.CelestialBody):
             self.velocity = Vec3([0, primary.surface_velocity, 0])
             self.position = Vec3([primary.radius, 0, 0])
         self.primary = primary
+        self.universe = None
+        if universe is not None:
+            universe.add(self)
 
         self.orientation = Mat3()
         self.rotate(math.pi / 2, 0, 1, 0)
 
         self.resume_time_program = 0
+        self.condition_triggered = False
         self.resume_time_escape = 0
         self.resume_time_encounter = 0
 
+        # future patched conics, only computed when requested
+        self._trajectory = None
+        self._trajectory_outdated = True
+
+        # if set, every step is recorded (see spyce.recorder.Recorder)
+        self.recorder = None
+
+        # state handed to the C extension (position, velocity, propellant)
+        self._state = array.array("d", [0.] * 7)
         self.update_orbit(0.)
 
         # initialize flight program
+        self.flight_program = program
         if program is None:
             self.program = None
             self.resume_condition = lambda: math.inf
         else:
             self.program = program(self)
-            self.resume_condition = next(self.program)
+            self.wait_for(next(self.program), 0.)
         self.update_program(0, 1e-6)  # TODO
 
     def __repr__(self):
@@ -97,14 +125,33 @@ class Rocket(spyce.body.CelestialBody):
         """Convert to string using rocket's name"""
         return self.name
 
-    def simulate(self, t, dt):
-        """Run simulation"""
-
-        # run flight program
-        self.update_program(t, dt)
-
-        # update state vectors
-        self.update_physics(t, dt)
+    def simulate(self, t, dt, count=1):
+        """Run simulation for `count` steps of `dt` (s)
+
+        When the C extension is available, the steps between two events
+        are run at once (see Rocket.simulate_run()).
+        """
+        while count > 0:
+            steps = self.simulate_run(t, dt, count)
+            if steps == 0:
+                self.simulate_step(t, dt)
+                steps = 1
+            t += steps * dt
+            count -= steps
+
+    def simulate_step(self, t, dt):
+        """Run simulation for a single step of `dt` (s)"""
+
+        # run flight program and update state vectors; the step is split
+        # where a condition of the program is met while thrusting
+        time, remaining = t, dt
+        while True:
+            self.update_program(time, remaining)
+            elapsed = self.update_physics(time, remaining)
+            if elapsed >= remaining:
+                break
+            time += elapsed
+            remaining -= elapsed
 
         # update time to next encounter
         self.update_encounters(t)
@@ -112,6 +159,75 @@ class Rocket(spyce.body.CelestialBody):
         # handle potential change of sphere of influence
         self.update_sphere_of_influence(t, dt)
 
+        if self.recorder is not None:
+            self.recorder.record(t + dt, self)
+
+    def simulate_run(self, t, dt, count):
+        """Run up to `count` thrusting steps of `dt` (s) with the C extension
+
+        The run stops before the step where the flight program wakes up, the
+        awaited Condition may be met, the propellant runs out, or the sphere
+        of influence may change; these steps are left to simulate_step().
+        Return the number of steps simulated, 0 when no run is possible.
+        """
+        if cext is None or count < 2 or self.primary is None or \
+                self.recorder is not None:
+            return 0
+        self.update_program(t, dt)
+        if self.throttle == 0.:
+            return 0
+
+        # bounds of the run
+        end = t + count * dt
+        radius_min = 0.
+        radius_max = self.primary.sphere_of_influence
+        for satellite in self.children(self.primary):
+            radius_max = min(radius_max, satellite.orbit.periapsis -
+                             satellite.sphere_of_influence)
+        condition = self.resume_condition
+        conditions = spyce.conditions
+        if not isinstance(condition, conditions.Condition):
+            end = min(end, self.resume_time_program)
+        elif isinstance(condition, conditions.TimeReached):
+            end = min(end, condition.time)
+        elif isinstance(condition, conditions.AltitudeBelow):
+            radius_min = self.primary.radius + condition.altitude
+        elif isinstance(condition, conditions.AltitudeAbove):
+            radius_max = min(radius_max,
+                             self.primary.radius + condition.altitude)
+        elif not isinstance(condition, conditions.PropellantEmpty):
+            return 0
+        steps = min(count, math.ceil((end - t) / dt) - 1)
+        if steps < 2 or \
+                not radius_min <= self.position.norm() <= radius_max:
+            return 0
+
+        state = self._state
+        state[:] = array.array(
+            "d", self.position[:] + self.velocity + [self.propellant])
+        start = state[:]
+        parameters = (
+            self.primary.gravitational_parameter, self.primary.radius, state,
+            self.prograde*(self.max_thrust*self.throttle),
+            self.expulsion_rate*self.throttle, self.dry_mass, dt,
+        )
+        event, steps = cext.rk4(*parameters, steps, radius_min, radius_max)
+        if event != cext.EVENT_NONE:
+            # the step of the event is left to simulate_step()
+            steps -= 1
+            if steps == 0:
+                return 0
+            state[:] = start
+            cext.rk4(*parameters, steps)
+
+        self.position = Vec3(state[:3])
+        self.velocity = Vec3(state[3:6])
+        self.propellant = state[6]
+        end = t + steps * dt
+        self.update_orbit(end)
+        self.update_sphere_of_influence(end - dt, dt)
+        return steps
+
     def update_sphere_of_influence(self, t, dt):
         """Handle the change of sphere of influence
 
@@ -120,11 +236,7 @@ class Rocket(spyce.body.CelestialBody):
             return False
 
         # entering sphere of influence
-        for satellite in self.primary.satellites:
-            # we are technically a satellite of our primary
-            if satellite == self:
-                continue
-
+        for satellite in self.children(self.primary):
             sat_SoI = satellite.sphere_of_influence
 
             # in most situations, orbits do not reach satellites
@@ -140,9 +252,7 @@ class Rocket(spyce.body.CelestialBody):
             # update information
             self.position -= satellite_position
             self.velocity -= satellite.orbit.velocity_at_time(t + dt)
-            self.primary.satellites.remove(self)
-            self.primary = satellite
-            self.primary.satellites.append(self)
+            self.change_primary(satellite)
             self.update_orbit(t + dt)
             return True
 
@@ -155,28 +265,58 @@ class Rocket(spyce.body.CelestialBody):
             # update information
             self.position += self.primary.orbit.position_at_time(t + dt)
             self.velocity += self.primary.orbit.velocity_at_time(t + dt)
-            self.primary.satellites.remove(self)
-            self.primary = self.primary.orbit.primary
-            self.primary.satellites.append(self)
+            self.change_primary(self.primary.orbit.primary)
             self.update_orbit(t + dt)
             return True
 
+    def children(self, body):
+        """Celestial bodies orbiting `body` which the rocket may encounter"""
+        if self.universe is None:
+            return body.satellites
+        return self.universe.children(body)
+
+    def change_primary(self, primary):
+        """Move to the sphere of influence of `primary`"""
+        if self.universe is None:
+            self.primary = primary
+        else:
+            self.universe.move(self, primary)
+
     def update_physics(self, t, dt):
-        """Run physics simulation"""
+        """Run physics simulation
+
+        Return the duration (s) actually simulated: `dt`, or less if the
+        Condition awaited by the flight program is met during the step; its
+        time of trigger is predicted when coasting, and located by bisection
+        when thrusting.
+        """
+        condition = self.resume_condition
+        if not isinstance(condition, spyce.conditions.Condition):
+            condition = None
+
         if self.throttle == 0.:
+            if condition is not None and \
+                    t < self.resume_time_program < t + dt:
+                dt = self.resume_time_program - t
+                self.condition_triggered = True
             self.position = self.orbit.position_at_time(t + dt)
             self.velocity = self.orbit.velocity_at_time(t + dt)
-            return
+            return dt
+
+        if condition is not None and condition.is_met(self, t):
+            condition = None
 
         # propulsion
+        propellant = self.propellant
         if self.propellant > 0:
             required_propellant = self.expulsion_rate * dt * self.throttle
             used_propellant = min(self.propellant, required_propellant)
-            self.propellant -= used_propellant
             thrust_ratio = self.throttle * used_propellant/required_propellant
-            mass = self.dry_mass + self.propellant
+            mass = self.dry_mass + self.propellant - used_propellant
             thrust = self.prograde*(self.max_thrust*thrust_ratio/mass)
         else:
+            used_propellant = 0.
+            thrust_ratio = 0.
             thrust = Vec3([0, 0, 0])
 
         def f(t, y):
@@ -195,18 +335,76 @@ class Rocket(spyce.body.CelestialBody):
 
             return velocity + acceleration
 
+        y0 = self.position[:] + self.velocity
+        if cext is not None and self.primary:
+            state = self._state
+            start = array.array("d", y0 + [propellant])
+        else:
+            state = None
+
+        def step(h):
+            """Update the state after `h` seconds of the step"""
+            if state is None:
+                y = spyce.analysis.runge_kutta_4(f, t, y0, h)
+                y += [propellant - used_propellant * (h / dt)]
+            elif h == dt:
+                state[:] = start
+                cext.rk4(
+                    self.primary.gravitational_parameter, self.primary.radius,
+                    state, self.prograde*(self.max_thrust*self.throttle),
+                    self.expulsion_rate*self.throttle, self.dry_mass, dt, 1,
+                )
+                y = state
+            else:
+                # the propellant is used at the average rate of the step;
+                # the kernel takes the mass at the end of its own step, so
+                # the dry mass is shifted to keep the one of the whole step
+                state[:] = start
+                cext.rk4(
+                    self.primary.gravitational_parameter, self.primary.radius,
+                    state, self.prograde*(self.max_thrust*thrust_ratio),
+                    used_propellant / dt,
+                    self.dry_mass - used_propellant * (1 - h / dt), h, 1,
+                )
+                y = state
+            self.position = Vec3(y[:3])
+            self.velocity = Vec3(y[3:6])
+            self.propellant = y[6]
+
         # update velocity and position
-        y = self.position[:] + self.velocity
-        y = spyce.analysis.runge_kutta_4(f, t, y, dt)
-        self.position = Vec3(y[:3])
-        self.velocity = Vec3(y[3:])
+        step(dt)
+        if condition is not None:
+            self.update_orbit(t + dt, predict=False)
+            if condition.is_met(self, t + dt):
+                # locate the trigger by bisection
+                low, high = 0., dt
+                for _ in range(40):
+                    middle = (low + high) / 2
+                    step(middle)
+                    self.update_orbit(t + middle, predict=False)
+                    if condition.is_met(self, t + middle):
+                        high = middle
+                    else:
+                        low = middle
+                step(high)
+                dt = high
+                self.condition_triggered = True
 
         self.update_orbit(t + dt)
+        return dt
+
+    def update_orbit(self, epoch, predict=True):
+        """Update current orbital trajectory
 
-    def update_orbit(self, epoch):
-        """Update current orbital trajectory"""
+        Unless `predict` is False, also update the times of escape and
+        encounters. The predicted trajectory is only updated when requested
+        (see Rocket.trajectory).
+        """
         self.orbit = spyce.orbit.Orbit.from_state(
             self.primary, self.position, self.velocity, epoch)
+        self._trajectory_outdated = True
+        if not predict:
+            return
 
         # escape
         v = self.orbit.true_anomaly_at_escape()
@@ -218,6 +416,22 @@ class Rocket(spyce.body.CelestialBody):
         self.update_encounters(epoch, reset=True)
         self.update_resume_time()
 
+    @property
+    def trajectory(self):
+        """Predicted patched conics (see spyce.patched_conics)
+
+        Only computed when requested; the prediction is kept while the
+        current orbit still agrees with it.
+        """
+        if self._trajectory_outdated:
+            if self._trajectory is None:
+                self._trajectory = spyce.patched_conics.PatchedConics(
+                    self.orbit, universe=self.universe)
+            else:
+                self._trajectory.update(self.orbit)
+            self._trajectory_outdated = False
+        return self._trajectory
+
     def update_encounters(self, epoch, reset=False):
         """Update time to next encounter if necessary"""
 
@@ -226,9 +440,7 @@ class Rocket(spyce.body.CelestialBody):
 
         # encounters
         self.resume_time_encounter = math.inf
-        for satellite in self.primary.satellites:
-            if satellite is self:
-                continue
+        for satellite in self.children(self.primary):
             r = satellite.sphere_of_influence
             t = self.orbit.time_at_next_encounter(satellite.orbit, epoch, r)
             t = min(t, epoch + satellite.orbit.period/2)
@@ -236,18 +448,40 @@ class Rocket(spyce.body.CelestialBody):
 
         self.update_resume_time()
 
+    def wait_for(self, condition, t):
+        """Resume the flight program when `condition` is met
+
+        `condition` is either a spyce.conditions.Condition, or a function
+        returning whether to resume, or the delay (s) before resuming.
+        """
+        self.resume_condition = condition
+        if isinstance(condition, spyce.conditions.Condition):
+            condition.begin(self, t)
+
     def update_program(self, t, dt):
         while self.resume_time_program <= t + dt:
-            program_delay = self.resume_condition()
-            if isinstance(program_delay, bool):
-                program_delay = 0 if program_delay else dt
-            self.resume_time_program = t + program_delay
-
-            if program_delay >= dt:
-                break
+            condition = self.resume_condition
+            if isinstance(condition, spyce.conditions.Condition):
+                # the step is split where the condition is triggered (see
+                # update_physics()), so the program waits for it until then
+                if self.condition_triggered:
+                    program_delay = 0
+                else:
+                    program_delay = condition.delay(self, t, dt)
+                self.condition_triggered = False
+                self.resume_time_program = t + program_delay
+                if program_delay > 0:
+                    break
+            else:
+                program_delay = condition()
+                if isinstance(program_delay, bool):
+                    program_delay = 0 if program_delay else dt
+                self.resume_time_program = t + program_delay
+                if program_delay >= dt:
+                    break
 
             try:
-                self.resume_condition = next(self.program)
+                self.wait_for(next(self.program), t)
             except StopIteration:
                 self.resume_condition = lambda: math.inf
 
@@ -0,0 +1,156 @@
+"""Simulation of many vessels at once
+
+Time advances by ticks of fixed duration. Only the active vessels (those
+thrusting, or with an event during the tick) are simulated at every tick.
+The others are coasting on Kepler orbits: they wait in a priority queue,
+keyed by their next resume time (wake-up of the flight program, change of
+sphere of influence, or possible encounter), and are not touched until then.
+When their turn comes, they jump analytically to the tick of the event, and
+are simulated along with the active vessels until they coast again.
+
+When no vessel is active, the ticks with nothing to do are skipped at once,
+so that the cost of the simulation depends on the number of events, rather
+than on the number of vessels or on the duration. Likewise, when all the
+active vessels are thrusting, the ticks until the next wake-up are handed to
+them at once (see Rocket.simulate()).
+"""
+
+import heapq
+import itertools
+import math
+
+
+class Scheduler:
+    """Event queue of vessels (such as Rocket)"""
+    def __init__(self, time=0., step=2.**-5):
+        """Scheduler starting at `time` (s), with ticks of `step` (s)"""
+        self.time = time
+        self.step = step
+        self.active = []  # vessels simulated at every tick
+        self._times = {}  # vessel -> time up to which it is simulated
+        self._queue = []  # entries [wake-up time, counter, vessel]
+        self._entries = {}  # vessel -> entry of the queue
+        self._counter = itertools.count()
+
+    def __repr__(self):
+        return "<Scheduler of %i vessels (%i active) at %g s>" % (
+            len(self), len(self.active), self.time)
+
+    def __len__(self):
+        return len(self._times)
+
+    @property
+    def vessels(self):
+        """All the scheduled vessels"""
+        return list(self._times)
+
+    def add(self, vessel):
+        """Simulate a vessel from the current time"""
+        self._times[vessel] = self.time
+        self.active.append(vessel)
+
+    def remove(self, vessel):
+        """Stop simulating a vessel"""
+        del self._times[vessel]
+        entry = self._entries.pop(vessel, None)
+        if entry is None:
+            self.active.remove(vessel)
+        else:
+            entry[-1] = None  # lazily removed from the queue
+
+    def next_event_time(self):
+        """Time (s) of the next tick where a vessel needs to be simulated"""
+        if self.active:
+            return self.time
+        return self._next_wake_up()
+
+    def _next_wake_up(self):
+        """Time (s) of the next tick where a coasting vessel wakes up"""
+        while self._queue and self._queue[0][-1] is None:
+            heapq.heappop(self._queue)
+        if not self._queue:
+            return math.inf
+        return self._queue[0][0]
+
+    def _wake_up_time(self, vessel, time):
+        """Tick (s) of the next event of a vessel, simulated up to `time`
+
+        Like Rocket.simulate(t, dt), a tick handles the events until its end,
+        included.
+        """
+        delay = vessel.resume_time - time
+        if delay <= self.step:
+            return time
+        if math.isinf(delay):
+            return math.inf
+        return time + (math.ceil(delay / self.step) - 1) * self.step
+
+    def _wake_up(self):
+        """Move the vessels due for the current tick to the active ones"""
+        while self._queue and self._queue[0][0] <= self.time:
+            _, _, vessel = heapq.heappop(self._queue)
+            if vessel is None:
+                continue
+            del self._entries[vessel]
+            # jump on the Kepler orbit
+            time = self._times[vessel]
+            if time < self.time:
+                vessel.simulate(time, self.time - time)
+                self._times[vessel] = self.time
+            self.active.append(vessel)
+
+    def tick(self, count=1):
+        """Simulate the active vessels for `count` ticks
+
+        The vessels are only put back in the queue, and the time advanced,
+        at the end.
+        """
+        self._wake_up()
+        end = self.time + count * self.step
+        still_active = []
+        for vessel in self.active:
+            if count == 1:
+                vessel.simulate(self.time, self.step)
+            else:
+                vessel.simulate(self.time, self.step, count)
+            self._times[vessel] = end
+            if vessel.throttle:
+                still_active.append(vessel)
+                continue
+            wake_up = self._wake_up_time(vessel, end)
+            if wake_up <= end:
+                still_active.append(vessel)
+                continue
+            entry = [wake_up, next(self._counter), vessel]
+            self._entries[vessel] = entry
+            heapq.heappush(self._queue, entry)
+        self.active = still_active
+        self.time = end
+
+    def run_until(self, end):
+        """Run the simulation for as many ticks as fit before `end` (s)"""
+        while self.time + self.step <= end:
+            next_event = self.next_event_time()
+            if next_event > self.time:
+                # skip the ticks where nothing happens
+                ticks = (min(next_event, end) - self.time) // self.step
+                if ticks >= 1:
+                    self.time += ticks * self.step
+                    continue
+            self._wake_up()
+            ticks = 1
+            if all(vessel.throttle for vessel in self.active):
+                # the thrusting vessels run until the next wake-up
+                wake_up = min(self._next_wake_up(), end)
+                ticks = max(1, int((wake_up - self.time) // self.step))
+            self.tick(ticks)
+
+    def synchronize(self):
+        """Bring the coasting vessels to the current time
+
+        For instance, before reading their positions and velocities.
+        """
+        for vessel, time in self._times.items():
+            if time < self.time:
+                vessel.simulate(time, self.time - time)
+                self._times[vessel] = self.time
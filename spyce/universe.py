@@ -0,0 +1,88 @@
+"""Isolated simulations sharing the same celestial bodies
+
+The celestial bodies loaded by spyce.load are shared by the whole process,
+and are never modified by a simulation. A Universe selects some of them, and
+owns the vessels (e.g. Rocket) which move between their spheres of
+influence; several universes over the same bodies can then be simulated
+independently, for instance in different threads or forked processes,
+without copying the bodies.
+"""
+
+import math
+
+
+class Universe:
+    """Celestial bodies and the vessels simulated among them"""
+    def __init__(self, bodies):
+        """Universe made of given celestial bodies
+
+        `bodies` is either a mapping from names to bodies (such as
+        spyce.load.kerbol), or an iterable of bodies. Only the selected
+        bodies are considered by the vessels, e.g. for encounters.
+        """
+        if isinstance(bodies, dict):
+            bodies = bodies.values()
+        self.bodies = frozenset(bodies)
+        self._children = {}  # body -> selected satellites
+        self._vessels = {}  # primary -> vessels
+
+    def __repr__(self):
+        return "<Universe of %i bodies and %i vessels>" % (
+            len(self.bodies), len(self.vessels()))
+
+    def children(self, body):
+        """Selected celestial bodies orbiting `body`"""
+        children = self._children.get(body)
+        if children is None:
+            children = tuple(
+                satellite for satellite in body.satellites
+                if satellite in self.bodies
+            )
+            self._children[body] = children
+        return children
+
+    def vessels(self, primary=None):
+        """Vessels orbiting `primary` (default is all the vessels)"""
+        if primary is None:
+            return [
+                vessel
+                for vessels in self._vessels.values()
+                for vessel in vessels
+            ]
+        return list(self._vessels.get(primary, ()))
+
+    def satellites(self, body):
+        """Selected celestial bodies and vessels orbiting `body`"""
+        return list(self.children(body)) + self.vessels(body)
+
+    def add(self, vessel):
+        """Track a vessel, around its current primary"""
+        self._vessels.setdefault(vessel.primary, []).append(vessel)
+        vessel.universe = self
+
+    def remove(self, vessel):
+        """Stop tracking a vessel"""
+        vessels = self._vessels[vessel.primary]
+        vessels.remove(vessel)
+        if not vessels:
+            del self._vessels[vessel.primary]
+        vessel.universe = None
+
+    def move(self, vessel, primary):
+        """Change the primary of a tracked vessel"""
+        self.remove(vessel)
+        vessel.primary = primary
+        self.add(vessel)
+
+    @property
+    def resume_time(self):
+        """Time (s) of the next event among all the vessels"""
+        return min(
+            (vessel.resume_time for vessel in self.vessels()),
+            default=math.inf,
+        )
+
+    def simulate(self, t, dt):
+        """Run the simulation of every vessel from `t` (s) to `t + dt` (s)"""
+        for vessel in self.vessels():
+            vessel.simulate(t, dt)
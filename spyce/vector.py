@@ -172,6 +172,11 @@ class Mat4:
     def column_major(self):
         return [v for col in zip(*self.v) for v in col]
 
+    @classmethod
+    def from_mat3(cls, m):
+        """Affine transformation matrix from a linear one (Mat3)"""
+        return cls([list(row) + [0] for row in m] + [[0, 0, 0, 1]])
+
     @classmethod
     def translate(cls, x, y, z):
         """Rotation matrix of given angle (radians) around axis (x,y,z)"""
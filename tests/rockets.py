@@ -0,0 +1,36 @@
+"""Rockets shared by the tests"""
+
+import math
+
+import spyce.load
+import spyce.rocket
+from spyce.universe import Universe
+
+
+kerbin = spyce.load.kerbol['Kerbin']
+
+
+def make_rocket(orbit, program=None, bodies=(kerbin,), propellant=1e3,
+                engine=True):
+    """Rocket following `orbit` at time 0, pointing prograde
+
+    The orbit should be at its periapsis at time 0, with zero angles, so
+    that the velocity is along the y axis. The rocket is tracked by a
+    Universe made of `bodies`, unless None. It has an engine (50 kN, 300 s)
+    with `propellant` (kg), unless `engine` is false, in which case the
+    throttle is cut.
+    """
+    universe = None if bodies is None else Universe(bodies)
+    rocket = spyce.rocket.Rocket(orbit.primary, program, universe)
+    if engine:
+        part = spyce.rocket.RocketPart("engine", "Engine", 1e3, 0.)
+        part.make_engine(50e3, 300.)
+        part.make_tank(propellant)
+        rocket |= {part}
+    else:
+        rocket.throttle = 0.
+    rocket.position = orbit.position_at_time(0)
+    rocket.velocity = orbit.velocity_at_time(0)
+    rocket.rotate(-math.pi / 2, 1, 0, 0)
+    rocket.update_orbit(0.)
+    return rocket
@@ -0,0 +1,128 @@
+import unittest
+import io
+
+import spyce.orbit
+import spyce.load
+from spyce.universe import Universe
+from spyce.program import FlightProgram
+from spyce.conditions import ApoapsisAbove, TimeElapsed, PropellantEmpty
+import spyce.checkpoint
+from spyce.checkpoint import Checkpoint, CheckpointError
+from tests.rockets import make_rocket
+
+
+kerbol = spyce.load.kerbol
+kerbin = kerbol['Kerbin']
+orbit = spyce.orbit.Orbit(kerbin, 700e3)
+
+
+class Transfer(FlightProgram):
+    """Raise the apoapsis, wait, then burn the remaining propellant"""
+    def start(self, rocket):
+        self.burns = 1
+        return "coast", ApoapsisAbove(1500e3)
+
+    def coast(self, rocket):
+        rocket.throttle = 0.
+        return "burn", TimeElapsed(50.)
+
+    def burn(self, rocket):
+        self.burns += 1
+        rocket.throttle = 1.
+        return "end", PropellantEmpty()
+
+    def end(self, rocket):
+        rocket.throttle = 0.
+
+
+def simulate(rocket, start, end, dt=1.):
+    t = start
+    while t < end:
+        rocket.simulate(t, dt)
+        t += dt
+
+
+class TestCheckpoint(unittest.TestCase):
+    def test_fork(self):
+        rocket = make_rocket(orbit, Transfer(), kerbol, 200.)
+        universe = rocket.universe
+        simulate(rocket, 0., 40.)
+        self.assertEqual(rocket.flight_program.state, "burn")
+
+        checkpoint = Checkpoint.from_universe(40., universe)
+        self.assertEqual(checkpoint.time, 40.)
+        self.assertLess(len(checkpoint.data), 2048)
+
+        # through a file
+        f = io.BytesIO()
+        checkpoint.dump(f)
+        f.seek(0)
+        checkpoint = Checkpoint.load(f)
+
+        simulate(rocket, 40., 200.)
+        self.assertIsNone(rocket.flight_program.state)
+        self.assertEqual(rocket.flight_program.burns, 2)
+        self.assertEqual(rocket.propellant, 0.)
+
+        # forks do not interfere with each other
+        forks = [checkpoint.fork(kerbol) for _ in range(2)]
+        for fork in forks:
+            self.assertEqual(fork.bodies, universe.bodies)
+            copy, = fork.vessels()
+            self.assertIsNot(copy.flight_program, rocket.flight_program)
+            self.assertEqual(copy.flight_program.state, "burn")
+            self.assertEqual(copy.flight_program.burns, 1)
+        for fork in forks:
+            copy, = fork.vessels()
+            simulate(copy, 40., 200.)
+            self.assertEqual(copy.flight_program.burns, 2)
+            self.assertEqual(copy.propellant, 0.)
+            for a, b in zip(copy.position, rocket.position):
+                self.assertAlmostEqual(a, b, delta=1e-3)
+            for a, b in zip(copy.velocity, rocket.velocity):
+                self.assertAlmostEqual(a, b, delta=1e-6)
+
+    def test_restore(self):
+        rocket = make_rocket(orbit, Transfer(), None, 200.)
+        simulate(rocket, 0., 5.)
+        checkpoint = Checkpoint.save(5., [rocket])
+        self.assertIsNone(checkpoint.body_names)
+
+        universe = Universe([kerbin])
+        copy, = checkpoint.restore(kerbol, universe)
+        self.assertEqual(universe.vessels(), [copy])
+        self.assertIs(copy.primary, kerbin)
+        self.assertEqual(copy.parts.pop().max_thrust, 50e3)
+        self.assertEqual(copy.propellant, rocket.propellant)
+        self.assertIsInstance(copy.flight_program.condition, ApoapsisAbove)
+
+        # unknown bodies
+        with self.assertRaises(CheckpointError):
+            checkpoint.restore([kerbol['Mun']])
+
+    def test_generator(self):
+        def program(rocket):
+            yield lambda: False
+
+        rocket = make_rocket(orbit, program, None, 200.)
+        with self.assertRaises(CheckpointError):
+            Checkpoint.save(0., [rocket])
+
+    def test_foreign_class(self):
+        rocket = make_rocket(orbit, Transfer(), None, 200.)
+        data = Checkpoint.save(0., [rocket]).data
+        old = io.BytesIO()
+        spyce.checkpoint._write(old, spyce.checkpoint._class_tag(Transfer))
+        self.assertIn(old.getvalue(), data)
+        for foreign in ("os:system", "spyce.checkpoint:MAGIC",
+                        "unknown.module:Class"):
+            stream = io.BytesIO()
+            spyce.checkpoint._write(stream, foreign)
+            checkpoint = Checkpoint(
+                data.replace(old.getvalue(), stream.getvalue()))
+            with self.assertRaises(CheckpointError):
+                checkpoint.restore(kerbol)
+
+
+if __name__ == '__main__':
+    unittest.main()
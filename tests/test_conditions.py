@@ -0,0 +1,112 @@
+import unittest
+import math
+
+import spyce.orbit
+from spyce.scheduler import Scheduler
+from spyce.conditions import (
+    AltitudeAbove, AltitudeBelow, ApoapsisAbove, PeriapsisBelow,
+    TimeElapsed, TimeReached, PropellantEmpty, TrueAnomalyReached, AnyOf,
+)
+
+from tests.rockets import kerbin, make_rocket
+
+
+class TestConditions(unittest.TestCase):
+    def setUp(self):
+        self.orbit = spyce.orbit.Orbit.from_apses(
+            kerbin, 700e3, 2000e3)
+
+    def test_coasting(self):
+        scheduler = Scheduler(0., 1.)
+        log = []
+        distances = []
+
+        def program(rocket):
+            yield AltitudeAbove(900e3)
+            log.append(scheduler.time)
+            distances.append(rocket.position.norm())
+            yield TrueAnomalyReached(math.pi)
+            log.append(scheduler.time)
+            yield AltitudeBelow(900e3)
+            log.append(scheduler.time)
+            distances.append(rocket.position.norm())
+            yield TimeElapsed(100.)
+            log.append(scheduler.time)
+            yield AnyOf(TimeReached(1e9), PeriapsisBelow(0.))
+            log.append(scheduler.time)
+
+        rocket = make_rocket(self.orbit, program, engine=False)
+        orbit = self.orbit
+        v = orbit.true_anomaly_at_distance(kerbin.radius + 900e3)
+        expected = [
+            orbit.time_at_true_anomaly(v),
+            orbit.time_at_true_anomaly(math.pi),
+            orbit.period - orbit.time_at_true_anomaly(v),
+        ]
+        expected.append(expected[-1] + 100.)
+
+        scheduler.add(rocket)
+        calls = []
+        simulate = rocket.simulate
+        rocket.simulate = lambda t, dt: calls.append(t) or simulate(t, dt)
+
+        # the rocket sleeps until the predicted time
+        scheduler.run_until(1.)
+        self.assertAlmostEqual(rocket.resume_time, expected[0], 6)
+        scheduler.run_until(orbit.period + 200.)
+
+        self.assertEqual(len(log), 4)
+        for time, trigger in zip(log, expected):
+            self.assertLess(time, trigger)
+            self.assertLessEqual(trigger, time + 1.)
+        # the program is resumed exactly at the trigger
+        for distance in distances:
+            self.assertAlmostEqual(distance, kerbin.radius + 900e3, 3)
+        self.assertLess(len(calls), 20)
+        self.assertEqual(rocket.resume_time, 1e9)
+
+    def test_never(self):
+        rocket = make_rocket(self.orbit, engine=False)
+        condition = AltitudeAbove(5000e3)
+        self.assertFalse(condition.is_met(rocket, 0.))
+        self.assertEqual(condition.trigger_time(rocket, 0.), math.inf)
+        condition = ApoapsisAbove(3000e3)
+        self.assertEqual(condition.delay(rocket, 0., 1.), math.inf)
+        self.assertEqual(ApoapsisAbove(2000e3).delay(rocket, 0., 1.), 0)
+        self.assertEqual(PropellantEmpty().delay(rocket, 0., 1.), 0)
+
+    def test_thrusting(self):
+        log = []
+
+        def program(rocket):
+            yield ApoapsisAbove(2500e3)
+            log.append(rocket.orbit.apoapsis)
+            rocket.throttle = 0.
+            yield TimeElapsed(10.)
+            rocket.throttle = 1.
+            yield PropellantEmpty()
+            log.append(rocket.propellant)
+            rocket.throttle = 0.
+
+        rocket = make_rocket(self.orbit, program)
+        burn = rocket.propellant / rocket.expulsion_rate
+        t, dt = 0., 10.
+        while t < 100.:
+            rocket.simulate(t, dt)
+            t += dt
+
+        # the trigger is located inside the steps
+        apoapsis, propellant = log
+        self.assertAlmostEqual(apoapsis, 2500e3, delta=1.)
+        self.assertEqual(propellant, 0.)
+        self.assertEqual(rocket.throttle, 0.)
+
+        # the engine was off during 10 s
+        position = rocket.orbit.position_at_time(100.)
+        for a, b in zip(rocket.position, position):
+            self.assertAlmostEqual(a, b, delta=1e-3)
+        self.assertGreater(burn, 10.)
+
+
+if __name__ == '__main__':
+    unittest.main()
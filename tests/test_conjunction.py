@@ -0,0 +1,119 @@
+import unittest
+
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    import spyce.conjunction
+    from spyce.orbit_array import OrbitArray
+
+
+# dummy primary object
+class DummyPrimary:
+    gravitational_parameter = 3.986e14
+
+
+primary = DummyPrimary()
+
+
+@unittest.skipIf(numpy is None, "requires NumPy")
+class TestConjunction(unittest.TestCase):
+    def setUp(self):
+        # a small catalog of low orbits, dense enough to have conjunctions
+        random = numpy.random.RandomState(42)
+        n = 40
+        self.orbits = OrbitArray.from_semi_major_axis(
+            primary,
+            random.uniform(7.0e6, 7.1e6, n),
+            random.uniform(0, 0.01, n),
+            random.uniform(0, math.pi, n),
+            random.uniform(0, 2*math.pi, n),
+            random.uniform(0, 2*math.pi, n),
+            0,
+            random.uniform(0, 2*math.pi, n),
+        )
+        self.start, self.end = 0., 6000.
+        self.threshold = 100e3
+
+        # brute force: sample every pair densely
+        times = numpy.arange(self.start, self.end, 1.)
+        position = self.orbits.position_at_time(times[:, None])
+        i, j = numpy.triu_indices(n, 1)
+        d = numpy.linalg.norm(position[:, i] - position[:, j], axis=-1)
+        self.minimum = {
+            (a, b): m for a, b, m in zip(i, j, d.min(axis=0))
+        }
+
+    def test_filters(self):
+        # filters never discard a close approach
+        pairs = spyce.conjunction.apsis_filter(self.orbits, self.threshold,
+                                               block_size=7)
+        mask = spyce.conjunction.orbit_path_filter(self.orbits, pairs,
+                                                   self.threshold)
+        kept = {tuple(pair) for pair in pairs[mask]}
+        for pair, minimum in self.minimum.items():
+            if minimum <= self.threshold:
+                self.assertIn(pair, kept)
+        self.assertLess(len(kept), len(self.minimum))
+
+    def test_apsis_filter(self):
+        orbits = OrbitArray(primary, [7e6, 6e6, 9e6], [0, 0.1, 0])
+        pairs = spyce.conjunction.apsis_filter(orbits, 1e3)
+        self.assertEqual(pairs.tolist(), [[0, 1]])
+
+    def test_screen(self):
+        conjunctions = spyce.conjunction.screen(
+            self.orbits, self.start, self.end, self.threshold)
+        self.assertEqual(conjunctions,
+                         sorted(conjunctions, key=lambda c: c[2]))
+        found = {(i, j) for i, j, _, _ in conjunctions}
+        for pair, minimum in self.minimum.items():
+            # pairs which come close enough are found
+            if minimum < self.threshold * 0.99:
+                self.assertIn(pair, found)
+            # only those
+            if minimum > self.threshold * 1.01:
+                self.assertNotIn(pair, found)
+        closest = {}
+        for i, j, time, distance in conjunctions:
+            self.assertLessEqual(distance, self.threshold)
+            self.assertTrue(self.start <= time <= self.end)
+            closest[i, j] = min(closest.get((i, j), math.inf), distance)
+        for pair, distance in closest.items():
+            # brute force samples every second
+            self.assertLessEqual(distance, self.minimum[pair] + 1e-3)
+            self.assertGreater(distance, self.minimum[pair] - 10e3)
+
+    def test_collision(self):
+        # two circular orbits meeting at the same point of the x-axis
+        radius = 7e6
+        period = 2*math.pi * math.sqrt(radius**3 /
+                                       primary.gravitational_parameter)
+        orbits = OrbitArray(
+            primary, radius, 0, [0, math.pi/2], 0, 0, 0,
+            -2*math.pi * 1000 / period,
+        )
+        conjunctions = spyce.conjunction.screen(orbits, 0, period, 1e3)
+        self.assertGreater(len(conjunctions), 0)
+        _, _, time, distance = conjunctions[0]
+        self.assertAlmostEqual(time, 1000., delta=1e-2)
+        # tolerance of 1 ms at about 10 km/s
+        self.assertLess(distance, 10.)
+
+    def test_processes(self):
+        serial = spyce.conjunction.screen(
+            self.orbits, self.start, self.end, self.threshold)
+        parallel = spyce.conjunction.screen(
+            self.orbits, self.start, self.end, self.threshold,
+            processes=2, chunk_size=50)
+        self.assertEqual(len(serial), len(parallel))
+        for a, b in zip(serial, parallel):
+            self.assertEqual(a[:2], b[:2])
+            self.assertAlmostEqual(a[2], b[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
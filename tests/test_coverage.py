@@ -0,0 +1,99 @@
+import unittest
+
+import math
+
+import spyce.load
+import spyce.frames
+from spyce.orbit import Orbit
+from spyce.orbit_j2 import J2Orbit
+from spyce.vector import Vec3
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    import spyce.coverage
+
+
+@unittest.skipIf(numpy is None, "requires NumPy")
+class TestCoverage(unittest.TestCase):
+    def setUp(self):
+        self.Earth = spyce.load.solar['Earth']
+        # a small constellation in the equatorial plane (the elements of
+        # J2Orbit are relative to the equator), and a polar orbit
+        self.orbits = [
+            J2Orbit.from_semi_major_axis(self.Earth, 20e6, 0, 0, 0, 0, 0,
+                                         2*math.pi * k / 3)
+            for k in range(3)
+        ] + [Orbit.from_semi_major_axis(self.Earth, 7e6, 0, math.pi/2)]
+
+    def test_grid(self):
+        latitude, longitude = spyce.coverage.grid(6, 12)
+        self.assertEqual(latitude.shape, (72,))
+        self.assertLess(abs(latitude).max(), math.pi/2)
+        self.assertLess(abs(longitude).max(), math.pi)
+
+    def test_visibility(self):
+        latitude, longitude = spyce.coverage.grid(5, 8)
+        mask = math.radians(10)
+        times, covered = spyce.coverage.visibility(
+            self.Earth, self.orbits, latitude, longitude, 0, 3600, 60,
+            elevation_mask=mask, chunk_elements=100,
+        )
+        self.assertEqual(covered.shape, (40, 61))
+
+        # compare with the scalar path
+        fixed = spyce.frames.body_fixed(self.Earth)
+        for time, column in zip(times[::10], covered.T[::10]):
+            rotation = fixed.rotation_at_time(time)
+            for lat, lon, expected in zip(latitude, longitude, column):
+                r = self.Earth.radius
+                point = rotation * Vec3([
+                    r * math.cos(lat) * math.cos(lon),
+                    r * math.cos(lat) * math.sin(lon),
+                    r * math.sin(lat),
+                ])
+                up = point * (1 / r)
+                computed = False
+                for orbit in self.orbits:
+                    d = orbit.position_at_time(time) - point
+                    if d.dot(up) / d.norm() >= math.sin(mask):
+                        computed = True
+                self.assertEqual(computed, expected)
+
+        # equatorial points are always covered by the ring
+        equator = abs(latitude) < .1
+        self.assertTrue(covered[equator].all())
+
+    def test_statistics(self):
+        times = numpy.arange(10.)
+        covered = numpy.array([
+            [True] * 10,
+            [False] * 10,
+            [True, True, False, False, False, True, False, True, True, True],
+        ])
+        self.assertEqual(spyce.coverage.intervals(times, covered), [
+            [(0., 9.)], [], [(0., 1.), (5., 5.), (7., 9.)],
+        ])
+        self.assertEqual(spyce.coverage.gaps(times, covered), [
+            [], [(0., 9.)], [(2., 4.), (6., 6.)],
+        ])
+        fraction = spyce.coverage.fraction(covered)
+        self.assertTrue(numpy.allclose(fraction, [1, 0, .6]))
+        max_gap = spyce.coverage.max_gap(times, covered)
+        self.assertTrue(numpy.allclose(max_gap, [0, 9, 4]))
+
+    def test_processes(self):
+        latitude, longitude = spyce.coverage.grid(4, 4)
+        serial = spyce.coverage.visibility(
+            self.Earth, self.orbits, latitude, longitude, 0, 7200, 60,
+            chunk_elements=500)
+        parallel = spyce.coverage.visibility(
+            self.Earth, self.orbits, latitude, longitude, 0, 7200, 60,
+            processes=2, chunk_elements=500)
+        self.assertTrue(numpy.array_equal(serial[1], parallel[1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    from spyce.decimation import (
+        douglas_peucker, largest_triangle_three_buckets,
+        StreamingSimplifier, LevelsOfDetail,
+    )
+    from spyce.decimation import _distances_to_segment
+
+
+def max_error(points, kept):
+    """Maximum distance from the points to the simplified path"""
+    error = 0.
+    for i, j in zip(kept[:-1], kept[1:]):
+        if j > i + 1:
+            distances = _distances_to_segment(
+                points[i + 1:j], points[i], points[j])
+            error = max(error, distances.max())
+    return error
+
+
+@unittest.skipIf(numpy is None, "requires NumPy")
+class TestDecimation(unittest.TestCase):
+    def setUp(self):
+        random = numpy.random.RandomState(42)
+        self.path = random.normal(size=(20000, 3)).cumsum(axis=0)
+
+    def test_douglas_peucker(self):
+        kept = douglas_peucker(self.path, 5.)
+        self.assertEqual((kept[0], kept[-1]), (0, len(self.path) - 1))
+        self.assertLess(len(kept), len(self.path) / 10)
+        self.assertLessEqual(max_error(self.path, kept), 5.)
+
+        # straight line
+        line = numpy.linspace(0, 1, 100)[:, None] * [1, 2, 3]
+        self.assertEqual(list(douglas_peucker(line, 1e-9)), [0, 99])
+        self.assertEqual(list(douglas_peucker(line[:1], 1.)), [0])
+
+    def test_largest_triangle(self):
+        t = numpy.linspace(0, 10, 1001)
+        signal = numpy.stack([t, numpy.zeros_like(t)], axis=-1)
+        signal[500, 1] = 100.  # spike
+        kept = largest_triangle_three_buckets(signal, 50)
+        self.assertEqual(len(kept), 50)
+        self.assertEqual((kept[0], kept[-1]), (0, 1000))
+        self.assertTrue(numpy.all(numpy.diff(kept) > 0))
+        self.assertIn(500, kept)
+
+        kept = largest_triangle_three_buckets(self.path, 1000)
+        self.assertEqual(len(numpy.unique(kept)), 1000)
+        self.assertEqual(len(largest_triangle_three_buckets(signal, 2000)),
+                         1001)
+
+    def test_streaming(self):
+        simplifier = StreamingSimplifier(5., max_pending=3000)
+        points, keys = [], []
+        for start in range(0, len(self.path), 777):
+            chunk = self.path[start:start + 777]
+            p, k = simplifier.push(chunk)
+            points.append(p)
+            keys.append(k)
+        p, k = simplifier.finish()
+        points.append(p)
+        keys.append(k)
+        points, keys = numpy.concatenate(points), numpy.concatenate(keys)
+
+        self.assertEqual((keys[0], keys[-1]), (0, len(self.path) - 1))
+        self.assertTrue(numpy.all(numpy.diff(keys) > 0))
+        self.assertTrue(numpy.array_equal(points, self.path[keys]))
+        self.assertLessEqual(max_error(self.path, keys), 5.)
+        batch = douglas_peucker(self.path, 5.)
+        self.assertLess(len(keys), 1.5 * len(batch))
+
+    def test_levels(self):
+        levels = LevelsOfDetail(1., levels=8)
+        for start in range(0, len(self.path), 5000):
+            levels.append(self.path[start:start + 5000])
+        # the end of the path is included before it is simplified
+        _, keys = levels.level(3)
+        self.assertEqual(keys[-1], len(self.path) - 1)
+        levels.finish()
+
+        sizes = []
+        for k in range(len(levels)):
+            points, keys = levels.level(k)
+            self.assertEqual((keys[0], keys[-1]), (0, len(self.path) - 1))
+            self.assertLessEqual(max_error(self.path, keys), levels.bound(k))
+            sizes.append(len(keys))
+        self.assertEqual(sizes, sorted(sizes, reverse=True))
+        self.assertLess(sizes[-1], sizes[0] / 10)
+
+        # choice of the level
+        self.assertEqual(levels.level_for(0.5), 0)
+        self.assertEqual(levels.level_for(1e9), len(levels) - 1)
+        for resolution in (1., 2.9, 3., 7., 100.):
+            k = levels.level_for(resolution)
+            self.assertLessEqual(levels.bound(k), resolution)
+            if k + 1 < len(levels):
+                self.assertGreater(levels.bound(k + 1), resolution)
+        self.assertIs(levels.at_resolution(3.), levels.level(1))
+
+
+if __name__ == '__main__':
+    unittest.main()
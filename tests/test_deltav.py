@@ -0,0 +1,66 @@
+import unittest
+
+import math
+import tempfile
+
+import spyce.load
+import spyce.deltav
+
+
+class TestDeltaV(unittest.TestCase):
+    def test_burns(self):
+        Earth = spyce.load.solar['Earth']
+        # from low Earth orbit to geostationary orbit
+        burn1, burn2 = spyce.deltav.hohmann(Earth, 6678e3, 42164e3)
+        self.assertAlmostEqual(burn1, 2426, delta=2)
+        self.assertAlmostEqual(burn2, 1467, delta=2)
+        # escaping with no excess speed
+        escape = spyce.deltav.ejection(Earth, 6678e3, 0)
+        speed = spyce.deltav.circular_speed(Earth, 6678e3)
+        self.assertAlmostEqual(escape, speed * (math.sqrt(2) - 1))
+
+        Kerbin = spyce.load.kerbol['Kerbin']
+        self.assertAlmostEqual(Kerbin.atmosphere_height, 69078, places=0)
+        radius = spyce.deltav.low_orbit_radius(Kerbin)
+        self.assertAlmostEqual(radius, 679078, places=0)
+
+    def test_map(self):
+        dv_map = spyce.deltav.DeltaVMap.from_bodies(
+            spyce.load.kerbol.values())
+        low_kerbin = spyce.deltav.low_orbit(spyce.load.kerbol['Kerbin'])
+        low_mun = spyce.deltav.low_orbit(spyce.load.kerbol['Mun'])
+
+        # values of the usual maps of the community
+        self.assertAlmostEqual(dv_map.delta_v(low_kerbin, low_mun), 1170,
+                               delta=50)
+        self.assertAlmostEqual(
+            dv_map.delta_v("Kerbin low orbit", "Duna low orbit"), 1690,
+            delta=100)
+        self.assertEqual(dv_map.path(low_kerbin, low_mun), [
+            "Kerbin low orbit", "Mun intercept from Kerbin", "Mun low orbit"
+        ])
+        # the way back costs the same
+        self.assertAlmostEqual(dv_map.delta_v(low_kerbin, low_mun),
+                               dv_map.delta_v(low_mun, low_kerbin))
+
+        # paths are consistent with the edges
+        path = dv_map.path("Kerbin surface", "Eeloo surface")
+        total = sum(dv_map.graph[a][b] for a, b in zip(path, path[1:]))
+        self.assertAlmostEqual(
+            total, dv_map.delta_v("Kerbin surface", "Eeloo surface"))
+        self.assertEqual(dv_map.delta_v(low_kerbin, low_kerbin), 0)
+        with self.assertRaises(KeyError):
+            dv_map.delta_v(low_kerbin, "Kerbol surface")
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = spyce.deltav.cache_path("kerbol.json", directory)
+            built = spyce.deltav.DeltaVMap.load("kerbol.json", directory)
+            with open(path) as f:
+                self.assertIn('"Mun low orbit"', f.read())
+            cached = spyce.deltav.DeltaVMap.load("kerbol.json", directory)
+            self.assertEqual(cached.graph, built.graph)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+import math
+
+import spyce.load
+from spyce.orbit import Orbit
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    import spyce.eclipse
+
+
+@unittest.skipIf(numpy is None, "requires NumPy")
+class TestEclipse(unittest.TestCase):
+    def brute_force(self, orbit, bodies, start, end, step):
+        """Sample the shadows finely"""
+        times = numpy.arange(start, end, step)
+        umbra, penumbra = spyce.eclipse.margins(orbit, bodies, times)
+        in_umbra = (umbra < 0).any(axis=0)
+        in_penumbra = (penumbra < 0).any(axis=0) & ~in_umbra
+        return in_umbra.sum() * step, in_penumbra.sum() * step
+
+    def test_low_orbit(self):
+        Kerbin = spyce.load.kerbol['Kerbin']
+        orbit = Orbit.from_semi_major_axis(Kerbin, 700e3, 0)
+        start, end = 0, 6 * orbit.period
+        umbra, penumbra = spyce.eclipse.eclipses(orbit, start, end)
+        self.assertIn(len(umbra), (6, 7))
+
+        # compare with the cylinder approximation, which lies between the
+        # umbra and the penumbra
+        for interval_start, interval_end in umbra[1:-1]:
+            ratio = (interval_end - interval_start) / orbit.darkness_time()
+            self.assertLess(ratio, 1)
+            self.assertAlmostEqual(ratio, 1, delta=.03)
+
+        # penumbra surrounds the umbra
+        self.assertEqual(len(penumbra), 2 * len(umbra))
+
+        # compare with sampling
+        bodies = spyce.eclipse.occulting_bodies(Kerbin)
+        expected = self.brute_force(orbit, bodies, start, end, .1)
+        self.assertAlmostEqual(spyce.eclipse.duration(umbra), expected[0],
+                               delta=len(umbra))
+        self.assertAlmostEqual(spyce.eclipse.duration(penumbra), expected[1],
+                               delta=len(penumbra))
+
+    def test_moon(self):
+        # a spacecraft beyond the orbit of the Mun, in the same plane
+        Kerbin = spyce.load.kerbol['Kerbin']
+        Mun = spyce.load.kerbol['Mun']
+        self.assertIn(Mun, spyce.eclipse.occulting_bodies(Kerbin))
+        orbit = Orbit.from_semi_major_axis(Kerbin, 20e6, .1)
+        # window around an alignment found beforehand
+        start, end = 3.5e6, 3.6e6
+        umbra, penumbra = spyce.eclipse.eclipses(
+            orbit, start, end, bodies=[Mun])
+        self.assertGreater(len(umbra), 0)
+        expected = self.brute_force(orbit, [Mun], start, end, 1.)
+        self.assertAlmostEqual(spyce.eclipse.duration(umbra), expected[0],
+                               delta=2*len(umbra))
+        self.assertAlmostEqual(spyce.eclipse.duration(penumbra), expected[1],
+                               delta=2*len(penumbra))
+
+    def test_intervals(self):
+        union = spyce.eclipse.union([(3, 4), (0, 1), (.5, 2)])
+        self.assertEqual(union, [(0, 2), (3, 4)])
+        difference = spyce.eclipse.difference([(0, 10)], [(1, 2), (5, 12)])
+        self.assertEqual(difference, [(0, 1), (2, 5)])
+
+
+if __name__ == '__main__':
+    unittest.main()
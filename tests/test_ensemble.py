@@ -0,0 +1,125 @@
+import unittest
+import math
+
+import spyce.orbit
+from spyce.conditions import (
+    ApoapsisAbove, TimeElapsed, PropellantEmpty, AltitudeAbove,
+)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    from spyce.ensemble import Ensemble, summarize
+
+from tests.rockets import kerbin, make_rocket
+
+
+def stop(ensemble, members):
+    ensemble.throttle[members] = 0.
+
+
+def start(ensemble, members):
+    ensemble.throttle[members] = 1.
+
+
+@unittest.skipIf(numpy is None, "requires NumPy")
+class TestEnsemble(unittest.TestCase):
+    def setUp(self):
+        self.orbit = spyce.orbit.Orbit.from_apses(kerbin, 700e3, 2000e3)
+
+    def test_single(self):
+        def program(rocket):
+            yield ApoapsisAbove(2500e3)
+            rocket.throttle = 0.
+            yield TimeElapsed(10.)
+            rocket.throttle = 1.
+            yield PropellantEmpty()
+            rocket.throttle = 0.
+
+        rocket = make_rocket(self.orbit, program)
+        ensemble = Ensemble.from_rocket(rocket, 3, [
+            (ApoapsisAbove(2500e3), stop),
+            (TimeElapsed(10.), start),
+            (PropellantEmpty(), stop),
+        ])
+        for a, b in zip(ensemble.direction[0], rocket.prograde):
+            self.assertAlmostEqual(a, b)
+
+        t, dt = 0., 10.
+        while t < 100.:
+            rocket.simulate(t, dt)
+            ensemble.step(dt)
+            t += dt
+
+        # every member follows the rocket
+        self.assertEqual(ensemble.time, 100.)
+        self.assertEqual(list(ensemble.stage), [3, 3, 3])
+        self.assertEqual(list(ensemble.propellant), [0., 0., 0.])
+        for position in ensemble.position:
+            for a, b in zip(position, rocket.position):
+                self.assertAlmostEqual(a, b, delta=1e-2)
+        for velocity in ensemble.velocity:
+            for a, b in zip(velocity, rocket.velocity):
+                self.assertAlmostEqual(a, b, delta=1e-4)
+        orbits = ensemble.orbits()
+        self.assertAlmostEqual(
+            orbits.apoapsis[0], rocket.orbit.apoapsis, delta=1.)
+
+    def test_dispersion(self):
+        rocket = make_rocket(self.orbit, None)
+        n = 1000
+        random = numpy.random.RandomState(0)
+        thrust = random.normal(50e3, 1e3, n)
+        ensemble = Ensemble.from_rocket(rocket, n, [
+            (TimeElapsed(random.uniform(5., 15., n)), stop),
+            (AltitudeAbove(1e9), stop),
+        ], max_thrust=thrust)
+        ensemble.run(30., 1.)
+
+        # each member stops at its own time
+        durations = ensemble.trigger_times[:, 0]
+        self.assertTrue((durations >= 5.).all())
+        self.assertTrue((durations <= 15.).all())
+        used = 1e3 - ensemble.propellant
+        expected = durations * ensemble.expulsion_rate
+        for a, b in zip(used, expected):
+            self.assertAlmostEqual(a, b, 6)
+        self.assertTrue(numpy.isnan(ensemble.trigger_times[:, 1]).all())
+        self.assertEqual(list(ensemble.throttle), [0.] * n)
+
+        statistics = ensemble.statistics()
+        apoapsis = statistics["apoapsis"]
+        self.assertGreater(apoapsis["std"], 0.)
+        self.assertGreater(apoapsis["mean"], 2000e3)
+        percentiles = apoapsis["percentiles"]
+        self.assertLess(percentiles[5], percentiles[50])
+        self.assertLess(percentiles[50], percentiles[95])
+        self.assertAlmostEqual(
+            statistics["periapsis"]["mean"], 700e3, delta=10e3)
+
+    def test_burnout(self):
+        rocket = make_rocket(self.orbit, None)
+        propellant = numpy.array([0., 100., 1e3])
+        ensemble = Ensemble.from_rocket(rocket, 3, [
+            (PropellantEmpty(), stop),
+        ], propellant=propellant)
+
+        # the empty member is triggered immediately
+        self.assertEqual(list(ensemble.stage), [1, 0, 0])
+        self.assertEqual(ensemble.throttle[0], 0.)
+        ensemble.run(100., 10.)
+        # as with Rocket, the thrust is averaged over the last step
+        burn = propellant / ensemble.expulsion_rate
+        for a, b in zip(ensemble.trigger_times[:, 0], burn):
+            self.assertEqual(a, math.ceil(b / 10.) * 10.)
+
+    def test_summarize(self):
+        summary = summarize(numpy.arange(101.), (0, 50, 100))
+        self.assertEqual(summary["mean"], 50.)
+        self.assertEqual(summary["percentiles"], {0: 0., 50: 50., 100: 100.})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+import spyce.load
+import spyce.deltav
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    import spyce.flyby
+
+
+@unittest.skipIf(numpy is None, "requires NumPy")
+class TestFlyby(unittest.TestCase):
+    def setUp(self):
+        self.Kerbol = spyce.load.kerbol['Kerbol']
+        self.Kerbin = spyce.load.kerbol['Kerbin']
+        self.year = self.Kerbin.orbit.period
+
+    def test_flyby_delta_v(self):
+        Eve = spyce.load.kerbol['Eve']
+        incoming = numpy.array([[1e3, 0, 0], [1e3, 0, 0], [1e3, 0, 0]])
+        outgoing = numpy.array([[0, 1e3, 0], [-1e3, 0, 0], [1e3, 1, 0]])
+        burn = spyce.flyby.flyby_delta_v(Eve, incoming, outgoing)
+        # an unpowered turn, an impossible one, and a burn at the edge of the
+        # sphere of influence
+        self.assertAlmostEqual(burn[0], 0, places=6)
+        self.assertEqual(burn[1], float('inf'))
+        self.assertAlmostEqual(burn[2], 1)
+
+        # a faster exit
+        speed = spyce.flyby.flyby_delta_v(Eve, incoming[:1], 2*outgoing[:1])
+        self.assertGreater(speed[0], 0)
+        self.assertLess(speed[0], 1e3)
+
+    def test_direct(self):
+        Duna = spyce.load.kerbol['Duna']
+        search = spyce.flyby.TrajectorySearch(self.Kerbol, 0, self.year/200)
+        best, = search.search(self.Kerbin, Duna, 0, self.year, max_flybys=0,
+                              count=1)
+        self.assertEqual(best.bodies, (self.Kerbin, Duna))
+        # close to a Hohmann transfer
+        dv_map = spyce.deltav.DeltaVMap.from_bodies(
+            spyce.load.kerbol.values())
+        expected = dv_map.delta_v("Kerbin low orbit", "Duna low orbit")
+        self.assertAlmostEqual(best.delta_v, expected, delta=.05*expected)
+
+    def test_flybys(self):
+        Jool = spyce.load.kerbol['Jool']
+        search = spyce.flyby.TrajectorySearch(self.Kerbol, 0, self.year/50)
+        trajectories = search.search(
+            self.Kerbin, Jool, 0, self.year, max_flybys=1, beam_width=50,
+            samples=16, count=1000)
+        self.assertTrue(any(len(t.bodies) == 3 for t in trajectories))
+        costs = [trajectory.delta_v for trajectory in trajectories]
+        self.assertEqual(costs, sorted(costs))
+        for trajectory in trajectories:
+            self.assertIs(trajectory.bodies[0], self.Kerbin)
+            self.assertIs(trajectory.bodies[-1], Jool)
+            self.assertEqual(trajectory.times, sorted(trajectory.times))
+            self.assertEqual(len(trajectory.burns), len(trajectory.bodies))
+
+        # legs are memoized
+        count = len(search._legs)
+        search.search(self.Kerbin, Jool, 0, self.year, max_flybys=1,
+                      beam_width=50, samples=16, count=1000)
+        self.assertEqual(len(search._legs), count)
+
+        # same results with worker processes
+        parallel = spyce.flyby.TrajectorySearch(self.Kerbol, 0, self.year/50)
+        result = parallel.search(
+            self.Kerbin, Jool, 0, self.year, max_flybys=1, beam_width=50,
+            samples=16, count=1000, processes=2)
+        self.assertEqual([t.delta_v for t in result], costs)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+
+import math
+
+import spyce.frames
+import spyce.load
+from spyce.coordinates import CelestialCoordinates
+from spyce.vector import Vec3
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestFrames(unittest.TestCase):
+    def test_coordinates(self):
+        # all quadrants of right ascension are preserved
+        for degrees in range(5, 360, 30):
+            right_ascension = math.radians(degrees)
+            coordinates = CelestialCoordinates.from_equatorial(
+                right_ascension, .3)
+            coordinates = CelestialCoordinates.from_ecliptic(
+                coordinates.ecliptic_longitude, coordinates.ecliptic_latitude)
+            self.assertAlmostEqual(
+                coordinates.right_ascension % (2*math.pi), right_ascension)
+            self.assertAlmostEqual(coordinates.declination, .3)
+
+    def test_equatorial(self):
+        # the equatorial frame of the Earth is the equatorial frame
+        Earth = spyce.load.solar['Earth']
+        frame = spyce.frames.body_equatorial(Earth)
+        self.assertAlmostEqual(frame.orientation,
+                               spyce.frames.equatorial.orientation)
+        self.assertIs(frame, spyce.frames.body_equatorial(Earth))
+
+        # the celestial north pole is tilted towards the ecliptic longitude 90°
+        e = CelestialCoordinates.obliquity_of_the_ecliptic
+        pole = spyce.frames.equatorial.rotation_at_time() * Vec3([0, 0, 1])
+        self.assertAlmostEqual(pole, Vec3([0, math.sin(e), math.cos(e)]))
+
+    def test_body_fixed(self):
+        Jupiter = spyce.load.solar['Jupiter']
+        frame = spyce.frames.body_fixed(Jupiter)
+        self.assertIs(frame, spyce.frames.body_fixed(Jupiter))
+
+        # the rotation axis is that of the north pole
+        pole = Jupiter.north_pole
+        axis = frame.rotation_at_time(1234.) * Vec3([0, 0, 1])
+        self.assertAlmostEqual(math.asin(axis[2]), pole.ecliptic_latitude)
+        self.assertAlmostEqual(math.atan2(axis[1], axis[0]),
+                               pole.ecliptic_longitude)
+
+        # the frame is back to its original orientation after a turn
+        period = Jupiter.rotational_period
+        self.assertAlmostEqual(frame.rotation_at_time(3*period),
+                               frame.rotation_at_time(0))
+
+    @unittest.skipIf(numpy is None, "requires NumPy")
+    def test_batched(self):
+        Mars = spyce.load.solar['Mars']
+        frame = spyce.frames.body_fixed(Mars)
+        times = numpy.linspace(-1e6, 1e6, 7)
+        matrices = frame.matrices_at_time(times)
+        for time, matrix in zip(times, matrices):
+            expected = numpy.array(frame.rotation_at_time(time))
+            self.assertTrue(numpy.allclose(matrix, expected))
+
+        # round trip through two frames
+        random = numpy.random.RandomState(0)
+        position = random.uniform(-1e7, 1e7, (7, 3))
+        velocity = random.uniform(-1e3, 1e3, (7, 3))
+        converted = frame.convert(spyce.frames.equatorial, times,
+                                  position, velocity)
+        back = spyce.frames.equatorial.convert(frame, times, *converted)
+        self.assertTrue(numpy.allclose(back[0], position))
+        self.assertTrue(numpy.allclose(back[1], velocity))
+
+    @unittest.skipIf(numpy is None, "requires NumPy")
+    def test_surface(self):
+        Earth = spyce.load.solar['Earth']
+        latitude = numpy.radians([0, 45, 90])
+        position, velocity = spyce.frames.surface_state(
+            Earth, 1., latitude, 0, 1e5)
+
+        # points on the surface move with the ground
+        speed = numpy.linalg.norm(velocity, axis=-1)
+        expected = Earth.surface_velocity * numpy.cos(latitude)
+        self.assertTrue(numpy.allclose(speed, expected))
+
+        longitude, computed_latitude, altitude = \
+            spyce.frames.surface_coordinates(Earth, 1e5, position)
+        self.assertTrue(numpy.allclose(computed_latitude, latitude))
+        self.assertTrue(numpy.allclose(longitude[:2], 1.))
+        self.assertTrue(numpy.allclose(altitude, 0, atol=1e-6))
+
+
+if __name__ == '__main__':
+    unittest.main()
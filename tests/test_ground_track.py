@@ -0,0 +1,78 @@
+import unittest
+
+import math
+
+import spyce.load
+import spyce.frames
+from spyce.orbit import Orbit
+from spyce.orbit_j2 import J2Orbit
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    import spyce.ground_track
+
+
+@unittest.skipIf(numpy is None, "requires NumPy")
+class TestGroundTrack(unittest.TestCase):
+    def test_ground_track(self):
+        Earth = spyce.load.solar['Earth']
+        orbit = Orbit.from_semi_major_axis(Earth, 7e6, .01, 1, 2, 3)
+        latitude, longitude = orbit.ground_track(0, 86400, 50)
+        self.assertEqual(latitude.shape, (50,))
+
+        # compare with the scalar path
+        frame = spyce.frames.body_fixed(Earth)
+        for time, lat, lon in zip(numpy.linspace(0, 86400, 50),
+                                  latitude, longitude):
+            position = orbit.position_at_time(time)
+            x, y, z = frame.from_ecliptic(time, position)
+            self.assertAlmostEqual(lat, math.atan2(z, math.hypot(x, y)))
+            self.assertAlmostEqual(lon, math.atan2(y, x))
+
+        # the latitude is bounded by the inclination to the equator
+        equator = spyce.frames.body_equatorial(Earth).orientation
+        normal = numpy.array(orbit.transform)[:, 2]
+        pole = numpy.array(equator)[:, 2]
+        inclination = math.acos(normal @ pole)
+        self.assertLessEqual(abs(latitude).max(), inclination + 1e-9)
+
+    def test_ground_tracks(self):
+        Earth = spyce.load.solar['Earth']
+        Mars = spyce.load.solar['Mars']
+        orbits = [
+            Orbit(Earth, 7e6, 0, .5),
+            Orbit(Mars, 4e6, .1, 1),
+            J2Orbit(Earth, 7e6, 0, .5),
+        ]
+        latitude, longitude = spyce.ground_track.ground_tracks(
+            orbits, 0, 1e4, 20)
+        self.assertEqual(latitude.shape, (3, 20))
+        for orbit, lat, lon in zip(orbits, latitude, longitude):
+            expected = orbit.ground_track(0, 1e4, 20)
+            self.assertTrue(numpy.allclose(lat, expected[0]))
+            self.assertTrue(numpy.allclose(lon, expected[1]))
+
+    def test_repeat_ground_track(self):
+        Earth = spyce.load.solar['Earth']
+
+        # Landsat 8: 233 revolutions in 16 days, at about 705 km
+        orbit = spyce.ground_track.repeat_ground_track(
+            Earth, 233, 16, inclination=math.radians(98.2))
+        altitude = orbit.semi_major_axis - Earth.radius
+        self.assertAlmostEqual(altitude / 1e3, 705, delta=5)
+
+        # the ground track goes over the same points after the cycle
+        cycle = 233 * spyce.ground_track.nodal_period(orbit)
+        self.assertAlmostEqual(cycle / 86400, 16, delta=.1)
+        times = numpy.linspace(0, 86400, 10)
+        for time in times:
+            before = orbit.ground_track(time, time + cycle, 2)
+            self.assertAlmostEqual(before[0][0], before[0][1], places=6)
+            self.assertAlmostEqual(before[1][0], before[1][1], places=6)
+
+
+if __name__ == '__main__':
+    unittest.main()
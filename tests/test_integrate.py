@@ -0,0 +1,204 @@
+import unittest
+import array
+import math
+
+import spyce.orbit
+import spyce.analysis
+import spyce.rocket
+from spyce.conditions import TimeElapsed, PropellantEmpty, AltitudeAbove
+from spyce.vector import Vec3
+from tests.rockets import kerbin, make_rocket
+
+try:
+    from spyce.cext import integrate
+except ImportError:
+    integrate = None
+
+
+mu = kerbin.gravitational_parameter
+
+
+def make_state(orbit, propellant):
+    """State buffer on `orbit` at time 0"""
+    position = orbit.position_at_time(0)
+    velocity = orbit.velocity_at_time(0)
+    return array.array("d", list(position) + list(velocity) + [propellant])
+
+
+def program(rocket):
+    rocket.log = []
+    yield TimeElapsed(10.5)
+    rocket.log.append(rocket.propellant)
+    rocket.throttle = 0.
+    yield TimeElapsed(4.2)
+    rocket.throttle = 1.
+    yield lambda: (rocket.propellant - 500.) / rocket.expulsion_rate
+    rocket.log.append(rocket.propellant)
+    yield AltitudeAbove(110e3)
+    rocket.log.append(rocket.propellant)
+    yield PropellantEmpty()
+    rocket.log.append(rocket.propellant)
+    rocket.throttle = 0.
+
+
+@unittest.skipIf(integrate is None, "requires the C extension")
+class TestIntegrate(unittest.TestCase):
+    def setUp(self):
+        self.orbit = spyce.orbit.Orbit.from_apses(kerbin, 700e3, 2000e3)
+
+    def test_rk4(self):
+        state = make_state(self.orbit, 100.)
+        thrust = Vec3([0., 50e3, 0.])
+        rate, dry_mass, h = 17., 1e3, 2.
+
+        # same step as Rocket.update_physics()
+        mass = dry_mass + 100. - rate * h
+        acceleration = thrust * (1 / mass)
+
+        def f(t, y):
+            position = Vec3(y[:3])
+            distance = position.norm()
+            g = kerbin.gravity(distance)
+            return y[3:] + (position * (-g/distance) + acceleration)
+        expected = spyce.analysis.runge_kutta_4(f, 0., list(state[:6]), h)
+
+        event, steps = integrate.rk4(
+            mu, kerbin.radius, state, thrust, rate, dry_mass, h, 1)
+        self.assertEqual((event, steps), (integrate.EVENT_NONE, 1))
+        for a, b in zip(state[:6], expected):
+            self.assertAlmostEqual(a, b, 6)
+        self.assertEqual(state[6], 100. - rate * h)
+
+    def test_rk4_ensemble(self):
+        # on the orbit, on another one, and below the surface
+        states = [
+            list(make_state(self.orbit, 0.))[:6],
+            [0., 900e3, 0., -2200., 0., 100.],
+            [300e3, 0., 0., 0., 500., 0.],
+        ]
+        accelerations = [(0., 50., 0.), (0., 0., 0.), (-10., 0., 5.)]
+        h = array.array("d", [2., 1., .5])
+        state = array.array("d", [y[i] for i in range(6) for y in states])
+        acceleration = array.array(
+            "d", [a[i] for i in range(3) for a in accelerations])
+        out = array.array("d", [0.] * 18)
+        integrate.rk4_ensemble(
+            mu, kerbin.radius, state, out, acceleration, h)
+
+        for j, (y, a) in enumerate(zip(states, accelerations)):
+            def f(t, y):
+                position = Vec3(y[:3])
+                distance = position.norm()
+                g = kerbin.gravity(distance)
+                return y[3:] + (position * (-g/distance) + Vec3(a))
+            expected = spyce.analysis.runge_kutta_4(f, 0., y, h[j])
+            for i in range(6):
+                self.assertAlmostEqual(out[3*i + j], expected[i], 6)
+
+        # the buffers must hold 6 and 3 components per member
+        with self.assertRaises(ValueError):
+            integrate.rk4_ensemble(
+                mu, kerbin.radius, state, out, acceleration[:6], h)
+
+    def test_events(self):
+        # burnout, during the fourth step
+        state = make_state(self.orbit, 100.)
+        event, steps = integrate.rk4(
+            mu, kerbin.radius, state, (0., 50e3, 0.), 30., 1e3, 1., 10)
+        self.assertEqual((event, steps), (integrate.EVENT_BURNOUT, 4))
+        self.assertEqual(state[6], 0.)
+
+        # coasting to the apoapsis
+        state = make_state(self.orbit, 0.)
+        event, steps = integrate.rk4(
+            mu, kerbin.radius, state, (0., 0., 0.), 0., 1e3, 1., 100000,
+            0., 1900e3)
+        self.assertEqual(event, integrate.EVENT_RADIUS_ABOVE)
+        v = self.orbit.true_anomaly_at_distance(1900e3)
+        self.assertAlmostEqual(
+            steps, self.orbit.time_at_true_anomaly(v), delta=1.)
+
+        # the buffer must hold a state
+        with self.assertRaises(ValueError):
+            integrate.rk4(mu, kerbin.radius, array.array("d", [0.] * 6),
+                          (0., 0., 0.), 0., 1e3, 1., 1)
+
+    def test_adaptive(self):
+        # one revolution
+        state = make_state(self.orbit, 0.)
+        period = self.orbit.period
+        event, elapsed, h = integrate.adaptive(
+            mu, kerbin.radius, state, (0., 0., 0.), 0., 1e3, period, 1e-10,
+            1.)
+        self.assertEqual(event, integrate.EVENT_NONE)
+        self.assertEqual(elapsed, period)
+        self.assertGreater(h, 1.)
+        for a, b in zip(state[:3], self.orbit.position_at_time(period)):
+            self.assertAlmostEqual(a, b, delta=1e-2)
+
+        # rocket equation, far from any body, with the step ending at burnout
+        state = array.array("d", [1e12, 0., 0., 0., 0., 0., 1e3])
+        exhaust_velocity = 3000.
+        rate = 50e3 / exhaust_velocity
+        event, elapsed, h = integrate.adaptive(
+            0., 1., state, (0., 50e3, 0.), rate, 1e3, 200., 1e-12, 1.)
+        self.assertEqual(event, integrate.EVENT_BURNOUT)
+        self.assertAlmostEqual(elapsed, 1e3 / rate, 9)
+        self.assertEqual(state[6], 0.)
+        self.assertAlmostEqual(
+            state[4], exhaust_velocity * math.log(2.), 6)
+
+        # the gravity overflows close to a point mass, so the steps shrink
+        # until they underflow
+        state = array.array("d", [1e-100, 0., 0., 0., 0., 0., 0.])
+        event, elapsed, h = integrate.adaptive(
+            1e308, 1e-200, state, (0., 0., 0.), 0., 1e3, 10., 1e-10, 1.)
+        self.assertEqual((event, elapsed), (integrate.EVENT_NONE, 0.))
+        self.assertEqual(state[0], 1e-100)
+
+        # invalid steps, tolerances and inputs
+        for h, tolerance, duration in [
+            (0., 1e-10, 10.), (1., 0., 10.), (math.nan, 1e-10, 10.),
+            (1., 1e-10, math.inf),
+        ]:
+            with self.assertRaises(ValueError):
+                integrate.adaptive(
+                    mu, kerbin.radius, make_state(self.orbit, 0.),
+                    (0., 0., 0.), 0., 1e3, duration, tolerance, h)
+
+    def test_rocket(self):
+        rocket = make_rocket(self.orbit, program)
+        steps = []
+        simulate_step = rocket.simulate_step
+
+        def counted(t, dt):
+            steps.append(rocket.throttle)
+            simulate_step(t, dt)
+        rocket.simulate_step = counted
+        rocket.simulate(0., 1., 100)
+
+        # same simulation, one step at a time, in Python
+        expected = make_rocket(self.orbit, program)
+        cext = spyce.rocket.cext
+        spyce.rocket.cext = None
+        try:
+            for i in range(100):
+                expected.simulate(float(i), 1.)
+        finally:
+            spyce.rocket.cext = cext
+
+        # only the thrusting steps of the events are simulated one by one
+        self.assertLessEqual(steps.count(1.), 3)
+        self.assertEqual(len(rocket.log), 4)
+        self.assertEqual(len(expected.log), 4)
+        for a, b in zip(rocket.log, expected.log):
+            self.assertAlmostEqual(a, b, 9)
+        self.assertEqual(rocket.propellant, 0.)
+        for a, b in zip(rocket.position, expected.position):
+            self.assertAlmostEqual(a, b, delta=1e-3)
+        for a, b in zip(rocket.velocity, expected.velocity):
+            self.assertAlmostEqual(a, b, delta=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
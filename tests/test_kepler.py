@@ -0,0 +1,65 @@
+import unittest
+
+import math
+import itertools
+
+from spyce.orbit import Orbit
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    import spyce.kepler
+
+
+# dummy primary object
+class DummyPrimary:
+    gravitational_parameter = 1e20
+
+
+primary = DummyPrimary()
+
+
+@unittest.skipIf(numpy is None, "requires NumPy")
+class TestKepler(unittest.TestCase):
+    def test_state_at_time(self):
+        periapsis = (1e9, 1e13)
+        eccentricity = (0.0, 0.00001, 0.5, 0.99999, 1.0, 1.00001, 10.0)
+        angle = (-math.pi/2, math.pi/4, math.pi)
+        orbits = [
+            Orbit(primary, *elements, 0, 1)
+            for elements in itertools.product(periapsis, eccentricity, angle,
+                                              angle, angle)
+        ]
+        times = numpy.linspace(-1e4, 1e4, 5)
+
+        positions, velocities = spyce.kepler.state_at_time(orbits, times)
+        self.assertEqual(positions.shape, (len(orbits), len(times), 3))
+
+        for orbit, position, velocity in zip(orbits, positions, velocities):
+            for time, p, v in zip(times, position, velocity):
+                expected = orbit.position_at_time(time)
+                for a, b in zip(p, expected):
+                    self.assertAlmostEqual(a / expected.norm(),
+                                           b / expected.norm(), msg=orbit)
+                expected = orbit.velocity_at_time(time)
+                for a, b in zip(v, expected):
+                    self.assertAlmostEqual(a / expected.norm(),
+                                           b / expected.norm(), msg=orbit)
+
+    def test_anomalies(self):
+        eccentricity = numpy.array([0., .1, .5, .9, .999, 1., 1.5, 10.])
+        M = numpy.linspace(-10, 10, 101)[:, None]
+        v = spyce.kepler.true_anomaly_at_mean_anomaly(eccentricity, M)
+        back = spyce.kepler.mean_anomaly_at_true_anomaly(eccentricity, v)
+
+        # closed orbits wrap around
+        closed = eccentricity < 1
+        diff = back - M
+        diff[:, closed] = (diff[:, closed] + math.pi) % (2*math.pi) - math.pi
+        self.assertLess(abs(diff).max(), 1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+import math
+
+import spyce.load
+from spyce.orbit import Orbit
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    import spyce.lambert
+
+
+@unittest.skipIf(numpy is None, "requires NumPy")
+class TestLambert(unittest.TestCase):
+    def test_solve(self):
+        Kerbin = spyce.load.kerbol['Kerbin']
+        mu = Kerbin.gravitational_parameter
+        orbits = [
+            Orbit(Kerbin, 700e3, .3, .4, 1, 2),  # elliptic
+            Orbit(Kerbin, 700e3, 1.5, .4, 1, 2),  # hyperbolic
+            Orbit(Kerbin, 700e3, .8, 2.8, 1, 2),  # retrograde
+        ]
+        for orbit in orbits:
+            retrograde = orbit.inclination > math.pi/2
+            # short and long ways, within one revolution
+            last = min(.9 * orbit.period, 9000)
+            for start, end in [(0, 500), (100, 2500), (300, last)]:
+                position1 = numpy.array(orbit.position_at_time(start))
+                position2 = numpy.array(orbit.position_at_time(end))
+                velocity1, velocity2 = spyce.lambert.solve(
+                    mu, position1, position2, end - start, retrograde)
+                expected1 = numpy.array(orbit.velocity_at_time(start))
+                expected2 = numpy.array(orbit.velocity_at_time(end))
+                self.assertLess(numpy.linalg.norm(velocity1 - expected1), 1e-6)
+                self.assertLess(numpy.linalg.norm(velocity2 - expected2), 1e-6)
+
+    def test_batch(self):
+        position1 = numpy.array([[1e7, 0, 0], [1e7, 0, 0]])
+        position2 = numpy.array([[0, 1e7, 0], [-1e7, 0, 0]])
+        velocity1, _ = spyce.lambert.solve(3.5316e12, position1, position2,
+                                           [[1e4, 1e4], [2e4, 2e4]])
+        self.assertEqual(velocity1.shape, (2, 2, 3))
+        self.assertTrue(numpy.isfinite(velocity1[:, 0]).all())
+        # opposite positions do not define a plane
+        self.assertTrue(numpy.isnan(velocity1[:, 1]).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    import spyce.kepler
+    import spyce.load
+    from spyce.locator import Locator
+
+
+def brute_force(root, position, centers):
+    """Deepest body whose sphere of influence contains the position"""
+    best, depth = root, 0
+
+    def visit(body, level):
+        nonlocal best, depth
+        for satellite in body.satellites:
+            if satellite.orbit is None:
+                continue
+            distance = numpy.linalg.norm(position - centers[satellite])
+            if distance <= satellite.sphere_of_influence and level > depth:
+                best, depth = satellite, level
+            visit(satellite, level + 1)
+    visit(root, 1)
+    return best
+
+
+@unittest.skipIf(numpy is None, "requires NumPy")
+class TestLocator(unittest.TestCase):
+    def check_system(self, system, root):
+        locator = Locator(system[root])
+        time = 1e7
+        generator = numpy.random.default_rng(42)
+
+        centers = {
+            body: spyce.kepler.global_position_at_time(body, time)
+            for body in system.values()
+        }
+
+        # points around each body, at various fractions of its SoI
+        positions = []
+        for body in system.values():
+            if body.orbit is None or not body.sphere_of_influence:
+                continue
+            center = centers[body]
+            for scale in (.1, .9, 1.1, 3):
+                direction = generator.normal(size=3)
+                direction /= numpy.linalg.norm(direction)
+                positions.append(
+                    center + direction * scale * body.sphere_of_influence)
+        positions = numpy.array(positions)
+
+        expected = [brute_force(system[root], p, centers) for p in positions]
+        self.assertEqual(
+            [locator.locate(p, time) for p in positions], expected)
+        self.assertEqual(list(locator.locate_many(positions, time)), expected)
+
+        # different times for each point
+        times = numpy.full(len(positions), time)
+        times[::2] += 1
+        result = locator.locate_many(positions, times)
+        for position, t, body in zip(positions, times, result):
+            self.assertIs(body, locator.locate(position, t))
+
+    def test_kerbol(self):
+        self.check_system(spyce.load.kerbol, 'Kerbol')
+
+    def test_solar(self):
+        self.check_system(spyce.load.solar, 'Sun')
+
+    def test_locate_state(self):
+        system = spyce.load.kerbol
+        locator = Locator(system['Kerbol'])
+        mun = system['Mun']
+        time = 1e6
+        position, velocity = spyce.kepler.global_state_at_time(mun, time)
+        offset = numpy.array([1e5, 0, 0])
+        body, relative_position, relative_velocity = locator.locate_state(
+            position + offset, velocity + 10, time)
+        self.assertIs(body, mun)
+        numpy.testing.assert_allclose(relative_position, offset, atol=1e-3)
+        numpy.testing.assert_allclose(relative_velocity, [10] * 3)
+
+    def test_cache(self):
+        locator = Locator(spyce.load.kerbol['Kerbol'], cache_size=2)
+        mun = spyce.load.kerbol['Mun']
+        for time in (0, 1, 2, 1):
+            numpy.testing.assert_allclose(
+                locator.global_position(mun, time),
+                spyce.kepler.global_position_at_time(mun, time))
+        self.assertEqual(list(locator._positions), [2., 1.])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+import io
+import os
+import math
+import tempfile
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    import spyce.mpcorb
+    from spyce.load import solar
+    from spyce.physics import au
+
+
+sample = os.path.join(os.path.dirname(__file__), "mpcorb_sample.dat")
+
+
+@unittest.skipIf(numpy is None, "requires NumPy")
+class TestMPCORB(unittest.TestCase):
+    def test_epochs(self):
+        epochs = spyce.mpcorb.unpack_epochs([b"J9611", b"K0011", b"K2427"])
+        days = epochs / 86400
+        self.assertAlmostEqual(days[0], -1461.5)
+        self.assertAlmostEqual(days[1], -.5)
+        self.assertAlmostEqual(days[2], 8802.5)
+        self.assertAlmostEqual(
+            spyce.mpcorb.unpack_epochs([b"K19CV"])[0] / 86400, 7303.5)
+
+    def test_load(self):
+        designations, orbits = spyce.mpcorb.load(sample)
+        self.assertEqual(len(orbits), 8)
+        self.assertEqual(designations[0], b"00001")
+        self.assertEqual(designations[-1], b"K19A00A")
+
+        # (1) Ceres
+        ceres = orbits[0]
+        self.assertIs(ceres.primary, solar["Sun"])
+        self.assertAlmostEqual(ceres.semi_major_axis / au, 2.7660431)
+        self.assertAlmostEqual(ceres.eccentricity, 0.0796196)
+        self.assertAlmostEqual(math.degrees(ceres.inclination), 10.58788)
+        self.assertAlmostEqual(math.degrees(ceres.mean_anomaly_at_epoch),
+                               188.70268)
+        self.assertAlmostEqual(ceres.epoch / 86400, 9255.5)  # 2025-05-05
+
+        # the mean motion given by the catalog matches that of the Sun
+        mean_motion = numpy.degrees(orbits.mean_motion) * 86400
+        expected = [0.21424745, 0.21358773, 0.22604182, 0.27161699,
+                    0.23824646, 1.11259853, 0.19830776, 0.54840200]
+        for n, n_expected in zip(mean_motion, expected):
+            self.assertAlmostEqual(n / n_expected, 1, places=6)
+
+    def test_chunks(self):
+        _, orbits = spyce.mpcorb.load(sample)
+        chunks = list(spyce.mpcorb.read_chunks(sample, chunk_size=3))
+        self.assertEqual([len(chunk) for _, chunk in chunks], [3, 3, 2])
+        joined = numpy.concatenate([chunk.data for _, chunk in chunks], axis=1)
+        self.assertTrue(numpy.array_equal(joined, orbits.data))
+
+        # file objects
+        with open(sample, "rb") as f:
+            data = io.BytesIO(f.read())
+        _, from_file = spyce.mpcorb.load(data)
+        self.assertTrue(numpy.array_equal(from_file.data, orbits.data))
+
+    def test_no_record(self):
+        with self.assertRaises(ValueError):
+            spyce.mpcorb.load(io.BytesIO(b"header only\n"))
+
+    def test_memory_map(self):
+        designations, orbits = spyce.mpcorb.load(sample)
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "mpcorb.npy")
+            names = os.path.join(directory, "designations.npy")
+            spyce.mpcorb.convert(sample, output, names, chunk_size=3)
+
+            mapped = spyce.mpcorb.memory_map(output)
+            self.assertIsInstance(mapped.data, numpy.memmap)
+            self.assertTrue(numpy.array_equal(mapped.data, orbits.data))
+            self.assertTrue(numpy.array_equal(numpy.load(names), designations))
+            position = mapped.position_at_time(0)
+            self.assertEqual(position.shape, (8, 3))
+            del mapped, position
+
+
+if __name__ == '__main__':
+    unittest.main()
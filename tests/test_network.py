@@ -0,0 +1,106 @@
+import unittest
+
+import math
+
+import spyce.load
+import spyce.physics
+from spyce.orbit_j2 import J2Orbit
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    import spyce.network
+
+
+@unittest.skipIf(numpy is None, "requires NumPy")
+class TestNetwork(unittest.TestCase):
+    def setUp(self):
+        self.Kerbin = spyce.load.kerbol['Kerbin']
+        self.station = spyce.network.GroundStation(
+            'KSC', self.Kerbin, math.radians(-.1), math.radians(-74.6))
+        # an equatorial ring of relays with Communotron 32 antennas
+        self.relays = [
+            spyce.network.Satellite(
+                'relay %i' % k, J2Orbit.from_semi_major_axis(
+                    self.Kerbin, 2e6, 0, 0, 0, 0, 0, 2*math.pi * k / 4),
+                5e6)
+            for k in range(4)
+        ]
+        # a probe around the Mun, with a short range antenna
+        Mun = spyce.load.kerbol['Mun']
+        self.probe = spyce.network.Satellite(
+            'probe', J2Orbit.from_semi_major_axis(Mun, 500e3, 0, math.pi/2),
+            90e6)
+        self.nodes = [self.station] + self.relays + [self.probe]
+
+    def test_occluded(self):
+        first = numpy.array([[-2., 0, 0], [-2, 2, 0], [1, 0, 0]])
+        second = numpy.array([[2., 0, 0], [2, 2, 0], [2, 0, 0]])
+        centers = numpy.zeros((1, 3))
+        result = spyce.network.occluded(first, second, centers, [1.])
+        self.assertEqual(result.tolist(), [True, False, False])
+
+    def test_links(self):
+        network = spyce.network.Network(self.nodes, self.station)
+        self.assertIn(spyce.load.kerbol['Mun'], network.bodies)
+        for time in numpy.linspace(0, 6 * 3600, 13):
+            network.update(time)
+            links = set(network.links())
+
+            # compare with the pairwise computation
+            positions = spyce.network.positions_at_time(self.nodes, [time])[0]
+            centers = [
+                spyce.kepler.global_position_at_time(body, time)
+                for body in network.bodies
+            ]
+            for i, a in enumerate(self.nodes):
+                for j in range(i+1, len(self.nodes)):
+                    b = self.nodes[j]
+                    distance = numpy.linalg.norm(positions[i] - positions[j])
+                    expected = distance <= min(a.communication_range,
+                                               b.communication_range)
+                    if expected:
+                        expected = not spyce.network.occluded(
+                            positions[[i]], positions[[j]],
+                            centers, network.radii)[0]
+                    self.assertEqual((a, b) in links, expected)
+
+            # the ring always reaches the station
+            for relay in self.relays:
+                self.assertTrue(network.connected(relay))
+                path = network.path(relay)
+                self.assertIs(path[0], relay)
+                self.assertIs(path[-1], self.station)
+                latency = network.latency(relay)
+                direct = network.distance(self.nodes.index(relay), 0)
+                self.assertGreaterEqual(latency * spyce.physics.c,
+                                        direct * (1 - 1e-12))
+            self.assertEqual(network.latency(self.station), 0)
+
+    def test_timeline(self):
+        network = spyce.network.Network(self.nodes, self.station,
+                                        chunk_size=7)
+        times = numpy.linspace(0, 2e5, 50)
+        links = set()
+        connected = []
+        for time, added, removed in network.timeline(times):
+            self.assertFalse(links & set(added))
+            self.assertTrue(set(removed) <= links)
+            links |= set(added)
+            links -= set(removed)
+            self.assertEqual(links, set(network.links()))
+            connected.append(network.connected(self.probe))
+
+        # the probe is sometimes hidden by the Mun or Kerbin
+        self.assertIn(True, connected)
+        self.assertIn(False, connected)
+        # the chunks match separate updates
+        other = spyce.network.Network(self.nodes, self.station)
+        other.update(times[-1])
+        self.assertEqual(set(other.links()), links)
+
+
+if __name__ == '__main__':
+    unittest.main()
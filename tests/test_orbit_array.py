@@ -0,0 +1,111 @@
+import unittest
+
+import math
+import itertools
+
+from spyce.orbit import Orbit
+from spyce.vector import Vec3
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    from spyce.orbit_array import OrbitArray, InvalidOrbitArray
+
+
+# dummy primary object
+class DummyPrimary:
+    gravitational_parameter = 1e20
+
+
+primary = DummyPrimary()
+
+
+@unittest.skipIf(numpy is None, "requires NumPy")
+class TestOrbitArray(unittest.TestCase):
+    def setUp(self):
+        periapsis = (1e9, 1e13)
+        eccentricity = (0.0, 0.5, 0.99999, 1.0, 1.00001, 10.0)
+        angle = (-math.pi/2, 0, math.pi/4, math.pi)
+        self.orbits = [
+            Orbit(primary, *elements, 0, 1)
+            for elements in itertools.product(periapsis, eccentricity, angle,
+                                              angle, angle)
+        ]
+        self.array = OrbitArray.from_orbits(self.orbits)
+
+    def assertAlmostEqualVectors(self, first, second, msg=None):
+        scale = max(Vec3(second).norm(), 1e-300)
+        for a, b in zip(first, second):
+            self.assertAlmostEqual(a / scale, b / scale, msg=msg)
+
+    def test_constants(self):
+        for i, orbit in enumerate(self.orbits):
+            for name in OrbitArray.columns:
+                expected = getattr(orbit, name)
+                value = getattr(self.array, name)[i]
+                if math.isinf(expected):
+                    self.assertEqual(value, expected, msg=name)
+                else:
+                    self.assertAlmostEqual(value / expected if expected else
+                                           value, 1 if expected else 0,
+                                           msg=name)
+
+    def test_state(self):
+        time = 1e4
+        positions, velocities = self.array.state_at_time(time)
+        for orbit, position, velocity in zip(self.orbits, positions,
+                                             velocities):
+            self.assertAlmostEqualVectors(
+                position, orbit.position_at_time(time), msg=orbit)
+            self.assertAlmostEqualVectors(
+                velocity, orbit.velocity_at_time(time), msg=orbit)
+
+        # many times for a single orbit
+        times = numpy.linspace(0, 1e4, 5)
+        positions = self.array[3:4].position_at_time(times)
+        self.assertEqual(positions.shape, (5, 3))
+        for time, position in zip(times, positions):
+            expected = self.orbits[3].position_at_time(time)
+            self.assertAlmostEqualVectors(position, expected)
+
+    def test_from_state(self):
+        time = 1e4
+        positions, velocities = self.array.state_at_time(time)
+        array = OrbitArray.from_state(primary, positions, velocities, time)
+        for orbit, other in zip(self.orbits, array):
+            # parabolic trajectories are too ill-conditioned
+            if orbit.eccentricity == 1:
+                continue
+            self.assertAlmostEqual(other.periapsis / orbit.periapsis, 1)
+            self.assertAlmostEqual(other.eccentricity, orbit.eccentricity)
+            self.assertAlmostEqualVectors(
+                other.position_at_time(2*time),
+                orbit.position_at_time(2*time), msg=orbit)
+
+    def test_selection(self):
+        # slices are views
+        view = self.array[10:20]
+        self.assertEqual(len(view), 10)
+        self.assertTrue(numpy.shares_memory(view.data, self.array.data))
+
+        # masks
+        closed = self.array[self.array.period_between(0, 1e30)]
+        self.assertTrue(all(closed.eccentricity < 1))
+        reaching = self.array.crossing(1e10, 1e11)
+        for orbit, selected in zip(self.orbits, reaching):
+            expected = orbit.periapsis <= 1e11 and (
+                orbit.eccentricity >= 1 or orbit.apoapsis >= 1e10)
+            self.assertEqual(selected, expected)
+
+        # materialized orbits
+        self.assertIsInstance(self.array[5], Orbit)
+        self.assertEqual(self.array[5].periapsis, self.orbits[5].periapsis)
+
+        with self.assertRaises(InvalidOrbitArray):
+            OrbitArray.from_orbits([self.orbits[0], Orbit(DummyPrimary(), 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
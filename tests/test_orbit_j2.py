@@ -0,0 +1,105 @@
+import unittest
+
+import math
+
+import spyce.body
+import spyce.frames
+import spyce.load
+from spyce.orbit import Orbit
+from spyce.orbit_j2 import J2Orbit
+from spyce.orbit_determination import InvalidElements
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    import spyce.kepler
+
+
+class TestJ2Orbit(unittest.TestCase):
+    def test_no_oblateness(self):
+        Kerbin = spyce.load.kerbol['Kerbin']
+        o = Orbit(Kerbin, 700e3, .1, 1, 2, 3)
+        p = J2Orbit(Kerbin, 700e3, .1, 1, 2, 3)
+        time = 1e6
+        self.assertAlmostEqual(o.position_at_time(time),
+                               p.position_at_time(time), places=6)
+        self.assertAlmostEqual(o.velocity_at_time(time),
+                               p.velocity_at_time(time), places=9)
+
+    def test_sun_synchronous(self):
+        Earth = spyce.load.solar['Earth']
+        o = J2Orbit.sun_synchronous(Earth, Earth.radius + 800e3)
+
+        # well-known value for a 800 km sun-synchronous orbit
+        self.assertAlmostEqual(math.degrees(o.inclination), 98.6, places=1)
+
+        # the orbital plane follows the Sun over a year
+        year = Earth.orbit.period
+        _, _, _, node, _, _ = o.elements_at_time(year)
+        self.assertAlmostEqual(node, 2*math.pi)
+
+        with self.assertRaises(InvalidElements):
+            J2Orbit.sun_synchronous(Earth, 1e8)
+
+    def test_molniya(self):
+        Earth = spyce.load.solar['Earth']
+        critical = J2Orbit.critical_inclination
+        o = J2Orbit.from_semi_major_axis(Earth, 26600e3, .74, critical)
+        # the rates are about 1e-7 rad/s
+        self.assertLess(abs(o.apsidal_precession_rate),
+                        1e-6 * abs(o.nodal_precession_rate))
+        self.assertLess(o.nodal_precession_rate, 0)
+
+        # the apsides drift the other way across the critical inclination
+        below = J2Orbit.from_semi_major_axis(
+            Earth, 26600e3, .74, critical - .01)
+        above = J2Orbit.from_semi_major_axis(
+            Earth, 26600e3, .74, critical + .01)
+        self.assertGreater(below.apsidal_precession_rate, 0)
+        self.assertLess(above.apsidal_precession_rate, 0)
+
+    @unittest.skipIf(numpy is None, "requires NumPy")
+    def test_batch(self):
+        Earth = spyce.load.solar['Earth']
+        orbits = [
+            J2Orbit(Earth, Earth.radius + altitude, .01, 1.7, 2, 3)
+            for altitude in (300e3, 800e3, 20000e3)
+        ]
+        times = [0, 1e5, 1e7, 1e8]
+        positions, velocities = spyce.kepler.state_at_time(
+            orbits, times, spyce.frames.ecliptic)
+        for orbit, position in zip(orbits, positions):
+            for time, p in zip(times, position):
+                expected = orbit.position_at_time(time)
+                for a, b in zip(p, expected):
+                    self.assertAlmostEqual(a, b, delta=1e-3)
+
+    @unittest.skipIf(numpy is None, "requires NumPy")
+    def test_ecliptic(self):
+        # the equator of the Earth is tilted relative to the ecliptic
+        Earth = spyce.load.solar['Earth']
+        orbit = J2Orbit(Earth, 7000e3, .01, 1., .3, .2)
+        for time in (0, 100, 1e6):
+            position = spyce.kepler.position_at_time(orbit, time)
+            for a, b in zip(position, orbit.position_at_time(time)):
+                self.assertAlmostEqual(a, b, delta=1e-3)
+            _, velocity = spyce.kepler.relative_state_at_time(orbit, time)
+            for a, b in zip(velocity, orbit.velocity_at_time(time)):
+                self.assertAlmostEqual(a, b, delta=1e-6)
+
+        # the global position follows the orbit of the body
+        expected = Earth.orbit.position_at_time(100) + \
+            orbit.position_at_time(100)
+        satellite = spyce.body.CelestialBody("Satellite", orbit=orbit)
+        self.addCleanup(Earth.satellites.remove, satellite)
+        position = spyce.kepler.global_position_at_time(satellite, 100)
+        for a, b in zip(position, satellite.global_position_at_time(100)):
+            self.assertAlmostEqual(a, b, delta=1e-3)
+        for a, b in zip(position, expected):
+            self.assertAlmostEqual(a, b, delta=1e-3)
+
+
+if __name__ == '__main__':
+    unittest.main()
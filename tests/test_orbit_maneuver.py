@@ -0,0 +1,137 @@
+import unittest
+import math
+
+from spyce.orbit import Orbit
+from spyce.vector import Vec3
+from spyce.orbit_determination import InvalidElements
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    from spyce.orbit_array import OrbitArray
+
+
+# dummy primary object
+class DummyPrimary:
+    gravitational_parameter = 1e20
+
+
+primary = DummyPrimary()
+
+
+class TestOrbitManeuver(unittest.TestCase):
+    def setUp(self):
+        self.orbit = Orbit(primary, 1e9, 0.2, 0.3, 1, 2, 0, 0.5)
+        self.time = self.orbit.period / 3
+
+    def test_apply_impulse(self):
+        orbit, time = self.orbit, self.time
+        # no burn
+        new = orbit.apply_impulse(time)
+        for a, b in zip(new.position_at_time(time + 1e4),
+                        orbit.position_at_time(time + 1e4)):
+            self.assertAlmostEqual(a / 1e9, b / 1e9)
+
+        # prograde burns raise the orbit, normal burns tilt it
+        self.assertGreater(orbit.apply_impulse(time, 100).semi_major_axis,
+                           orbit.semi_major_axis)
+        new = orbit.apply_impulse(time, normal=100)
+        speed = Vec3(orbit.velocity_at_time(time)).norm()
+        self.assertAlmostEqual(Vec3(new.velocity_at_time(time)).norm(),
+                               math.hypot(speed, 100))
+        self.assertNotAlmostEqual(new.inclination, orbit.inclination)
+
+    def test_apsides(self):
+        orbit, time = self.orbit, self.time
+        burn = orbit.burn_for_apoapsis(time, 5e9)
+        self.assertAlmostEqual(orbit.apply_impulse(time, *burn).apoapsis / 5e9,
+                               1)
+        burn = orbit.burn_for_periapsis(time, 5e8)
+        self.assertAlmostEqual(
+            orbit.apply_impulse(time, *burn).periapsis / 5e8, 1)
+        self.assertEqual(burn[1:], (0, 0))
+
+        # at periapsis, the burn is the one of a Hohmann transfer
+        mu = primary.gravitational_parameter
+        r1, r2 = orbit.periapsis, 3e9
+        periapsis_time = orbit.epoch + (2*math.pi - 0.5) / orbit.mean_motion
+        burn, _, _ = orbit.burn_for_apoapsis(periapsis_time, r2)
+        expected = math.sqrt(2*mu*r2 / (r1 * (r1 + r2))) - \
+            orbit.speed_at_distance(r1)
+        self.assertAlmostEqual(burn / expected, 1)
+
+        with self.assertRaises(InvalidElements):
+            orbit.burn_for_apoapsis(time, 1e8)
+        with self.assertRaises(InvalidElements):
+            orbit.burn_for_periapsis(time, 1e11)
+
+    def test_circularization(self):
+        orbit, time = self.orbit, self.time
+        burn = orbit.burn_for_circularization(time)
+        self.assertAlmostEqual(burn[1], 0)
+        new = orbit.apply_impulse(time, *burn)
+        self.assertAlmostEqual(new.eccentricity, 0)
+        self.assertAlmostEqual(new.inclination, orbit.inclination)
+
+    def test_inclination(self):
+        orbit, time = self.orbit, self.time
+        # the position is at a latitude of about -0.3 rad
+        for inclination in (0.4, 0.6, math.pi - 0.4):
+            burn = orbit.burn_for_inclination(time, inclination)
+            new = orbit.apply_impulse(time, *burn)
+            self.assertAlmostEqual(new.inclination, inclination)
+            self.assertAlmostEqual(new.eccentricity, orbit.eccentricity)
+            self.assertAlmostEqual(
+                new.semi_major_axis / orbit.semi_major_axis, 1)
+
+        # at the ascending node, the burn is the usual plane change
+        node = Orbit(primary, 1e9, 0, 0.3, 1, 0, 0, 0)
+        speed = node.speed_at_distance(1e9)
+        burn = node.burn_for_inclination(0, 0.5)
+        self.assertAlmostEqual(math.hypot(*burn) / speed,
+                               2 * math.sin(0.1))
+
+        # the orbit must go through the current latitude
+        with self.assertRaises(InvalidElements):
+            orbit.burn_for_inclination(time, 0.2)
+        with self.assertRaises(InvalidElements):
+            node.burn_for_inclination(node.period / 4, 0)
+
+    def test_finite_burn(self):
+        orbit, time = self.orbit, self.time
+        exhaust_velocity = 3000.
+        start, duration, delta_v = orbit.finite_burn(
+            time, 100., 1e5, 1e4, exhaust_velocity)
+        # rocket equation
+        spent = exhaust_velocity * math.log(
+            1e4 / (1e4 - 1e5 / exhaust_velocity * duration))
+        self.assertAlmostEqual(spent, delta_v)
+        self.assertGreaterEqual(delta_v, 100.)
+        self.assertLess(delta_v, 100.1)
+        self.assertLess(start, time)
+        self.assertGreater(start + duration, time)
+
+        # a weak engine loses more
+        _, _, weak = orbit.finite_burn(time, 100., 1e2, 1e4, exhaust_velocity)
+        self.assertGreater(weak, delta_v)
+
+    @unittest.skipIf(numpy is None, "requires NumPy")
+    def test_batch(self):
+        orbit, time = self.orbit, self.time
+        prograde = numpy.linspace(-100, 100, 9)
+        radial = numpy.linspace(50, -50, 9)
+        array = OrbitArray.from_orbits([orbit]).apply_impulse(
+            time, prograde, 10, radial)
+        self.assertEqual(len(array), 9)
+        for i, (p, r) in enumerate(zip(prograde.tolist(), radial.tolist())):
+            new = orbit.apply_impulse(time, p, 10, r)
+            self.assertAlmostEqual(array.periapsis[i] / new.periapsis, 1)
+            self.assertAlmostEqual(array.eccentricity[i], new.eccentricity)
+            self.assertAlmostEqual(array.inclination[i], new.inclination)
+            self.assertEqual(array.epoch[i], time)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+
+import math
+
+import spyce.load
+import spyce.physics
+from spyce.orbit_rates import RatedOrbit
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    import spyce.kepler
+
+
+def jpl_position(elements, rates, T):
+    """Heliocentric position following aprx_pos_planets.md (au)"""
+    a, e, I, L, varpi, Omega = [x + dx*T for x, dx in zip(elements, rates)]
+    omega = varpi - Omega
+    M = (L - varpi + 180) % 360 - 180
+
+    # Kepler's equation, in degrees
+    e_star = math.degrees(e)
+    E = M + e_star * math.sin(math.radians(M))
+    while True:
+        delta_M = M - (E - e_star * math.sin(math.radians(E)))
+        delta_E = delta_M / (1 - e * math.cos(math.radians(E)))
+        E += delta_E
+        if abs(delta_E) <= 1e-9:
+            break
+
+    E, I, omega, Omega = map(math.radians, (E, I, omega, Omega))
+    x = a * (math.cos(E) - e)
+    y = a * math.sqrt(1 - e*e) * math.sin(E)
+    co, so = math.cos(omega), math.sin(omega)
+    cO, sO = math.cos(Omega), math.sin(Omega)
+    cI, sI = math.cos(I), math.sin(I)
+    return [
+        (co*cO - so*sO*cI) * x + (-so*cO - co*sO*cI) * y,
+        (co*sO + so*cO*cI) * x + (-so*sO + co*cO*cI) * y,
+        (so*sI) * x + (co*sI) * y,
+    ]
+
+
+class TestRatedOrbit(unittest.TestCase):
+    # Mars, from Table 1 of aprx_pos_planets.md
+    elements = [1.52371034, 0.09339410, 1.84969142, -4.55343205,
+                -23.94362959, 49.55953891]
+    rates = [0.00001847, 0.00007882, -0.00813131, 19140.30268499,
+             0.44441088, -0.29257343]
+
+    def test_loaded(self):
+        Mars = spyce.load.solar['Mars']
+        self.assertIsInstance(Mars.orbit, RatedOrbit)
+
+        for year in (1850, 2000, 2040):
+            T = (year - 2000) / 100
+            time = T * 36525 * 86400
+            expected = jpl_position(self.elements, self.rates, T)
+            position = Mars.orbit.position_at_time(time)
+            for a, b in zip(position, expected):
+                self.assertAlmostEqual(a / spyce.physics.au, b, places=7)
+
+    def test_negative_inclination(self):
+        # Earth-Moon barycenter, from Table 1 of aprx_pos_planets.md
+        elements = [1.00000261, 0.01671123, -0.00001531, 100.46457166,
+                    102.93768193, 0.0]
+        rates = [0.00000562, -0.00004392, -0.01294668, 35999.37244981,
+                 0.32327364, 0.0]
+        Earth = spyce.load.solar['Earth']
+        self.assertGreater(Earth.orbit.inclination, 0)
+
+        for year in (1800, 1950, 2000, 2050):
+            T = (year - 2000) / 100
+            time = T * 36525 * 86400
+            expected = jpl_position(elements, rates, T)
+            position = Earth.orbit.position_at_time(time)
+            for a, b in zip(position, expected):
+                self.assertAlmostEqual(a / spyce.physics.au, b, places=7)
+
+    def test_no_rates(self):
+        Sun = spyce.load.solar['Sun']
+        o = RatedOrbit(Sun, 1e11, .2, 1, 2, 3)
+        self.assertAlmostEqual(o.mean_motion, math.sqrt(
+            Sun.gravitational_parameter / o.semi_major_axis**3))
+        self.assertEqual(o.elements_at_time(1e9)[:5], (
+            o.periapsis, o.eccentricity, o.inclination,
+            o.longitude_of_ascending_node, o.argument_of_periapsis,
+        ))
+
+    def test_state(self):
+        Mars = spyce.load.solar['Mars']
+        orbit = Mars.orbit
+        for time in (-3e9, 0., 1e9):
+            position, velocity = orbit.state_at_time(time)
+            kepler = orbit.orbit_at_time(time)
+            expected = kepler.position_at_time(time)
+            for a, b in zip(position, expected):
+                self.assertAlmostEqual(a, b, delta=1e-6 * expected.norm())
+            expected = kepler.velocity_at_time(time)
+            for a, b in zip(velocity, expected):
+                self.assertAlmostEqual(a, b, delta=1e-9 * expected.norm())
+
+        # the arguments are checked
+        with self.assertRaises(TypeError):
+            RatedOrbit(Mars.orbit.primary, 1e11, foo=1.)
+
+    @unittest.skipIf(numpy is None, "requires NumPy")
+    def test_planets(self):
+        Sun = spyce.load.solar['Sun']
+        planets = [planet.orbit for planet in Sun.satellites
+                   if isinstance(planet.orbit, RatedOrbit)]
+        self.assertEqual(len(planets), 8)
+
+        times = numpy.linspace(-200, 50, 11) * 365.25 * 86400
+        positions, _ = spyce.kepler.state_at_time(planets, times)
+        self.assertEqual(positions.shape, (8, 11, 3))
+        for orbit, position in zip(planets, positions):
+            for time, p in zip(times, position):
+                expected = orbit.position_at_time(time)
+                for a, b in zip(p, expected):
+                    self.assertAlmostEqual(a / expected.norm(),
+                                           b / expected.norm())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import unittest
+import math
+
+from spyce.orbit import Orbit
+from spyce.vector import Vec3
+import spyce.load
+import spyce.rocket
+import spyce.patched_conics
+from spyce.patched_conics import PatchedConics
+
+
+kerbol = spyce.load.kerbol
+
+
+def global_state(orbit, time):
+    """Position and velocity relative to the root of the system"""
+    position = Vec3(orbit.position_at_time(time))
+    velocity = Vec3(orbit.velocity_at_time(time))
+    primary = orbit.primary
+    while primary.orbit is not None:
+        position += primary.orbit.position_at_time(time)
+        velocity += primary.orbit.velocity_at_time(time)
+        primary = primary.orbit.primary
+    return position, velocity
+
+
+class TestPatchedConics(unittest.TestCase):
+    def setUp(self):
+        # Hohmann transfer from low Kerbin orbit, arriving just behind the Mun
+        self.kerbin = kerbol['Kerbin']
+        self.mun = kerbol['Mun']
+        r1 = self.kerbin.radius + 100e3
+        r2 = self.mun.orbit.semi_major_axis
+        transfer = Orbit.from_apses(self.kerbin, r1, r2)
+        x, y, _ = self.mun.orbit.position_at_time(transfer.period / 2)
+        angle = math.atan2(y, x) - math.pi + 0.15
+        self.orbit = Orbit.from_apses(self.kerbin, r1, r2, 0, 0, angle)
+
+    def assertContinuous(self, patches):
+        for before, after in zip(patches, patches[1:]):
+            self.assertEqual(before.end, after.start)
+            p1, v1 = global_state(before.orbit, before.end)
+            p2, v2 = global_state(after.orbit, after.start)
+            self.assertLess((p1 - p2).norm(), 1.)
+            self.assertLess((v1 - v2).norm(), 1e-3)
+
+    def test_encounter(self):
+        trajectory = PatchedConics(self.orbit)
+        patches = trajectory.predict(self.orbit.period)
+        self.assertEqual(patches[0].transition, spyce.patched_conics.ENCOUNTER)
+        self.assertIs(patches[0].body, self.mun)
+        self.assertIs(patches[1].primary, self.mun)
+        self.assertContinuous(patches)
+
+        # entry at the sphere of influence
+        orbit = patches[1].orbit
+        distance = Vec3(orbit.position_at_time(patches[1].start)).norm()
+        self.assertAlmostEqual(distance / self.mun.sphere_of_influence, 1)
+
+        # cached
+        self.assertIs(trajectory.predict(self.orbit.period)[0], patches[0])
+
+    def test_escape(self):
+        # escape from Kerbin on a polar hyperbola, away from the moons
+        orbit = Orbit(self.kerbin, self.kerbin.radius + 100e3, 1.5,
+                      math.pi / 2)
+        patches = PatchedConics(orbit).predict(1e7)
+        self.assertEqual(patches[0].transition, spyce.patched_conics.ESCAPE)
+        self.assertIs(patches[1].primary, kerbol['Kerbol'])
+        self.assertContinuous(patches)
+
+        # closed orbits within the sphere of influence never end
+        orbit = Orbit(self.kerbin, self.kerbin.radius + 100e3, 0.1)
+        patches = PatchedConics(orbit).predict(1e7)
+        self.assertEqual(len(patches), 1)
+        self.assertIsNone(patches[0].transition)
+
+    def test_impact(self):
+        orbit = Orbit.from_apses(self.kerbin, 100e3, 1e6)
+        patches = PatchedConics(orbit).predict(1e5)
+        self.assertEqual(len(patches), 1)
+        self.assertEqual(patches[0].transition, spyce.patched_conics.IMPACT)
+        distance = Vec3(orbit.position_at_time(patches[0].end)).norm()
+        self.assertAlmostEqual(distance / self.kerbin.radius, 1)
+
+    def test_departure(self):
+        # hyperbola leaving the surface: the impact is in the past
+        position = Vec3([self.kerbin.radius + 10e3, 0, 0])
+        velocity = Vec3([3000, 5000, 0])
+        orbit = Orbit.from_state(self.kerbin, position, velocity, 100.)
+        self.assertLess(orbit.periapsis, self.kerbin.radius)
+        patches = PatchedConics(orbit).predict(1e7)
+        self.assertEqual(patches[0].transition, spyce.patched_conics.ESCAPE)
+        v = orbit.true_anomaly_at_escape()
+        self.assertEqual(patches[0].end, orbit.time_at_true_anomaly(v))
+        self.assertGreater(patches[0].end, patches[0].start)
+
+    def test_replace(self):
+        trajectory = PatchedConics(self.orbit)
+        first = trajectory.predict(self.orbit.period)[0]
+        # a retrograde burn soon after departure misses the Mun
+        time = 1000
+        trajectory.add_maneuver(time, -100)
+        patches = trajectory.predict(self.orbit.period)
+        self.assertIs(patches[0], first)
+        self.assertEqual(first.end, time)
+        self.assertEqual(first.transition, spyce.patched_conics.MANEUVER)
+        self.assertIsNot(patches[1].body, self.mun)
+        self.assertContinuous(patches[1:])
+
+    def test_update(self):
+        trajectory = PatchedConics(self.orbit)
+        patches = list(trajectory.predict(self.orbit.period))
+
+        # following the prediction keeps it, and drops the past
+        time = patches[1].start + 100
+        orbit = Orbit.from_state(
+            self.mun,
+            patches[1].orbit.position_at_time(time),
+            patches[1].orbit.velocity_at_time(time),
+            time,
+        )
+        self.assertFalse(trajectory.update(orbit))
+        self.assertIs(trajectory.patches[0], patches[1])
+
+        # deviating from it discards it
+        orbit = Orbit(self.mun, self.mun.radius + 50e3, 0, 0, 0, 0, time)
+        self.assertTrue(trajectory.update(orbit))
+        self.assertEqual(len(trajectory.patches), 1)
+        self.assertIs(trajectory.patches[0].orbit, orbit)
+
+    def test_rocket(self):
+        rocket = spyce.rocket.Rocket(self.kerbin)
+        rocket.position = self.orbit.position_at_time(0)
+        rocket.velocity = self.orbit.velocity_at_time(0)
+
+        # the prediction is only made when requested
+        rocket.update_orbit(0.)
+        self.assertIsNone(rocket._trajectory)
+        trajectory = rocket.trajectory
+        self.assertIs(trajectory.patches[0].orbit, rocket.orbit)
+        self.assertIs(rocket.trajectory, trajectory)
+
+        # and then updated when requested again
+        rocket.simulate(0., 10.)
+        self.assertTrue(rocket._trajectory_outdated)
+        self.assertIs(rocket.trajectory, trajectory)
+        self.assertFalse(rocket._trajectory_outdated)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import os
+import tempfile
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    from spyce.recorder import Recorder, Recording
+
+import spyce.orbit
+import spyce.load
+import spyce.rocket
+from spyce.universe import Universe
+
+
+@unittest.skipIf(numpy is None, "requires NumPy")
+class TestRecorder(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "flight.rec")
+
+    def test_records(self):
+        # repeated times across blocks of the index
+        times = numpy.repeat(numpy.arange(100.), 3)
+        with Recorder(self.path, stride=7, capacity=10) as recorder:
+            for i, time in enumerate(times):
+                primary = "Kerbin" if time < 50 else "Mun"
+                recorder.append(time, [i, 2*i, 3*i], [-i, 0, i], 1e3 - i,
+                                i % 2, primary)
+
+            # readable after flushing
+            recorder.flush()
+            self.assertEqual(len(Recording(self.path)), len(times))
+        self.assertEqual(os.path.getsize(self.path),
+                         4096 + len(times) * 80)
+
+        recording = Recording(self.path)
+        self.assertEqual(recording.primaries, ["Kerbin", "Mun"])
+        self.assertEqual((recording.start, recording.end), (0., 99.))
+        self.assertEqual(list(recording.records["mass"]),
+                         [1e3 - i for i in range(len(times))])
+        self.assertEqual(recording.primary(recording.records[-1]), "Mun")
+
+        # lookups agree with a full search
+        for time in numpy.linspace(-1, 101, 409):
+            for side in ("left", "right"):
+                self.assertEqual(recording.search(time, side),
+                                 numpy.searchsorted(times, time, side))
+
+        # ranges are views of the memory map
+        records = recording.between(10., 20.)
+        self.assertEqual(len(records), 30)
+        self.assertTrue(numpy.shares_memory(records, recording.records))
+        self.assertEqual(records["time"][0], 10.)
+
+        # interpolation
+        primary, position, velocity = recording.state_at_time(10.5)
+        self.assertEqual(primary, "Kerbin")
+        self.assertEqual(list(position), [32.5, 65., 97.5])
+
+        with self.assertRaises(ValueError):
+            with Recorder(self.path) as recorder:
+                recorder.append(1., [0, 0, 0], [0, 0, 0], 0, 0, "Kerbin")
+                recorder.append(0., [0, 0, 0], [0, 0, 0], 0, 0, "Kerbin")
+
+    def test_rocket(self):
+        kerbin = spyce.load.kerbol['Kerbin']
+        orbit = spyce.orbit.Orbit(kerbin, 700e3)
+        rocket = spyce.rocket.Rocket(kerbin, universe=Universe([kerbin]))
+        rocket.throttle = 0.
+        rocket.position = orbit.position_at_time(0)
+        rocket.velocity = orbit.velocity_at_time(0)
+        rocket.update_orbit(0.)
+
+        with Recorder(self.path) as rocket.recorder:
+            for i in range(100):
+                rocket.simulate(i * 10., 10.)
+
+        recording = Recording(self.path)
+        self.assertEqual(len(recording), 100)
+        record = recording.records[recording.index_at_time(505.)]
+        self.assertEqual(record["time"], 500.)
+        self.assertEqual(record["throttle"], 0.)
+        for a, b in zip(record["position"], orbit.position_at_time(500.)):
+            self.assertAlmostEqual(a, b, delta=1e-3)
+
+
+if __name__ == '__main__':
+    unittest.main()
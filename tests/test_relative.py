@@ -0,0 +1,77 @@
+import unittest
+
+import spyce.load
+from spyce.orbit import Orbit
+from spyce.vector import Vec3
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    import spyce.relative
+
+
+@unittest.skipIf(numpy is None, "requires NumPy")
+class TestRelative(unittest.TestCase):
+    def setUp(self):
+        self.Kerbin = spyce.load.kerbol['Kerbin']
+        self.target = Orbit(self.Kerbin, 700e3, 0, .3, 1, 2)
+
+    def chaser(self, position, velocity, time=0):
+        """Orbit of a chaser from its relative state at given time"""
+        target_position = numpy.array(self.target.position_at_time(time))
+        target_velocity = numpy.array(self.target.velocity_at_time(time))
+        position, velocity = spyce.relative.from_lvlh(
+            target_position, target_velocity, position, velocity)
+        return Orbit.from_state(self.Kerbin, Vec3(position.tolist()),
+                                Vec3(velocity.tolist()), time)
+
+    def test_frame(self):
+        position = numpy.array([100., -200, 50])
+        velocity = numpy.array([.1, .2, -.3])
+        chaser = self.chaser(position, velocity)
+        computed = spyce.relative.relative_state(self.target, chaser, 0)
+        self.assertTrue(numpy.allclose(computed[0], position, atol=1e-6))
+        self.assertTrue(numpy.allclose(computed[1], velocity, atol=1e-6))
+
+    def test_propagate(self):
+        position = numpy.array([10., -20, 5])
+        velocity = numpy.array([.01, .02, -.03])
+        chaser = self.chaser(position, velocity)
+        times = numpy.linspace(0, 2000, 11)
+        expected = spyce.relative.relative_state(self.target, chaser, times)
+        computed = spyce.relative.propagate(
+            position, velocity, self.target.mean_motion, times)
+        self.assertEqual(computed[0].shape, (11, 3))
+        # the linearization error grows with the square of the distance
+        error = numpy.linalg.norm(computed[0] - expected[0], axis=-1)
+        self.assertLess(error.max(), .5)
+        error = numpy.linalg.norm(computed[1] - expected[1], axis=-1)
+        self.assertLess(error.max(), 1e-3)
+
+    def test_two_impulse(self):
+        n = self.target.mean_motion
+        # many approaches at once
+        positions = numpy.array([[-1000., 0, 0], [-50, -500, 0],
+                                 [500, 500, 100]])
+        velocities = numpy.zeros((3, 3))
+        times = numpy.array([[600.], [1200.], [1800.]])
+        burn1, burn2 = spyce.relative.two_impulse(
+            positions, velocities, n, times, final_position=[0, -10, 0])
+        self.assertEqual(burn1.shape, (3, 3, 3))
+
+        # in the linear model, the approach ends at the final position
+        position, velocity = spyce.relative.propagate(
+            positions, velocities + burn1, n, times)
+        self.assertTrue(numpy.allclose(position, [0, -10, 0], atol=1e-6))
+        self.assertTrue(numpy.allclose(velocity + burn2, 0, atol=1e-9))
+
+        # and close to it with the full dynamics
+        chaser = self.chaser(positions[1], velocities[1] + burn1[1, 1])
+        position, _ = spyce.relative.relative_state(self.target, chaser, 1200)
+        self.assertLess(numpy.linalg.norm(position - [0, -10, 0]), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
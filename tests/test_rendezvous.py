@@ -0,0 +1,105 @@
+import unittest
+
+import math
+
+import spyce.load
+from spyce.orbit import Orbit
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    import spyce.deltav
+    import spyce.kepler
+    import spyce.rendezvous
+
+
+@unittest.skipIf(numpy is None, "requires NumPy")
+class TestRendezvous(unittest.TestCase):
+    def setUp(self):
+        self.Kerbin = spyce.load.kerbol['Kerbin']
+
+    def miss_distance(self, chaser, target, option):
+        """Distance between the chaser and the target at the arrival"""
+        if option.revolutions == 0:
+            position = spyce.kepler.position_at_time(chaser, option.departure)
+        else:
+            position = spyce.kepler.position_at_time(chaser, option.start)
+        if option.transfer_time:
+            # opposite point, on the orbit of the target
+            position *= -target.semi_major_axis / numpy.linalg.norm(position)
+        expected = spyce.kepler.position_at_time(target, option.arrival)
+        return numpy.linalg.norm(position - expected)
+
+    def test_same_orbit(self):
+        chaser = Orbit(self.Kerbin, 700e3)
+        target = Orbit(self.Kerbin, 700e3, 0, 0, 0, 0, 0, 1)
+        options = spyce.rendezvous.plan(chaser, target, 1000,
+                                        max_revolutions=4)
+        self.assertGreater(len(options), 0)
+        for option in options:
+            # no drift, so no window
+            self.assertGreater(option.revolutions, 0)
+            self.assertEqual(len(option.burn_times()), 2)
+            self.assertLess(self.miss_distance(chaser, target, option), 1)
+            # the phasing orbit stays above the atmosphere
+            a = (self.Kerbin.gravitational_parameter *
+                 (option.period / (2*math.pi))**2)**(1/3)
+            self.assertGreater(2*a - 700e3, 670e3)
+        # more revolutions require less delta-v
+        self.assertGreaterEqual(options[0].revolutions, 3)
+        delta_v = [option.delta_v for option in options]
+        self.assertEqual(delta_v, sorted(delta_v))
+
+    def test_transfer(self):
+        chaser = Orbit(self.Kerbin, 700e3)
+        target = Orbit(self.Kerbin, 900e3, 0, 0, 0, 0, 0, 1)
+        options = spyce.rendezvous.plan(chaser, target, 1000,
+                                        max_revolutions=3)
+        windows = [option for option in options if option.revolutions == 0]
+        self.assertEqual(len(windows), 3)
+        # the windows are separated by the synodic period
+        synodic = 1 / (1/chaser.period - 1/target.period)
+        self.assertAlmostEqual(windows[1].departure - windows[0].departure,
+                               synodic, delta=1e-3)
+        for option in options:
+            self.assertLess(self.miss_distance(chaser, target, option), 1)
+            self.assertGreaterEqual(option.departure, 1000)
+
+        # leaving the phasing orbit starts the transfer
+        burn1, burn2 = spyce.deltav.hohmann(self.Kerbin, 700e3, 900e3)
+        for option in options:
+            if option.revolutions == 0:
+                self.assertEqual(len(option.burn_times()), 2)
+                continue
+            self.assertEqual(option.burn_times(), [
+                option.start, option.departure, option.arrival])
+            separate = spyce.rendezvous.phasing_delta_v(
+                chaser, option.period) + burn1 + burn2
+            self.assertLessEqual(option.delta_v, separate + 1e-9)
+
+        # ranking by duration
+        fastest = spyce.rendezvous.rank(options, time_cost=1)[0]
+        self.assertEqual(fastest.arrival,
+                         min(option.arrival for option in options))
+
+    def test_refinement(self):
+        chaser = Orbit(self.Kerbin, 700e3, .01)
+        target = Orbit(self.Kerbin, 900e3, .005, 0, 0, 0, 0, 1)
+        for option in spyce.rendezvous.plan(chaser, target, 1000):
+            if option.revolutions == 0:
+                departure = option.departure
+                chaser_position = spyce.rendezvous.longitude(
+                    chaser, chaser, departure)
+            else:
+                chaser_position = spyce.rendezvous.longitude(
+                    chaser, chaser, option.start)
+            target_position = spyce.rendezvous.longitude(
+                chaser, target, option.arrival)
+            error = (target_position - chaser_position) % (2*math.pi)
+            self.assertAlmostEqual(error, math.pi, places=6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import math
+
+import spyce.orbit
+import spyce.load
+import spyce.rocket
+from spyce.universe import Universe
+from spyce.scheduler import Scheduler
+
+
+class DummyVessel:
+    """Vessel waking up at given times"""
+    def __init__(self, wake_ups, throttle=0.):
+        self.wake_ups = list(wake_ups)
+        self.throttle = throttle
+        self.calls = []
+        self.woken = []
+
+    @property
+    def resume_time(self):
+        return self.wake_ups[0] if self.wake_ups else math.inf
+
+    def simulate(self, t, dt, count=1):
+        for _ in range(count):
+            self.calls.append((t, dt))
+            while self.wake_ups and self.wake_ups[0] <= t + dt:
+                self.woken.append((self.wake_ups.pop(0), t))
+            t += dt
+
+
+class TestScheduler(unittest.TestCase):
+    def test_events(self):
+        scheduler = Scheduler(0., 1.)
+        sleeper = DummyVessel([])
+        early = DummyVessel([10.5, 20])
+        late = DummyVessel([1e4])
+        thrusting = DummyVessel([], throttle=1.)
+        for vessel in (sleeper, early, late, thrusting):
+            scheduler.add(vessel)
+
+        scheduler.run_until(100.5)
+        self.assertEqual(scheduler.time, 100.)
+        self.assertEqual(len(thrusting.calls), 100)
+        self.assertEqual(scheduler.active, [thrusting])
+
+        # coasting vessels are only simulated around their events
+        self.assertEqual(len(sleeper.calls), 1)
+        self.assertEqual(len(late.calls), 1)
+        self.assertLessEqual(len(early.calls), 6)
+        # each event is processed during the tick containing it
+        for event, t in early.woken:
+            self.assertLess(t, event)
+            self.assertLessEqual(event, t + 1)
+        self.assertEqual([event for event, _ in early.woken], [10.5, 20])
+
+        # without active vessels, the ticks are skipped
+        scheduler.remove(thrusting)
+        scheduler.run_until(2e4)
+        self.assertEqual(scheduler.time, 2e4)
+        self.assertEqual(len(sleeper.calls), 1)
+        self.assertEqual(late.woken[0][0], 1e4)
+
+        # synchronization
+        scheduler.synchronize()
+        t, dt = sleeper.calls[-1]
+        self.assertEqual(t + dt, 2e4)
+
+    def test_rockets(self):
+        kerbin = spyce.load.kerbol['Kerbin']
+        universe = Universe([kerbin])
+        scheduler = Scheduler(0., 2.**-5)
+        woken = []
+        rockets = []
+
+        def program(rocket):
+            yield lambda: 100 - scheduler.time
+            woken.append(scheduler.time)
+
+        for i in range(20):
+            orbit = spyce.orbit.Orbit(kerbin, 700e3 + i * 1e3)
+            rocket = spyce.rocket.Rocket(kerbin, program, universe)
+            rocket.throttle = 0.
+            rocket.position = orbit.position_at_time(0)
+            rocket.velocity = orbit.velocity_at_time(0)
+            rocket.update_orbit(0.)
+            rockets.append((rocket, orbit))
+            scheduler.add(rocket)
+
+        scheduler.run_until(1000.)
+        scheduler.synchronize()
+        self.assertEqual(len(woken), 20)
+        for time in woken:
+            self.assertAlmostEqual(time, 100., delta=2.**-5)
+        for rocket, orbit in rockets:
+            for a, b in zip(rocket.position, orbit.position_at_time(1000.)):
+                self.assertAlmostEqual(a, b, delta=1e-3)
+
+
+if __name__ == '__main__':
+    unittest.main()
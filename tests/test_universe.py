@@ -0,0 +1,97 @@
+import unittest
+import threading
+
+import spyce.orbit
+import spyce.load
+import spyce.rocket
+from spyce.universe import Universe
+
+
+kerbol = spyce.load.kerbol
+
+
+def coasting_rocket(universe, orbit):
+    """Rocket without engines following `orbit` in `universe`"""
+    rocket = spyce.rocket.Rocket(orbit.primary, universe=universe)
+    rocket.throttle = 0.
+    rocket.position = orbit.position_at_time(0)
+    rocket.velocity = orbit.velocity_at_time(0)
+    rocket.update_orbit(0)
+    return rocket
+
+
+class TestUniverse(unittest.TestCase):
+    def setUp(self):
+        kerbin = kerbol['Kerbin']
+        self.satellites = {
+            name: list(body.satellites) for name, body in kerbol.items()
+        }
+        # falls to the Mun, which it meets after a few hours
+        self.orbit = spyce.orbit.Orbit.from_apses(
+            kerbin, kerbin.radius + 100e3, kerbol['Mun'].orbit.apoapsis,
+            0, 0, 1.7)
+
+    def tearDown(self):
+        # the shared bodies are never modified
+        for name, body in kerbol.items():
+            self.assertEqual(body.satellites, self.satellites[name])
+
+    def test_membership(self):
+        kerbin, mun = kerbol['Kerbin'], kerbol['Mun']
+        universe = Universe(kerbol)
+        self.assertEqual(set(universe.children(kerbin)),
+                         {mun, kerbol['Minmus']})
+
+        rocket = coasting_rocket(universe, self.orbit)
+        self.assertIs(rocket.universe, universe)
+        self.assertEqual(universe.vessels(kerbin), [rocket])
+        self.assertEqual(universe.satellites(kerbin)[-1], rocket)
+
+        universe.move(rocket, mun)
+        self.assertIs(rocket.primary, mun)
+        self.assertEqual(universe.vessels(kerbin), [])
+        self.assertEqual(universe.vessels(), [rocket])
+
+        universe.remove(rocket)
+        self.assertIsNone(rocket.universe)
+        self.assertEqual(universe.vessels(), [])
+
+        # only the selected bodies are encountered
+        self.assertEqual(Universe([kerbin]).children(kerbin), ())
+
+    def simulate(self, universe, results):
+        rocket = coasting_rocket(universe, self.orbit)
+        t, dt = 0., 60.
+        while t < 2e5 and rocket.primary is not kerbol['Mun']:
+            universe.simulate(t, dt)
+            t += dt
+        results.append((rocket, t))
+
+    def test_threads(self):
+        universes = [Universe(kerbol), Universe(kerbol)]
+        results = []
+        threads = [
+            threading.Thread(target=self.simulate, args=(universe, results))
+            for universe in universes
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        (first, t1), (second, t2) = results
+        self.assertEqual(t1, t2)
+        self.assertIs(first.primary, kerbol['Mun'])
+        self.assertIs(second.primary, kerbol['Mun'])
+        for universe in universes:
+            self.assertEqual(len(universe.vessels(kerbol['Mun'])), 1)
+
+        # a universe without the Mun never meets it
+        universe = Universe([kerbol['Kerbol'], kerbol['Kerbin']])
+        results = []
+        self.simulate(universe, results)
+        self.assertIs(results[0][0].primary, kerbol['Kerbin'])
+
+
+if __name__ == '__main__':
+    unittest.main()